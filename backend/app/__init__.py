@@ -1,20 +1,83 @@
-from flask import Flask
+from flask import Flask, current_app, jsonify, request
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .models.db_models import db
+from .models.types import configure_compression
+import importlib
 from .routes.crud_route import bp as crud_routes_bp
-from .routes.export_route import e_bp as export_routes_bp
-from .routes.autogen_route import autogen_bp
 from .routes.auth_route import auth_bp, jwt
+from .events import init_feed
+from .pool import configure_pool
+from .admission import init_admission
+from .shared_state import init_shared_state
+from .models.routing import init_replicas
+from .models.sharding import UserMoving, init_shards
+from .models.sqlite import init_sqlite
+from .tasks import register_commands
 from config.config import Config
 
+# Optional route groups: name -> (module, blueprint). Only those named in ENABLED_BLUEPRINTS
+# are imported and registered
+OPTIONAL_BLUEPRINTS = {
+    "export": ("app.routes.export_route", "e_bp"), # file export
+    "autogen": ("app.routes.autogen_route", "autogen_bp"), # LLM auto-generation (needs GEMINI_API_KEY)
+    "revisions": ("app.routes.revision_route", "rev_bp"), # revision history
+    "tags": ("app.routes.tag_route", "tag_bp"), # tag maintenance
+    "sync": ("app.routes.sync_route", "sync_bp"), # delta sync
+    "events": ("app.routes.events_route", "events_bp"), # live change feed
+    "bootstrap": ("app.routes.bootstrap_route", "bootstrap_bp"), # first-paint bootstrap
+    "health": ("app.routes.health_route", "health_bp"), # health/metrics
+}
+
+def _register_optional_blueprints(app):
+    enabled = app.config.get("ENABLED_BLUEPRINTS", OPTIONAL_BLUEPRINTS)
+    unknown = set(enabled) - set(OPTIONAL_BLUEPRINTS)
+    if unknown:
+        raise ValueError(f"Unknown ENABLED_BLUEPRINTS: {', '.join(sorted(unknown))}")
+    for name, (module, attr) in OPTIONAL_BLUEPRINTS.items():
+        if name in enabled:
+            app.register_blueprint(getattr(importlib.import_module(module), attr))
+
+def _limit_json_body():
+    # JSON is parsed in one go, so it gets a tighter cap than the streamed upload endpoints
+    limit = current_app.config.get("MAX_JSON_LENGTH")
+    if limit and request.is_json:
+        request.max_content_length = min(limit, request.max_content_length or limit)
+
+def _too_large(exc):
+    return jsonify({
+        'error': 'Request body too large',
+        'max_bytes': request.max_content_length,
+    }), 413
+
+def _user_moving(exc):
+    response = jsonify({'error': 'Account is being moved, retry shortly'})
+    response.headers['Retry-After'] = '2'
+    return response, 503
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    if app.config.get("PROXY_FIX_X_FOR"):
+        # request.remote_addr (rate limits, health checks) from X-Forwarded-For, set by our proxies only
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"])
     CORS(app) # Enable CORS for all routes to resolve cross-origin issues (React and Flask running on different ports)
+    configure_compression(app.config)
+    configure_pool(app.config)
     db.init_app(app)
     jwt.init_app(app)
+    init_shared_state(app) # cross-worker key/value store
+    init_replicas(app) # GET reads go to replicas, with read-your-writes pins
+    init_shards(app) # per-user data on DATABASE_SHARD_URLS, see users.shard
+    init_sqlite(app) # pragmas and write transactions for SQLite database files
+    init_admission(app) # concurrency gates for search, export and autogen
+    app.before_request(_limit_json_body)
+    app.register_error_handler(413, _too_large) # JSON instead of the HTML error page
+    app.register_error_handler(UserMoving, _user_moving) # writes during a shard move
     app.register_blueprint(crud_routes_bp) #Register the route blueprint
-    app.register_blueprint(export_routes_bp) #Register the file export route blueprint
     app.register_blueprint(auth_bp) # Register the auth blueprint
-    app.register_blueprint(autogen_bp) # Register the autogen blueprint
+    _register_optional_blueprints(app) # the rest, as configured
+    if "events" in app.blueprints:
+        init_feed(app) # per-process change_log poller behind /api/events
+    register_commands(app) # flask CLI maintenance commands
     return app
\ No newline at end of file
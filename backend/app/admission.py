@@ -0,0 +1,105 @@
+# Admission control for the expensive route classes
+#
+# A gunicorn worker has a fixed number of request threads. Searches, exports and autogen calls
+# can each hold one for seconds, so a burst of them would leave none for the cheap GETs and
+# logins. Each class gets a gate: at most `concurrency` of its requests run at once per worker,
+# up to `queue` more wait (at most `wait` seconds) for a slot, and the rest are turned away at
+# once with 503 and Retry-After instead of timing out. Counters are per worker, like the pool's.
+import functools
+import threading
+import time
+from flask import current_app, jsonify
+
+
+class AdmissionGate:
+    def __init__(self, concurrency, queue, wait):
+        self.concurrency, self.queue, self.wait = concurrency, queue, wait
+        self._cond = threading.Condition()
+        self.active = self.waiting = 0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_full": 0, "rejected_timeout": 0,
+                      "peak_waiting": 0, "wait_total": 0.0}
+
+    def acquire(self):
+        """Take a slot, waiting for one if the queue has room. False if the request is shed."""
+        with self._cond:
+            stats = self.stats
+            if self.active < self.concurrency:
+                self.active += 1
+                stats["admitted"] += 1
+                return True
+            if self.waiting >= self.queue:
+                stats["rejected_full"] += 1
+                return False
+            self.waiting += 1
+            stats["queued"] += 1
+            stats["peak_waiting"] = max(stats["peak_waiting"], self.waiting)
+            start = time.perf_counter()
+            try:
+                admitted = self._cond.wait_for(lambda: self.active < self.concurrency, self.wait)
+            finally:
+                self.waiting -= 1
+            stats["wait_total"] += time.perf_counter() - start
+            if not admitted:
+                stats["rejected_timeout"] += 1
+                return False
+            self.active += 1
+            stats["admitted"] += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def status(self):
+        with self._cond:
+            stats = dict(self.stats)
+            status = {"concurrency": self.concurrency, "queue": self.queue, "active": self.active,
+                      "waiting": self.waiting}
+        queued = stats.pop("queued")
+        wait_total = stats.pop("wait_total")
+        status.update(stats, queued=queued,
+                      wait_avg_ms=round(wait_total / queued * 1000, 3) if queued else 0.0)
+        return status
+
+
+def shed(route_class):
+    """The 503 for a request the `route_class` gate turned away."""
+    response = jsonify({'error': 'Server busy, retry shortly', 'class': route_class})
+    response.headers['Retry-After'] = str(current_app.config.get("ADMISSION_RETRY_AFTER", 2))
+    return response, 503
+
+
+def admit(route_class):
+    """Run the view under the `route_class` gate; without a free slot answer 503 with Retry-After.
+
+    Goes below @jwt_required() so requests without a valid token never take a slot. A class
+    missing from ADMISSION_LIMITS (or with concurrency 0) is not limited.
+    """
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            gate = current_app.extensions["admission"].get(route_class)
+            if gate is None:
+                return view(*args, **kwargs)
+            if not gate.acquire():
+                return shed(route_class)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                gate.release()
+        return wrapper
+    return decorate
+
+
+def admission_status(app):
+    return {name: gate.status() for name, gate in app.extensions["admission"].items()}
+
+
+def init_admission(app):
+    wait = app.config.get("ADMISSION_QUEUE_TIMEOUT", 2.0)
+    app.extensions["admission"] = {
+        name: AdmissionGate(limits["concurrency"], limits["queue"], wait)
+        for name, limits in app.config.get("ADMISSION_LIMITS", {}).items()
+        if limits["concurrency"] > 0
+    }
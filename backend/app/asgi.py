@@ -0,0 +1,325 @@
+# ASGI entry point: async handlers where requests mostly wait, the Flask app for the rest
+#
+# Under gunicorn's threaded workers every request holds one of workers x threads slots for its
+# whole life, including time spent waiting on the database, on Gemini, or on an idle
+# /api/events stream. Served from here (asgi.py, under uvicorn), those routes run on the event
+# loop instead: the entry/snippet reads use async SQLAlchemy sessions (models/aio.py), the
+# autogen routes await Gemini, and event streams wait on the change feed without a thread
+# each. Responses match the Flask routes they stand in for. Every other route, and every
+# method the async routes don't handle, goes to the unchanged Flask app through a WSGI thread
+# pool of ASGI_WSGI_THREADS threads.
+import asyncio
+import functools
+import time
+import traceback
+from collections import namedtuple
+from contextlib import asynccontextmanager
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+from jwt import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from config.config import Config
+from . import create_app, ratelimit
+from .events import events_since, latest_seq
+from .models.aio import AsyncDatabases
+from .models.changes import parse_sync_token, sync_token
+from .models.db_models import Entry, Snippet, User
+from .models.models import ENTRY_LIST, ENTRY_SUMMARIES, SNIPPET_LIST, SNIPPET_SUMMARIES, EntryResponse, SnippetResponse
+from .models.routing import READ_METHODS
+from .models.sharding import cache_shard, cached_shard
+from .routes import autogen_route
+from .routes.events_route import STREAM_SCOPE, format_event, keep_alive, query_token_refused
+
+Identity = namedtuple("Identity", "id shard")
+
+
+class _Refused(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def _token(request, locations):
+    """(token, where it came from), like get_jwt_request_location()."""
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header[len("Bearer "):], "headers"
+    if "query_string" in locations:
+        return request.query_params.get("jwt"), "query_string"
+    return None, None
+
+
+async def _authenticate(request, locations):
+    """The async twin of @jwt_required plus the account check in auth_route.account_deleted."""
+    token, location = _token(request, locations)
+    if not token:
+        raise _Refused(JSONResponse({"msg": "Missing Authorization Header"}, 401))
+    flask_app = request.app.state.flask
+    try:
+        with flask_app.app_context():
+            claims = decode_token(token)
+    except ExpiredSignatureError:
+        raise _Refused(JSONResponse({"msg": "Token has expired"}, 401))
+    except InvalidTokenError as exc:
+        raise _Refused(JSONResponse({"msg": str(exc)}, 422))
+    if claims.get("type") != "access":
+        raise _Refused(JSONResponse({"msg": "Only non-refresh tokens are allowed"}, 422))
+    # Same rules as auth_route.stream_token_scope; only the events route reads the query string
+    if claims.get("scope") == STREAM_SCOPE and "query_string" not in locations:
+        raise _Refused(JSONResponse({"msg": "Stream tokens only open /api/events"}, 401))
+    refused = query_token_refused(claims, location)
+    if refused:
+        raise _Refused(JSONResponse({"msg": refused}, 401))
+
+    user_id = int(claims[flask_app.config["JWT_IDENTITY_CLAIM"]])
+    shard = cached_shard(flask_app, user_id)
+    if shard is not None:
+        return Identity(user_id, shard)
+    async with request.app.state.db.session() as session:
+        row = (await session.execute(
+            select(User.deleted_at, User.shard, User.moving).where(User.id == user_id)
+        )).first()
+    if row is None or row.deleted_at is not None:
+        raise _Refused(JSONResponse({"msg": "Token has been revoked"}, 401))
+    if row.moving and request.method not in READ_METHODS:
+        raise _Refused(JSONResponse({"error": "Account is being moved, retry shortly"}, 503,
+                                    headers={"Retry-After": "2"}))
+    if not row.moving:
+        cache_shard(flask_app, user_id, row.shard)
+    return Identity(user_id, row.shard)
+
+
+def jwt_required(locations=("headers",)):
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def endpoint(request):
+            try:
+                user = await _authenticate(request, locations)
+            except _Refused as refused:
+                return refused.response
+            return await handler(request, user)
+        return endpoint
+    return decorate
+
+
+def _reader(request, user):
+    dbs = request.app.state.db
+    return dbs.session(dbs.engine_for(request.method, user.id, user.shard))
+
+
+def _database_error(exc):
+    return JSONResponse({"error": "Database error", "details": str(exc)}, 500)
+
+
+def _json(body, status=200, headers=None):
+    return Response(body, status, headers=headers, media_type="application/json")
+
+
+# Entries and snippets
+
+async def _list(request, user, model, body, full, summaries):
+    """Same as the Flask list routes: full items, or summaries without reading bodies with ?summary=1."""
+    summary = request.query_params.get("summary", "").lower() in ("1", "true")
+    stmt = select(model).where(model.user_id == user.id)
+    try:
+        async with _reader(request, user) as session:
+            rows = (await session.scalars(stmt if summary else stmt.options(selectinload(body)))).all()
+    except Exception as exc:
+        return _database_error(exc)
+    schema = summaries if summary else full
+    return _json(schema.dump_json(schema.validate_python(rows, from_attributes=True)))
+
+
+@jwt_required()
+async def get_entries(request, user):
+    return await _list(request, user, Entry, Entry.body, ENTRY_LIST, ENTRY_SUMMARIES)
+
+
+@jwt_required()
+async def get_snippets(request, user):
+    return await _list(request, user, Snippet, Snippet.blob, SNIPPET_LIST, SNIPPET_SUMMARIES)
+
+
+@jwt_required()
+async def get_entry(request, user):
+    try:
+        async with _reader(request, user) as session:
+            entry = (await session.scalars(
+                select(Entry).options(selectinload(Entry.body))
+                .where(Entry.id == request.path_params["id"], Entry.user_id == user.id)
+            )).first()
+    except Exception as exc:
+        return _database_error(exc)
+    if entry is None:
+        return JSONResponse({"error": "Entry not found"}, 404)
+    return _json(EntryResponse.model_validate(entry).model_dump_json(), headers={"ETag": f'"{entry.version}"'})
+
+
+@jwt_required()
+async def get_snippet(request, user):
+    try:
+        async with _reader(request, user) as session:
+            snippet = (await session.scalars(
+                select(Snippet).options(selectinload(Snippet.blob))
+                .where(Snippet.id == request.path_params["id"], Snippet.user_id == user.id)
+            )).first()
+    except Exception as exc:
+        return _database_error(exc)
+    if snippet is None:
+        return JSONResponse({"error": "Snippet not found"}, 404)
+    return _json(SnippetResponse.model_validate(snippet).model_dump_json(), headers={"ETag": f'"{snippet.version}"'})
+
+
+# Auto-generation: the request waits on Gemini, not on this process
+
+def _autogen(key, prompt):
+    @jwt_required()
+    async def generate(request, user):
+        flask_app = request.app.state.flask
+        api_key = flask_app.config.get("GEMINI_API_KEY")
+        if not api_key:
+            return JSONResponse(autogen_route.NOT_CONFIGURED, 503)
+        # Same bucket as the Flask route; the check is one local SQLite statement
+        decision = ratelimit.check(flask_app, "autogen", f"user:{user.id}")
+        limit_headers = ratelimit.headers(decision) if decision else None
+        if decision and not decision.allowed:
+            return JSONResponse(ratelimit.TOO_MANY, 429, headers=limit_headers)
+        try:
+            data = await request.json()
+            response = await autogen_route.model(api_key).generate_content_async(prompt(data))
+            return JSONResponse({key: response.text.strip()}, headers=limit_headers)
+        except Exception as e:
+            return JSONResponse({
+                "error": str(e) if str(e) else "Unknown error occurred",
+                "type": type(e).__name__,
+                "traceback": traceback.format_exc(),
+            }, 500, headers=limit_headers)
+    return generate
+
+
+generate_title = _autogen("title", lambda data: autogen_route.title_prompt(data.get("content", "")))
+generate_description = _autogen("description", lambda data: autogen_route.description_prompt(
+    data.get("content", ""), data.get("language", ""), data.get("title", "")))
+generate_tags = _autogen("tags", lambda data: autogen_route.tags_prompt(
+    data.get("content", ""), data.get("language", ""), data.get("title", "")))
+
+
+# Live updates: an open stream costs a queue, not a thread
+
+class _LoopQueue:
+    """Change feed subscriber for a stream on the event loop. The feed thread calls put()."""
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+    def put(self, evt):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, evt)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+def _subscribe(flask_app, user_id, subscription):
+    # The first subscriber of a process reads the change log heads through the Flask session
+    with flask_app.app_context():
+        try:
+            flask_app.extensions["change_feed"].subscribe(user_id, subscription)
+        finally:
+            flask_app.extensions["sqlalchemy"].session.remove()
+
+
+@jwt_required(locations=("headers", "query_string"))
+async def events(request, user):
+    """Same stream as events_route.events; see there."""
+    try:
+        since = parse_sync_token(request.headers.get("Last-Event-ID") or request.query_params.get("since") or -1,
+                                 user.shard)
+    except ValueError:
+        return JSONResponse({"error": "Invalid Last-Event-ID"}, 400)
+
+    flask_app = request.app.state.flask
+    config = flask_app.config
+    feed = flask_app.extensions["change_feed"]
+    subscription = _LoopQueue()
+    await asyncio.to_thread(_subscribe, flask_app, user.id, subscription)
+    try:
+        async with _reader(request, user) as session:
+            if since < 0:
+                backlog, sent = [], await session.run_sync(lambda s: latest_seq(user.id, s))
+            else:
+                limit = config.get("SYNC_PAGE_SIZE", 500)
+                backlog = await session.run_sync(lambda s: events_since(user.id, since, limit, s))
+                sent = backlog[-1]["seq"] if backlog else since
+    except Exception as exc:
+        feed.unsubscribe(user.id, subscription)
+        return _database_error(exc)
+
+    heartbeat = config.get("EVENTS_HEARTBEAT_SECONDS", 15)
+    deadline = time.monotonic() + config.get("EVENTS_MAX_STREAM_SECONDS", 300)
+
+    async def stream(sent):
+        try:
+            yield "retry: 3000\n\n"
+            for evt in backlog:
+                yield format_event(evt, user.shard)
+            position = since < 0
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    evt = await subscription.get(min(heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    yield keep_alive(sync_token(sent, user.shard) if position else None)
+                    position = False
+                    continue
+                if evt["seq"] > sent:
+                    sent = evt["seq"]
+                    position = False
+                    yield format_event(evt, user.shard)
+        finally:
+            feed.unsubscribe(user.id, subscription)
+
+    return StreamingResponse(stream(sent), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+@asynccontextmanager
+async def _lifespan(app):
+    yield
+    await app.state.db.dispose()
+
+
+def create_asgi_app(config_class=Config):
+    flask_app = create_app(config_class)
+    routes = [
+        Route("/api/entries", get_entries, methods=["GET"]),
+        Route("/api/snippets", get_snippets, methods=["GET"]),
+        Route("/api/entries/{id:int}", get_entry, methods=["GET"]),
+        Route("/api/snippets/{id:int}", get_snippet, methods=["GET"]),
+    ]
+    # Optional groups follow the Flask app's ENABLED_BLUEPRINTS
+    if "autogen" in flask_app.blueprints:
+        routes += [
+            Route("/api/autogen/title", generate_title, methods=["POST"]),
+            Route("/api/autogen/description", generate_description, methods=["POST"]),
+            Route("/api/autogen/tags", generate_tags, methods=["POST"]),
+        ]
+    if "events" in flask_app.blueprints:
+        routes.append(Route("/api/events", events, methods=["GET"]))
+    # Everything else, including other methods on the paths above
+    routes.append(Mount("/", WSGIMiddleware(flask_app, workers=flask_app.config.get("ASGI_WSGI_THREADS", 8))))
+    app = Starlette(
+        routes=routes,
+        # Same policy as CORS(app) in create_app; it also answers preflights for the async routes
+        middleware=[Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])],
+        lifespan=_lifespan,
+    )
+    app.state.flask = flask_app
+    app.state.db = AsyncDatabases(flask_app)
+    return app
@@ -0,0 +1,190 @@
+# Live change notifications for GET /api/events (Server-Sent Events)
+#
+# The change log (models/changes.py) already is a durable, ordered record of every write, so
+# it doubles as the broker between gunicorn workers: each worker runs one ChangeFeed thread
+# that tails change_log and hands new rows to the streams connected to that worker. Commits
+# made in the same worker wake the thread at once; other workers' commits are picked up by
+# the periodic poll (EVENTS_POLL_INTERVAL). A real message broker could replace the polling
+# by implementing the same subscribe/unsubscribe/notify surface.
+import queue
+import threading
+from flask import current_app, has_app_context
+from sqlalchemy import and_, event, func, or_, select
+from sqlalchemy.orm import Session
+from .models.changes import DELETE, changes_since
+from .models.db_models import ChangeLog, Entry, Snippet, db
+from .models.routing import using_shard
+
+VERSION_COLUMNS = {"entry": (Entry.id, Entry.version), "snippet": (Snippet.id, Snippet.version)}
+
+
+def latest_seq(user_id, session=None):
+    """Head of the user's change log. Only a per-user position is safe to resume from: seqs
+    follow commit order per user, not across users (models/changes.py)."""
+    return (session or db.session).execute(
+        select(func.max(ChangeLog.seq)).where(ChangeLog.user_id == user_id)
+    ).scalar() or 0
+
+
+def to_events(rows, session=None):
+    """Compact notifications for change_log rows: seq, type, id, op and (for upserts) version."""
+    session = session or db.session
+    wanted = {"entry": set(), "snippet": set()}
+    for row in rows:
+        if row.op != DELETE:
+            wanted[row.item_type].add(row.item_id)
+    versions = {}
+    for item_type, ids in wanted.items():
+        if ids:
+            id_col, version_col = VERSION_COLUMNS[item_type]
+            for item_id, version in session.execute(select(id_col, version_col).where(id_col.in_(ids))):
+                versions[item_type, item_id] = version
+
+    events = []
+    for row in rows:
+        version = None if row.op == DELETE else versions.get((row.item_type, row.item_id))
+        if row.op != DELETE and version is None:
+            continue  # deleted since; its own delete row follows
+        events.append({"seq": row.seq, "type": row.item_type, "id": row.item_id, "op": row.op, "version": version})
+    return events
+
+
+def events_since(user_id, since, page_size, session=None):
+    """Events for everything after `since`, read a page at a time up to the head of the log."""
+    events = []
+    while True:
+        rows = changes_since(user_id, since, page_size, session)
+        events += to_events(rows, session)
+        if len(rows) < page_size:
+            return events
+        since = rows[-1].seq
+
+
+class ChangeFeed:
+    """Per-process fan-out of change_log rows to subscriber queues, keyed by user id."""
+
+    USERS_PER_QUERY = 200  # cursors ORed into one change_log query
+
+    def __init__(self, app, poll_interval=1.0, batch_size=1000, threaded=True):
+        self.app = app
+        self.poll_interval = poll_interval
+        self.threaded = threaded  # False: the owner calls poll() itself
+        self.batch_size = batch_size
+        self._subscribers = {}  # user_id -> set of queues
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        # (shard, user_id) -> last seq handed to the user's streams. Per user, because seqs only
+        # follow commit order per user: a global cursor would skip a row committed after another
+        # user's higher seq had been read
+        self._cursors = {}
+
+    def subscribe(self, user_id, q=None):
+        """Register a stream; events are handed to `q.put` (a new SimpleQueue by default)."""
+        q = q if q is not None else queue.SimpleQueue()
+        with self._lock:
+            if user_id not in self._subscribers:
+                self._cursors.update(((shard, user_id), seq) for shard, seq in self._heads(user_id).items())
+            self._subscribers.setdefault(user_id, set()).add(q)
+            if self.threaded and self._thread is None:
+                # Started lazily, so no thread exists yet when gunicorn forks a preloaded app
+                self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, user_id, q):
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues:
+                queues.discard(q)
+                if not queues:
+                    del self._subscribers[user_id]
+                    for shard in self._shards():
+                        self._cursors.pop((shard, user_id), None)
+
+    def notify(self):
+        """Something was committed in this process; poll now instead of at the next tick."""
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval or None)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    self.poll()
+                except Exception:
+                    self.app.logger.exception("change feed poll failed")  # retried next tick
+                finally:
+                    db.session.remove()
+
+    def _shards(self):
+        return range(len(self.app.extensions.get("db_shards") or {}) + 1)
+
+    def _heads(self, user_id):
+        # Every shard numbers its own change log (models/sharding.py)
+        heads = {}
+        for shard in self._shards():
+            with using_shard(shard):
+                heads[shard] = latest_seq(user_id)
+        return heads
+
+    def poll(self):
+        """Read each subscribed user's change_log rows past their cursor and deliver them.
+        Returns the count."""
+        with self._lock:
+            users = list(self._subscribers)
+        delivered = 0
+        for shard in self._shards():
+            with using_shard(shard):
+                for start in range(0, len(users), self.USERS_PER_QUERY):
+                    delivered += self._poll_shard(shard, users[start:start + self.USERS_PER_QUERY])
+        return delivered
+
+    def _poll_shard(self, shard, users):
+        delivered = 0
+        while True:
+            with self._lock:
+                cursors = [(user_id, self._cursors[shard, user_id]) for user_id in users
+                           if (shard, user_id) in self._cursors]
+            if not cursors:
+                break
+            # One range of idx_change_log_user_seq per user
+            rows = db.session.execute(
+                select(ChangeLog.seq, ChangeLog.user_id, ChangeLog.item_type, ChangeLog.item_id, ChangeLog.op)
+                .where(or_(*(and_(ChangeLog.user_id == user_id, ChangeLog.seq > seq) for user_id, seq in cursors)))
+                .order_by(ChangeLog.seq)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                break
+            user_of = {row.seq: row.user_id for row in rows}
+            with self._lock:
+                for evt in to_events(rows):
+                    for q in self._subscribers.get(user_of[evt["seq"]], ()):
+                        q.put(evt)
+                        delivered += 1
+                for row in rows:
+                    key = (shard, row.user_id)
+                    if key in self._cursors:  # unless the user's last stream closed meanwhile
+                        self._cursors[key] = max(self._cursors[key], row.seq)
+            if len(rows) < self.batch_size:
+                break
+        return delivered
+
+
+def init_feed(app):
+    app.extensions["change_feed"] = ChangeFeed(app, app.config.get("EVENTS_POLL_INTERVAL", 1.0))
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_feed(session):
+    if session.info.pop("changes_logged", False) and has_app_context():
+        feed = current_app.extensions.get("change_feed")
+        if feed is not None:
+            feed.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("changes_logged", None)
@@ -0,0 +1,24 @@
+# Deferred imports for heavy, optional dependencies
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Module `name`, executed on first attribute access instead of now.
+
+    For SDKs only some requests need (google.generativeai pulls in gRPC and protobuf): the app
+    starts without paying for them, and mock.patch("...module.attr") still works because the
+    patch's getattr is that first access.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
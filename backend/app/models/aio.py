@@ -0,0 +1,58 @@
+# Async engines for the ASGI entry point (app/asgi.py)
+#
+# One AsyncEngine per database the Flask app uses (primary, read replicas, shards), built from
+# the same URLs with the driver swapped for its asyncio twin: aiomysql for MySQL, aiosqlite for
+# SQLite files. Engine options are the primary's, except the pool class, which has to be the
+# async-adapted one. Engine choice mirrors models/routing.py: per-user tables on the user's
+# shard, GET reads on a replica unless the user is pinned to the primary. The async handlers
+# only read; all writes go through the Flask app and its sessions.
+import random
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from .routing import READ_METHODS, is_pinned
+from .sqlite import configure_sqlite_engine
+
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(url):
+    """`url` with its driver replaced by the asyncio one for the same database."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        raise ValueError("The async engines need a SQLite database file, not an in-memory database")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class AsyncDatabases:
+    def __init__(self, app):
+        config = app.config
+        self.app = app
+        self._options = {k: v for k, v in (config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}).items() if k != "poolclass"}
+        self._pragmas = config.get("SQLITE_PRAGMAS") or {}
+        self.primary = self._engine(config["SQLALCHEMY_DATABASE_URI"])
+        self.replicas = [self._engine(url) for url in config.get("DATABASE_REPLICA_URLS") or []]
+        self.shards = {shard: self._engine(url) for shard, url in enumerate(config.get("DATABASE_SHARD_URLS") or [], 1)}
+
+    def _engine(self, url):
+        engine = create_async_engine(async_url(url), **self._options)
+        configure_sqlite_engine(engine.sync_engine, self._pragmas)
+        return engine
+
+    def engine_for(self, method, user_id, shard):
+        """Engine serving a request's reads of per-user data."""
+        if shard:
+            return self.shards[shard]
+        if self.replicas and method in READ_METHODS and not is_pinned(self.app, user_id):
+            return random.choice(self.replicas)
+        return self.primary
+
+    def session(self, engine=None):
+        # Loaded objects outlive the session: responses are serialized after it is closed
+        return AsyncSession(engine or self.primary, expire_on_commit=False)
+
+    async def dispose(self):
+        for engine in [self.primary, *self.replicas, *self.shards.values()]:
+            await engine.dispose()
@@ -0,0 +1,135 @@
+# Per-user change log behind GET /api/sync
+#
+# Every write to entries/snippets appends (seq, user, item, op) rows to change_log. ORM writes
+# are picked up once per flush by the session hook below; set-based statements (bulk update /
+# delete, tag merges) call record_changes with their WHERE clause before they run. A client
+# keeps the last seq it has seen and asks for rows after it, so a sync reads only what changed.
+#
+# seq is assigned at INSERT time, not at commit. For a token to be safe, a user's rows must
+# become visible in seq order: otherwise a client could be handed next=N while a transaction
+# holding N-1 (e.g. one that autoflushed early in record_revision) is still open, and skip it
+# for good. So every transaction that logs changes first locks the users' rows on the change
+# log's database (lock_change_log) and keeps the lock until it commits: a user's writers take
+# their seqs one transaction after the other. Writers of different users don't wait for each
+# other.
+from datetime import datetime
+from sqlalchemy import event, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+from .db_models import ChangeLog, Entry, Snippet, User, db
+from .routing import current_shard
+
+ITEM_TYPES = {Entry: "entry", Snippet: "snippet"}
+UPSERT, DELETE = "upsert", "delete"
+
+
+def lock_change_log(session, user_ids):
+    """Lock the users' rows (their copy on the user's shard) until the transaction ends.
+
+    Called before anything is logged; a route that takes other row locks first (e.g. blob
+    refcounts) calls it up front so that every writer locks in the same order.
+    """
+    user_ids = sorted({int(user_id) for user_id in user_ids if user_id is not None})
+    if not user_ids:
+        return
+    users = User.__table__
+    session.connection(bind_arguments={"mapper": ChangeLog}).execute(
+        select(users.c.id).where(users.c.id.in_(user_ids)).order_by(users.c.id).with_for_update()
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _lock_flushed_users(session, flush_context, instances):
+    # Before the flush writes anything, so item row locks are always taken after the user's
+    lock_change_log(session, [obj.user_id for objects in (session.new, session.dirty, session.deleted)
+                              for obj in objects if type(obj) in ITEM_TYPES])
+
+
+@event.listens_for(Session, "after_flush")
+def _log_flushed_changes(session, flush_context):
+    # new/dirty/deleted still describe what this flush wrote; ids are assigned by now
+    now = datetime.utcnow()
+    rows = []
+    for objects, op, check in ((session.new, UPSERT, False), (session.dirty, UPSERT, True), (session.deleted, DELETE, False)):
+        for obj in objects:
+            item_type = ITEM_TYPES.get(type(obj))
+            if item_type is None or (check and not session.is_modified(obj)):
+                continue
+            rows.append({"user_id": obj.user_id, "item_type": item_type, "item_id": obj.id, "op": op, "created_at": now})
+    if rows:
+        session.connection().execute(insert(ChangeLog), rows)
+        session.info["changes_logged"] = True  # wakes the SSE feed after commit (app/events.py)
+
+
+def record_changes(model, condition, op=UPSERT):
+    """Log `op` for every row of `model` matching `condition`, as one INSERT ... SELECT.
+
+    For statements that bypass the ORM; call it before the UPDATE/DELETE runs, while the
+    condition still selects the affected rows.
+    """
+    lock_change_log(db.session, db.session.execute(select(model.user_id).where(condition).distinct()).scalars())
+    selected = select(model.user_id, literal(ITEM_TYPES[model]), model.id, literal(op), literal(datetime.utcnow()))
+    db.session.execute(
+        insert(ChangeLog).from_select(["user_id", "item_type", "item_id", "op", "created_at"], selected.where(condition))
+    )
+    db.session.info["changes_logged"] = True
+
+
+def log_inserted(model, user_id, item_ids):
+    """Log creation of rows inserted with Core statements (batch create), one multi-row INSERT."""
+    lock_change_log(db.session, [user_id])
+    now = datetime.utcnow()
+    db.session.execute(insert(ChangeLog).values([
+        {"user_id": user_id, "item_type": ITEM_TYPES[model], "item_id": item_id, "op": UPSERT, "created_at": now}
+        for item_id in item_ids
+    ]))
+    db.session.info["changes_logged"] = True
+
+
+def sync_token(seq, shard=None):
+    """Client-facing form of a change log position. Each shard numbers its own log, so tokens
+    from shards other than the primary carry the shard: "<shard>:<seq>"."""
+    shard = (current_shard() if shard is None else shard) or 0
+    return f"{shard}:{seq}" if shard else str(seq)
+
+
+def parse_sync_token(token, shard=None):
+    """The seq a token stands for on the user's current shard. A token issued by another shard
+    (the user has been moved since) maps to 0, i.e. a full resync. Raises ValueError."""
+    issuer, _, seq = str(token).rpartition(":")
+    seq = int(seq)
+    shard = (current_shard() if shard is None else shard) or 0
+    return seq if (int(issuer) if issuer else 0) == shard else 0
+
+
+def changes_since(user_id, since, limit, session=None):
+    """Change log rows after token `since`, oldest first, at most `limit`."""
+    return (session or db.session).execute(
+        select(ChangeLog.seq, ChangeLog.item_type, ChangeLog.item_id, ChangeLog.op)
+        .where(ChangeLog.user_id == user_id, ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit)
+    ).all()
+
+
+def compact_change_log(batch_size=1000):
+    """Drop rows superseded by a later row for the same item.
+
+    Sync only needs the latest op per item, so this keeps the log at about one row per live
+    or deleted item without changing what any token returns. Runs in batches (MySQL can't
+    DELETE from a table it selects from in the same statement). Returns the rows removed.
+    """
+    later = aliased(ChangeLog)
+    removed = 0
+    while True:
+        seqs = db.session.execute(
+            select(ChangeLog.seq)
+            .join(later, (later.item_type == ChangeLog.item_type) & (later.item_id == ChangeLog.item_id)
+                  & (later.seq > ChangeLog.seq))
+            .distinct()
+            .limit(batch_size)
+        ).scalars().all()
+        if not seqs:
+            return removed
+        db.session.execute(ChangeLog.__table__.delete().where(ChangeLog.seq.in_(seqs)))
+        db.session.commit()
+        removed += len(seqs)
@@ -1,49 +1,125 @@
 # Database models
 from flask_sqlalchemy import SQLAlchemy
+import hashlib
+from sqlalchemy import event, exists, inspect, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
+from .types import CompressedText
+from .routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class Entry(db.Model):
     __tablename__ = "entries"
 
     id = db.Column(db.Integer, primary_key=True)  
     title = db.Column(db.String(255), nullable=False, index=True)  
-    content = db.Column(db.Text, nullable=False)
     tags = db.Column(db.String(500), index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False)  # bumped on every UPDATE (optimistic locking)
 
     # Foreign key to User
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Relationship
     user = db.relationship("User", back_populates="entries")
 
+    __mapper_args__ = {"version_id_col": version}
+
+    # Large body lives in entry_bodies so scans over the metadata columns stay narrow
+    body = db.relationship("EntryBody", back_populates="entry", uselist=False, cascade="all, delete-orphan", lazy="select")
+
+    @hybrid_property
+    def content(self):
+        return self.body.content if self.body is not None else None
+
+    @content.setter
+    def content(self, value):
+        if self.body is None:
+            self.body = EntryBody(content=value)
+        elif self.body.content != value:
+            self.body.content = value
+            self.updated_at = datetime.utcnow()  # the entries row itself is otherwise untouched
+
+    @content.expression
+    def content(cls):
+        return select(EntryBody.content).where(EntryBody.entry_id == cls.id).scalar_subquery()
+
     def __repr__(self):
         return f"<Entry {self.title}>"
 
 
+class EntryBody(db.Model):
+    __tablename__ = "entry_bodies"
+
+    entry_id = db.Column(db.Integer, db.ForeignKey("entries.id", ondelete="CASCADE"), primary_key=True)
+    content = db.Column(CompressedText, nullable=False)
+
+    entry = db.relationship("Entry", back_populates="body")
+
+    def __repr__(self):
+        return f"<EntryBody {self.entry_id}>"
+
+
 class Snippet(db.Model):
     __tablename__ = "snippets"
 
     id = db.Column(db.Integer, primary_key=True)  
     title = db.Column(db.String(255), nullable=False, index=True)  
-    code = db.Column(db.Text, nullable=False)
     description = db.Column(db.String(255), nullable=False, index=False)
     language = db.Column(db.String(50), nullable=False, index=True) 
     tags = db.Column(db.String(500), index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False)  # bumped on every UPDATE (optimistic locking)
 
     # Foreign key to User
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Relationship
     user = db.relationship("User", back_populates="snippets")
 
+    __mapper_args__ = {"version_id_col": version}
+
+    # Code is stored once per distinct content in code_blobs and shared between snippets
+    code_hash = db.Column(db.String(64), db.ForeignKey("code_blobs.hash"), nullable=False, index=True)
+    blob = db.relationship("CodeBlob", lazy="select")
+
+    @hybrid_property
+    def code(self):
+        pending = self.__dict__.get("_pending_code")
+        if pending is not None:
+            return pending
+        return self.blob.code if self.blob is not None else None
+
+    @code.setter
+    def code(self, value):
+        value = normalize_code(value)
+        digest = code_digest(value)
+        if digest != self.code_hash:
+            # The blob itself is acquired/released at flush time (see the mapper events below)
+            self._pending_code = value
+            self.code_hash = digest
+
+    @code.expression
+    def code(cls):
+        return select(CodeBlob.code).where(CodeBlob.hash == cls.code_hash).scalar_subquery()
+
     def __repr__(self):
         return f"<Snippet {self.title}>"
+
+
+class CodeBlob(db.Model):
+    __tablename__ = "code_blobs"
+
+    hash = db.Column(db.String(64), primary_key=True)  # sha256 of the normalized code
+    code = db.Column(CompressedText, nullable=False)
+    refcount = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CodeBlob {self.hash[:12]} x{self.refcount}>"
     
 class User(db.Model):
     __tablename__ = "users"
@@ -53,10 +129,168 @@ class User(db.Model):
     username = db.Column(db.String(150), unique=True, nullable=False, index=True)
     password_hashed = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set by DELETE /api/account; the purge-accounts worker removes the data and the row later
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
+    # Shard directory (models/sharding.py): where this user's data lives, and whether it is moving
+    shard = db.Column(db.SmallInteger, nullable=False, default=0, server_default="0")
+    moving = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    # Relationships. passive_deletes: deleting a user never loads the children, the database
+    # cascades (ON DELETE CASCADE). That would skip the snippet hooks that keep code blob
+    # refcounts, so ORM deletes of users are refused (_refuse_user_delete): accounts are removed
+    # only by tasks.purge_deleted_users
+    snippets = db.relationship("Snippet", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    entries = db.relationship("Entry", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    revisions = db.relationship("Revision", cascade="all, delete-orphan", passive_deletes=True)
+
+    def __repr__(self):
+        return f"<User {self.username}>"
+
+
+class Revision(db.Model):
+    __tablename__ = "revisions"
+    __table_args__ = (db.UniqueConstraint("item_type", "item_id", "number", name="uq_revisions_item_number"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    item_type = db.Column(db.String(10), nullable=False)  # "entry" or "snippet"
+    item_id = db.Column(db.Integer, nullable=False)
+    number = db.Column(db.Integer, nullable=False)  # 1 = oldest known version
+    is_snapshot = db.Column(db.Boolean, nullable=False, default=False)
+    payload = db.Column(CompressedText, nullable=False)  # JSON, see models/revisions.py
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Foreign key to User
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<Revision {self.item_type} {self.item_id} #{self.number}>"
+
+
+class IdSequence(db.Model):
+    """Per-database high-water mark of the entry/snippet ids handed out with sharding on (models/sharding.py)."""
+    __tablename__ = "id_sequences"
+
+    name = db.Column(db.String(50), primary_key=True)  # table the ids are for
+    last_id = db.Column(db.Integer, nullable=False)  # highest id allocated; never lowered
+
+
+class ChangeLog(db.Model):
+    """One row per created/updated/deleted entry or snippet, in commit order per user (see models/changes.py)."""
+    __tablename__ = "change_log"
+    __table_args__ = (
+        db.Index("idx_change_log_user_seq", "user_id", "seq"),
+        db.Index("idx_change_log_item", "item_type", "item_id"),
+    )
+
+    seq = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)  # the sync token
+    item_type = db.Column(db.String(10), nullable=False)  # "entry" or "snippet"
+    item_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(6), nullable=False)  # "upsert" or "delete"
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    # Relationships
-    snippets = db.relationship("Snippet", back_populates="user", cascade="all, delete-orphan")
-    entries = db.relationship("Entry", back_populates="user", cascade="all, delete-orphan")
+    # Foreign key to User
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     def __repr__(self):
-        return f"<User {self.username}>"
\ No newline at end of file
+        return f"<ChangeLog #{self.seq} {self.op} {self.item_type} {self.item_id}>"
+
+
+# Content-addressed code blobs
+
+def normalize_code(code):
+    """Canonical form used for hashing and storage (line endings only, content is untouched)."""
+    return code.replace("\r\n", "\n").replace("\r", "\n") if code is not None else None
+
+
+def code_digest(code):
+    return hashlib.sha256(code.encode("utf-8")).hexdigest() if code is not None else None
+
+
+def acquire_blob(connection, digest, code, count=1):
+    """Add `count` references to a blob, creating it if needed.
+
+    The refcount moves with single atomic statements, so concurrent writers never need a
+    lock beyond the row lock the UPDATE/upsert itself takes.
+    """
+    blobs = CodeBlob.__table__
+    result = connection.execute(
+        blobs.update().where(blobs.c.hash == digest).values(refcount=blobs.c.refcount + count)
+    )
+    if result.rowcount:
+        return
+    # Not there (or just garbage-collected): insert, folding into a concurrent insert if we race one
+    values = {"hash": digest, "code": code, "refcount": count}
+    if connection.dialect.name == "mysql":
+        stmt = mysql.insert(blobs).values(values).on_duplicate_key_update(refcount=blobs.c.refcount + count)
+    elif connection.dialect.name == "sqlite":
+        stmt = sqlite.insert(blobs).values(values).on_conflict_do_update(
+            index_elements=[blobs.c.hash], set_={"refcount": blobs.c.refcount + count}
+        )
+    else:
+        stmt = blobs.insert().values(values)
+    connection.execute(stmt)
+
+
+def release_blob(connection, digest, count=1):
+    """Drop `count` references and delete the blob once nothing points at it."""
+    release_blobs(connection, {digest: count})
+
+
+def release_blobs(connection, counts):
+    """Drop references for many blobs at once ({hash: count}) and collect the unreferenced ones.
+
+    The delete re-checks both the refcount and the snippets table in the same statement,
+    so a concurrent acquire (which holds the row lock until it commits) or a snippet removed
+    by a database-level cascade can never leave a dangling reference.
+    """
+    if not counts:
+        return
+    blobs = CodeBlob.__table__
+    for digest, count in counts.items():
+        connection.execute(
+            blobs.update().where(blobs.c.hash == digest).values(refcount=blobs.c.refcount - count)
+        )
+    collect_blobs(connection, list(counts))
+
+
+def collect_blobs(connection, digests=None):
+    """Delete unreferenced blobs (all of them when `digests` is None). Returns the count."""
+    blobs = CodeBlob.__table__
+    snippets = Snippet.__table__
+    stmt = blobs.delete().where(
+        blobs.c.refcount <= 0,
+        ~exists().where(snippets.c.code_hash == blobs.c.hash),
+    )
+    if digests is not None:
+        stmt = stmt.where(blobs.c.hash.in_(digests))
+    return connection.execute(stmt).rowcount
+
+
+@event.listens_for(Snippet, "before_insert")
+def _acquire_snippet_blob(mapper, connection, target):
+    acquire_blob(connection, target.code_hash, target._pending_code)
+
+
+@event.listens_for(Snippet, "before_update")
+def _acquire_changed_snippet_blob(mapper, connection, target):
+    history = inspect(target).attrs.code_hash.history
+    if history.added and history.added[0]:
+        acquire_blob(connection, history.added[0], target._pending_code)
+
+
+@event.listens_for(Snippet, "after_update")
+def _release_replaced_snippet_blob(mapper, connection, target):
+    # After the row points at the new hash, so the old blob can actually be collected
+    history = inspect(target).attrs.code_hash.history
+    if history.deleted and history.deleted[0]:
+        release_blob(connection, history.deleted[0])
+
+
+@event.listens_for(Snippet, "after_delete")
+def _release_snippet_blob(mapper, connection, target):
+    release_blob(connection, target.code_hash)
+
+
+@event.listens_for(User, "before_delete")
+def _refuse_user_delete(mapper, connection, target):
+    raise RuntimeError("Users are removed by tasks.purge_deleted_users, which releases their code blobs")
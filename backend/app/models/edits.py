@@ -0,0 +1,22 @@
+# Range edits for partial body updates
+#
+# A client editing one line of a large entry sends {"start", "end", "text"} ranges against the
+# version it last read instead of the whole body, so request size follows the size of the edit.
+
+
+def apply_edits(text, edits):
+    """Apply TextEdit ranges to `text` and return the result.
+
+    Offsets are Unicode code points into the *base* text (not shifted by earlier edits), so
+    edits must be sorted and must not overlap. Raises ValueError otherwise.
+    """
+    out = []
+    pos = 0
+    for edit in edits:
+        if edit.end < edit.start or edit.start < pos or edit.end > len(text):
+            raise ValueError(f"edit [{edit.start}, {edit.end}) is out of order or out of range")
+        out.append(text[pos:edit.start])
+        out.append(edit.text)
+        pos = edit.end
+    out.append(text[pos:])
+    return "".join(out)
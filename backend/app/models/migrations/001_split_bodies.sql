@@ -0,0 +1,27 @@
+-- Move the large TEXT bodies out of the hot entries/snippets rows.
+-- entries.content -> entry_bodies.content, snippets.code -> snippet_bodies.code (1:1, keyed by the parent id).
+-- Run once against an existing devlog_db created from the original queries.sql.
+
+USE devlog_db;
+
+CREATE TABLE entry_bodies (
+    entry_id INT PRIMARY KEY,
+    content TEXT NOT NULL,
+    FOREIGN KEY (entry_id) REFERENCES entries(id) ON DELETE CASCADE
+);
+
+CREATE TABLE snippet_bodies (
+    snippet_id INT PRIMARY KEY,
+    code TEXT NOT NULL,
+    FOREIGN KEY (snippet_id) REFERENCES snippets(id) ON DELETE CASCADE
+);
+
+INSERT INTO entry_bodies (entry_id, content) SELECT id, content FROM entries;
+INSERT INTO snippet_bodies (snippet_id, code) SELECT id, code FROM snippets;
+
+ALTER TABLE entries DROP COLUMN content;
+ALTER TABLE snippets DROP COLUMN code;
+
+-- Rebuild so the metadata rows are repacked without the old inline/off-page bodies
+OPTIMIZE TABLE entries;
+OPTIMIZE TABLE snippets;
@@ -0,0 +1,10 @@
+-- Bodies are now written through CompressedText: large values are stored zlib-compressed
+-- and base64-encoded behind a one-character marker, small values stay plain text.
+-- Existing rows are valid as-is; compress them afterwards, online, with:
+--     flask --app app:create_app compress-bodies
+-- MEDIUMTEXT lifts the 64 KB TEXT cap for bodies that don't compress well.
+
+USE devlog_db;
+
+ALTER TABLE entry_bodies MODIFY content MEDIUMTEXT NOT NULL;
+ALTER TABLE snippet_bodies MODIFY code MEDIUMTEXT NOT NULL;
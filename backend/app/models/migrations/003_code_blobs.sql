@@ -0,0 +1,25 @@
+-- Deduplicate snippet code into content-addressed code_blobs (sha256 of the normalized code).
+-- Hashing happens in the app because bodies may already be stored compressed, so this runs in three steps:
+--   1. this file's first half
+--   2. flask --app app:create_app migrate-code-blobs
+--   3. this file's second half
+
+USE devlog_db;
+
+-- Step 1 -------------------------------------------------------------------
+CREATE TABLE code_blobs (
+    hash CHAR(64) PRIMARY KEY,
+    code MEDIUMTEXT NOT NULL,
+    refcount INT NOT NULL DEFAULT 0
+);
+
+ALTER TABLE snippets ADD COLUMN code_hash CHAR(64) NULL, ADD INDEX ix_snippets_code_hash (code_hash);
+
+-- Step 2: flask --app app:create_app migrate-code-blobs -------------------
+
+-- Step 3 -------------------------------------------------------------------
+ALTER TABLE snippets
+    MODIFY code_hash CHAR(64) NOT NULL,
+    ADD CONSTRAINT fk_snippets_code_hash FOREIGN KEY (code_hash) REFERENCES code_blobs(hash);
+
+DROP TABLE snippet_bodies;
@@ -0,0 +1,19 @@
+-- Revision history for entries and snippets.
+-- Revision 1 snapshots the state before an item's first edit; afterwards every
+-- REVISION_SNAPSHOT_INTERVAL-th revision is a full snapshot and the rest store line deltas.
+
+USE devlog_db;
+
+CREATE TABLE revisions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    item_type VARCHAR(10) NOT NULL,
+    item_id INT NOT NULL,
+    number INT NOT NULL,
+    is_snapshot BOOLEAN NOT NULL DEFAULT FALSE,
+    payload MEDIUMTEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    user_id INT NOT NULL,
+    UNIQUE KEY uq_revisions_item_number (item_type, item_id, number),
+    INDEX ix_revisions_user_id (user_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
@@ -0,0 +1,35 @@
+-- OPTIONAL schema variant: cluster entries and snippets on (user_id, id).
+--
+-- InnoDB stores rows in primary-key order. With a global AUTO_INCREMENT id, one user's rows
+-- are spread over the whole table and every per-user list/search is random I/O; with
+-- (user_id, id) they sit next to each other and the same queries become one range scan.
+--
+-- Public ids do not change: `id` stays AUTO_INCREMENT and globally unique (uq_*_id), and
+-- every app query already filters on user_id, so no code change is needed.
+-- Secondary indexes grow by 4 bytes per row (they carry the wider primary key).
+--
+-- The ALTERs rebuild each table; run during a quiet period or with pt-online-schema-change / gh-ost.
+-- Foreign key names below are the InnoDB defaults for the tables created by queries.sql.
+
+USE devlog_db;
+
+-- entries ------------------------------------------------------------------
+ALTER TABLE entry_bodies DROP FOREIGN KEY entry_bodies_ibfk_1;
+
+ALTER TABLE entries
+    ADD UNIQUE KEY uq_entries_id (id),
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (user_id, id);
+
+ALTER TABLE entry_bodies
+    ADD CONSTRAINT entry_bodies_ibfk_1 FOREIGN KEY (entry_id) REFERENCES entries(id) ON DELETE CASCADE;
+
+-- snippets -----------------------------------------------------------------
+ALTER TABLE snippets
+    ADD UNIQUE KEY uq_snippets_id (id),
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (user_id, id);
+
+-- To revert (drop/re-add entry_bodies_ibfk_1 around the entries change, as above):
+--   ALTER TABLE entries  DROP PRIMARY KEY, ADD PRIMARY KEY (id), DROP INDEX uq_entries_id;
+--   ALTER TABLE snippets DROP PRIMARY KEY, ADD PRIMARY KEY (id), DROP INDEX uq_snippets_id;
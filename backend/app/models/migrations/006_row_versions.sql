@@ -0,0 +1,8 @@
+-- Row version for optimistic concurrency control. SQLAlchemy (version_id_col) adds
+-- "AND version = <read version>" to every UPDATE and bumps it, so a concurrent edit makes
+-- the UPDATE match no row and the request fails with 409 instead of silently losing data.
+
+USE devlog_db;
+
+ALTER TABLE entries ADD COLUMN version INT NOT NULL DEFAULT 1;
+ALTER TABLE snippets ADD COLUMN version INT NOT NULL DEFAULT 1;
@@ -0,0 +1,12 @@
+-- Deferred account deletion. DELETE /api/account only sets users.deleted_at; the
+-- `flask purge-accounts` worker then removes the user's snippets, entries and history in
+-- small batches and finally the user row, instead of one transaction over everything.
+--
+-- The foreign keys to users/entries already use ON DELETE CASCADE (see queries.sql), so a
+-- user row removed by hand still takes its rows with it; run `flask gc-blobs` afterwards to
+-- fix code blob refcounts in that case.
+
+USE devlog_db;
+
+ALTER TABLE users ADD COLUMN deleted_at DATETIME NULL;
+CREATE INDEX idx_users_deleted_at ON users (deleted_at);
@@ -0,0 +1,24 @@
+-- Change log behind GET /api/sync. Every entry/snippet create, update and delete appends
+-- a row; clients pass the last seq they saw and get only what changed after it. Deletes
+-- stay visible as "delete" rows (tombstones). `flask compact-change-log` drops rows that
+-- a later change to the same item supersedes.
+
+USE devlog_db;
+
+CREATE TABLE change_log (
+    seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+    item_type VARCHAR(10) NOT NULL,
+    item_id INT NOT NULL,
+    op VARCHAR(6) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    user_id INT NOT NULL,
+    INDEX idx_change_log_user_seq (user_id, seq),
+    INDEX idx_change_log_item (item_type, item_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Existing items count as created before the first token, so a sync from 0 returns them
+INSERT INTO change_log (user_id, item_type, item_id, op)
+SELECT user_id, 'entry', id, 'upsert' FROM entries ORDER BY id;
+INSERT INTO change_log (user_id, item_type, item_id, op)
+SELECT user_id, 'snippet', id, 'upsert' FROM snippets ORDER BY id;
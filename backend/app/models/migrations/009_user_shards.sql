@@ -0,0 +1,11 @@
+-- Shard directory. users.shard names the database (0 = this one, n = the nth entry of
+-- DATABASE_SHARD_URLS) that holds the user's entries, snippets, bodies, blobs, revisions and
+-- change log; users.moving is set while `flask move-user` copies them to another shard.
+-- Every shard database gets the full schema (`flask --app app:create_app init-db`); existing
+-- users stay on shard 0.
+
+USE devlog_db;
+
+ALTER TABLE users
+    ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0,
+    ADD COLUMN moving BOOLEAN NOT NULL DEFAULT FALSE;
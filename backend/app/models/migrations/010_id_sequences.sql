@@ -0,0 +1,16 @@
+-- High-water marks for entry/snippet ids with sharding on (see models/sharding.py). A shard
+-- hands out ids above its mark, which only goes up, so ids of deleted rows or of users moved to
+-- another shard are never issued again. Run on the primary and on every shard database; the
+-- marks start at the ids each database already holds (the app creates missing rows the same way).
+
+USE devlog_db;
+
+CREATE TABLE id_sequences (
+    name VARCHAR(50) PRIMARY KEY,
+    last_id INT NOT NULL
+);
+
+INSERT INTO id_sequences (name, last_id)
+SELECT 'entries', COALESCE(MAX(id), 0) FROM entries
+UNION ALL
+SELECT 'snippets', COALESCE(MAX(id), 0) FROM snippets;
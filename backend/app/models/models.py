@@ -1,12 +1,13 @@
-from pydantic import BaseModel, ConfigDict
-from datetime import date
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from datetime import date, datetime
+from typing import Any
 
 class CreateSnippetRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     title: str
     language: str
-    snippet: str
+    snippet: str = Field(serialization_alias="code")  # model_dump(by_alias=True) gives Snippet kwargs
     description: str
     tags: str | None = None
 
@@ -17,6 +18,20 @@ class CreateEntryRequest(BaseModel):
     content: str
     tags: str | None = None
 
+class BatchRequest(BaseModel):
+    """Items are validated one at a time, so an invalid item fails alone and the rest are created."""
+    model_config = ConfigDict(extra="forbid")
+
+    items: list[Any] = Field(min_length=1)
+
+class TextEdit(BaseModel):
+    """Replace characters [start, end) of the stored body, as of the request's base version, with `text`."""
+    model_config = ConfigDict(extra="forbid")
+
+    start: int = Field(ge=0)
+    end: int = Field(ge=0)
+    text: str = ""
+
 class UpdateSnippetRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -26,6 +41,8 @@ class UpdateSnippetRequest(BaseModel):
     snippet: str | None = None
     tags: str | None = None
     description: str | None = None
+    edits: list[TextEdit] | None = None  # range edits to `snippet` instead of the whole code
+    version: int | None = None  # expected current version; stale -> 409
 
 class UpdateEntryRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -34,10 +51,137 @@ class UpdateEntryRequest(BaseModel):
     title: str | None = None
     content: str | None = None
     tags: str | None = None
+    edits: list[TextEdit] | None = None  # range edits to `content` instead of the whole body
+    version: int | None = None  # expected current version; stale -> 409
 
 class CreateUserRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     email: str
     username: str
-    password: str
\ No newline at end of file
+    password: str
+
+class EntryFilter(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    tag: str | None = None
+    title: str | None = None
+
+class SnippetFilter(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    tag: str | None = None
+    title: str | None = None
+    language: str | None = None
+
+class EntryBulkFields(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    title: str | None = None
+    tags: str | None = None
+
+class SnippetBulkFields(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    title: str | None = None
+    language: str | None = None
+    tags: str | None = None
+    description: str | None = None
+
+class BulkEntriesRequest(BaseModel):
+    """Select entries by "ids" or by "filter" (exactly one); "set" is only used by bulk update."""
+    model_config = ConfigDict(extra="forbid")
+
+    ids: list[int] | None = None
+    filter: EntryFilter | None = None
+    set: EntryBulkFields | None = None
+
+class BulkSnippetsRequest(BaseModel):
+    """Select snippets by "ids" or by "filter" (exactly one); "set" is only used by bulk update."""
+    model_config = ConfigDict(extra="forbid")
+
+    ids: list[int] | None = None
+    filter: SnippetFilter | None = None
+    set: SnippetBulkFields | None = None
+
+class RenameTagRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    from_tag: str = Field(alias="from")
+    to_tag: str = Field(alias="to")
+
+class MergeTagsRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    sources: list[str]
+    target: str
+
+# Responses, built straight from ORM objects (from_attributes) and serialized by pydantic-core
+
+class EntryResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    content: str
+    tags: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    version: int
+
+class SnippetResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    snippet: str = Field(validation_alias="code")
+    language: str
+    tags: str | None = None
+    description: str
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    version: int
+
+class EntrySummary(BaseModel):
+    """An entry without its body, for list views (the body is read from entry_bodies only on detail routes)."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    tags: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    version: int
+
+class SnippetSummary(EntrySummary):
+    language: str
+    description: str | None = None
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class BootstrapResponse(BaseModel):
+    username: str
+    counts: dict[str, int]
+    recent_tags: list[TagCount]
+    entries: list[EntrySummary]
+    snippets: list[SnippetSummary]
+    sync: str  # change log position: `since` for /api/sync, Last-Event-ID for /api/events
+
+class SyncDeleted(BaseModel):
+    entries: list[int]
+    snippets: list[int]
+
+class SyncResponse(BaseModel):
+    entries: list[EntryResponse]
+    snippets: list[SnippetResponse]
+    deleted: SyncDeleted
+    next: str  # `since` for the next call
+    has_more: bool
+
+# Building an adapter compiles its validator and serializer, so list adapters are made once here
+ENTRY_LIST = TypeAdapter(list[EntryResponse])
+SNIPPET_LIST = TypeAdapter(list[SnippetResponse])
+ENTRY_SUMMARIES = TypeAdapter(list[EntrySummary])
+SNIPPET_SUMMARIES = TypeAdapter(list[SnippetSummary])
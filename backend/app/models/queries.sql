@@ -2,7 +2,12 @@ CREATE DATABASE IF NOT EXISTS devlog_db;
 
 USE devlog_db;
 -- Drop tables if they exist (for a clean start)
+DROP TABLE IF EXISTS id_sequences;
+DROP TABLE IF EXISTS change_log;
+DROP TABLE IF EXISTS revisions;
+DROP TABLE IF EXISTS entry_bodies;
 DROP TABLE IF EXISTS snippets;
+DROP TABLE IF EXISTS code_blobs;
 DROP TABLE IF EXISTS entries;
 DROP TABLE IF EXISTS users;
 
@@ -12,35 +17,92 @@ CREATE TABLE users (
     email VARCHAR(255) NOT NULL UNIQUE,
     username VARCHAR(150) NOT NULL UNIQUE,
     password_hashed VARCHAR(255) NOT NULL,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    deleted_at DATETIME NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    moving BOOLEAN NOT NULL DEFAULT FALSE,
+    INDEX idx_users_deleted_at (deleted_at)
 );
 
 -- Create the entries table
 CREATE TABLE entries (
     id INT AUTO_INCREMENT PRIMARY KEY,
     title VARCHAR(255) NOT NULL,
-    content TEXT NOT NULL,
     tags VARCHAR(500),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 1,
     user_id INT NOT NULL,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- Snippet code is stored once per distinct (line-ending normalized) content, keyed by its sha256.
+-- refcount = number of snippets pointing at the blob; the app deletes a blob when it reaches 0.
+CREATE TABLE code_blobs (
+    hash CHAR(64) PRIMARY KEY,
+    code MEDIUMTEXT NOT NULL,
+    refcount INT NOT NULL DEFAULT 0
+);
+
 -- Create the snippets table
 CREATE TABLE snippets (
     id INT AUTO_INCREMENT PRIMARY KEY,
     title VARCHAR(255) NOT NULL,
-    code TEXT NOT NULL,
     description VARCHAR(255) NOT NULL,
     language VARCHAR(50) NOT NULL,
     tags VARCHAR(500),
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    version INT NOT NULL DEFAULT 1,
+    user_id INT NOT NULL,
+    code_hash CHAR(64) NOT NULL,
+    INDEX ix_snippets_code_hash (code_hash),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (code_hash) REFERENCES code_blobs(hash)
+);
+
+-- Large bodies are kept out of the metadata rows (joined 1:1 on the parent id).
+-- Values over BODY_COMPRESSION_THRESHOLD are stored compressed by the app (see models/types.py).
+CREATE TABLE entry_bodies (
+    entry_id INT PRIMARY KEY,
+    content MEDIUMTEXT NOT NULL,
+    FOREIGN KEY (entry_id) REFERENCES entries(id) ON DELETE CASCADE
+);
+
+-- Edit history (line deltas between periodic full snapshots, see models/revisions.py)
+CREATE TABLE revisions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    item_type VARCHAR(10) NOT NULL,
+    item_id INT NOT NULL,
+    number INT NOT NULL,
+    is_snapshot BOOLEAN NOT NULL DEFAULT FALSE,
+    payload MEDIUMTEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     user_id INT NOT NULL,
+    UNIQUE KEY uq_revisions_item_number (item_type, item_id, number),
+    INDEX ix_revisions_user_id (user_id),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- Sync change log: one row per entry/snippet write, seq is the client's sync token
+CREATE TABLE change_log (
+    seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+    item_type VARCHAR(10) NOT NULL,
+    item_id INT NOT NULL,
+    op VARCHAR(6) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    user_id INT NOT NULL,
+    INDEX idx_change_log_user_seq (user_id, seq),
+    INDEX idx_change_log_item (item_type, item_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Id high-water marks per table, used for entry/snippet ids when sharding is on
+CREATE TABLE id_sequences (
+    name VARCHAR(50) PRIMARY KEY,
+    last_id INT NOT NULL
+);
+
 -- Insert dummy users
 INSERT INTO users (email, username, password_hashed) VALUES
 ('test@gmail.com', 'yshnyk', 'yshnyk@321'),
@@ -50,18 +112,39 @@ INSERT INTO users (email, username, password_hashed) VALUES
 ('sara@example.com', 'sara_k', 'sara@999');
 
 -- Insert dummy entries
-INSERT INTO entries (title, content, tags, user_id) VALUES
-('Daily Journal', 'Wrote some Flask APIs today.', 'flask,python,api', 1),
-('Grocery List', 'Milk, Bread, Eggs, Butter', 'personal,list', 2),
-('Travel Notes', 'Visited Goa. Amazing beaches!', 'travel,goa', 3),
-('Workout Log', 'Pushups: 30, Squats: 40', 'fitness,health', 1),
-('Book Summary', 'Summarized "Deep Work" by Cal Newport', 'books,productivity', 4);
+INSERT INTO entries (title, tags, user_id) VALUES
+('Daily Journal', 'flask,python,api', 1),
+('Grocery List', 'personal,list', 2),
+('Travel Notes', 'travel,goa', 3),
+('Workout Log', 'fitness,health', 1),
+('Book Summary', 'books,productivity', 4);
+
+INSERT INTO entry_bodies (entry_id, content) VALUES
+(1, 'Wrote some Flask APIs today.'),
+(2, 'Milk, Bread, Eggs, Butter'),
+(3, 'Visited Goa. Amazing beaches!'),
+(4, 'Pushups: 30, Squats: 40'),
+(5, 'Summarized "Deep Work" by Cal Newport');
 
 -- Insert dummy snippets
-INSERT INTO snippets (title, code, description, language, tags, user_id) VALUES
-('Hello World in Python', 'print("Hello, World!")', 'Basic Python print example', 'Python', 'beginner,python', 1),
-('Flask Route Example', '@app.route("/home")\ndef home():\n    return "Welcome!"', 'Simple Flask route example', 'Python', 'flask,api', 1),
-('Bubble Sort', 'def bubble_sort(arr):\n    ...', 'Sorting algorithm using bubblesort', 'Python', 'algorithm,sorting', 2),
-('Basic HTML Page', '<!DOCTYPE html><html><body><h1>Hello!</h1></body></html>', 'Simple HTML structure', 'HTML', 'frontend,html', 3),
-('SQL Select', 'SELECT * FROM users WHERE id=1;', 'Fetch data from users table', 'SQL', 'database,mysql', 4),
-('JS Alert', 'alert("Hello!");', 'Simple JavaScript alert example', 'JavaScript', 'frontend,js', 5);
+INSERT INTO code_blobs (hash, code, refcount) VALUES
+(SHA2('print("Hello, World!")', 256), 'print("Hello, World!")', 1),
+(SHA2('@app.route("/home")\ndef home():\n    return "Welcome!"', 256), '@app.route("/home")\ndef home():\n    return "Welcome!"', 1),
+(SHA2('def bubble_sort(arr):\n    ...', 256), 'def bubble_sort(arr):\n    ...', 1),
+(SHA2('<!DOCTYPE html><html><body><h1>Hello!</h1></body></html>', 256), '<!DOCTYPE html><html><body><h1>Hello!</h1></body></html>', 1),
+(SHA2('SELECT * FROM users WHERE id=1;', 256), 'SELECT * FROM users WHERE id=1;', 1),
+(SHA2('alert("Hello!");', 256), 'alert("Hello!");', 1);
+
+INSERT INTO snippets (title, description, language, tags, user_id, code_hash) VALUES
+('Hello World in Python', 'Basic Python print example', 'Python', 'beginner,python', 1, SHA2('print("Hello, World!")', 256)),
+('Flask Route Example', 'Simple Flask route example', 'Python', 'flask,api', 1, SHA2('@app.route("/home")\ndef home():\n    return "Welcome!"', 256)),
+('Bubble Sort', 'Sorting algorithm using bubblesort', 'Python', 'algorithm,sorting', 2, SHA2('def bubble_sort(arr):\n    ...', 256)),
+('Basic HTML Page', 'Simple HTML structure', 'HTML', 'frontend,html', 3, SHA2('<!DOCTYPE html><html><body><h1>Hello!</h1></body></html>', 256)),
+('SQL Select', 'Fetch data from users table', 'SQL', 'database,mysql', 4, SHA2('SELECT * FROM users WHERE id=1;', 256)),
+('JS Alert', 'Simple JavaScript alert example', 'JavaScript', 'frontend,js', 5, SHA2('alert("Hello!");', 256));
+
+-- Seed the sync change log with the dummy rows
+INSERT INTO change_log (user_id, item_type, item_id, op)
+SELECT user_id, 'entry', id, 'upsert' FROM entries ORDER BY id;
+INSERT INTO change_log (user_id, item_type, item_id, op)
+SELECT user_id, 'snippet', id, 'upsert' FROM snippets ORDER BY id;
@@ -0,0 +1,139 @@
+# Revision history for entries and snippets
+#
+# Each update stores the full (small) metadata plus a line-based delta of the body against
+# the previous version. Every SNAPSHOT_INTERVAL-th revision stores the whole body instead,
+# so rebuilding any version applies at most SNAPSHOT_INTERVAL - 1 deltas.
+import json
+from difflib import SequenceMatcher
+from flask import current_app
+from sqlalchemy import func
+from .db_models import Revision, db
+
+# item_type -> (body attribute, metadata attributes)
+TRACKED_FIELDS = {
+    "entry": ("content", ("title", "tags")),
+    "snippet": ("code", ("title", "language", "description", "tags")),
+}
+
+
+def make_delta(old, new):
+    """Line-level edit script turning `old` into `new`.
+
+    ["c", i, j] copies old lines i..j, ["i", text] inserts text. Unchanged stretches cost
+    a few bytes regardless of their size.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif j2 > j1:  # replace / insert; deletes are simply not copied
+            ops.append(["i", "".join(new_lines[j1:j2])])
+    return ops
+
+
+def apply_delta(old, ops):
+    old_lines = old.splitlines(keepends=True)
+    out = []
+    for op in ops:
+        if op[0] == "c":
+            out.extend(old_lines[op[1]:op[2]])
+        else:
+            out.append(op[1])
+    return "".join(out)
+
+
+def item_state(item_type, item):
+    body, meta = TRACKED_FIELDS[item_type]
+    return {name: getattr(item, name) for name in (body, *meta)}
+
+
+def record_revision(item_type, item_id, user_id, old_state, new_state):
+    """Append a revision for an update from `old_state` to `new_state` (dicts from item_state).
+
+    Items edited for the first time get their pre-update state recorded as revision 1.
+    Call inside the request's transaction, before commit. Returns the new revision number.
+    """
+    if old_state == new_state:
+        return None
+    body, _ = TRACKED_FIELDS[item_type]
+    interval = current_app.config.get("REVISION_SNAPSHOT_INTERVAL", 10)
+
+    # Numbers must not race. Flushing the item's versioned UPDATE first locks its row until commit,
+    # or raises StaleDataError (409) if another request changed the item since it was read, so
+    # edits of one item take their numbers one at a time. FOR UPDATE makes MySQL read the latest
+    # committed number instead of the transaction's snapshot.
+    db.session.flush()
+    last = (db.session.query(func.max(Revision.number))
+            .filter_by(item_type=item_type, item_id=item_id)
+            .with_for_update()
+            .scalar())
+    if last is None:
+        db.session.add(_snapshot(item_type, item_id, user_id, 1, old_state))
+        last = 1
+
+    number = last + 1
+    if (number - 1) % interval == 0:
+        db.session.add(_snapshot(item_type, item_id, user_id, number, new_state))
+    else:
+        payload = {k: v for k, v in new_state.items() if k != body}
+        if new_state[body] != old_state[body]:
+            payload["ops"] = make_delta(old_state[body], new_state[body])
+        db.session.add(Revision(item_type=item_type, item_id=item_id, user_id=user_id, number=number,
+                                is_snapshot=False, payload=json.dumps(payload, separators=(",", ":"))))
+    return number
+
+
+def _snapshot(item_type, item_id, user_id, number, state):
+    return Revision(item_type=item_type, item_id=item_id, user_id=user_id, number=number,
+                    is_snapshot=True, payload=json.dumps(state, separators=(",", ":")))
+
+
+def list_revisions(item_type, item_id, user_id):
+    return (Revision.query
+            .filter_by(item_type=item_type, item_id=item_id, user_id=user_id)
+            .order_by(Revision.number)
+            .with_entities(Revision.number, Revision.is_snapshot, Revision.created_at)
+            .all())
+
+
+def load_revision(item_type, item_id, user_id, number):
+    """Rebuild revision `number` from the nearest snapshot at or before it.
+
+    Returns (state dict, created_at) or None if there is no such revision.
+    """
+    body, _ = TRACKED_FIELDS[item_type]
+    base = (Revision.query
+            .filter(Revision.item_type == item_type, Revision.item_id == item_id, Revision.user_id == user_id,
+                    Revision.number <= number, Revision.is_snapshot.is_(True))
+            .order_by(Revision.number.desc())
+            .first())
+    if base is None:
+        return None
+    chain = (Revision.query
+             .filter(Revision.item_type == item_type, Revision.item_id == item_id,
+                     Revision.number > base.number, Revision.number <= number)
+             .order_by(Revision.number)
+             .all())
+    if base.number + len(chain) != number:
+        return None
+
+    state = json.loads(base.payload)
+    created_at = base.created_at
+    for rev in chain:
+        delta = json.loads(rev.payload)
+        ops = delta.pop("ops", None)
+        if ops is not None:
+            state[body] = apply_delta(state[body], ops)
+        state.update(delta)
+        created_at = rev.created_at
+    return state, created_at
+
+
+def delete_revisions(item_type, item_ids):
+    """Set-based removal of the history of deleted items."""
+    return (Revision.query
+            .filter(Revision.item_type == item_type, Revision.item_id.in_(item_ids))
+            .delete(synchronize_session=False))
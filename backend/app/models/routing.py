@@ -0,0 +1,138 @@
+# Session routing: shards and read replicas
+#
+# Shards (models/sharding.py): during a request the JWT check looks up the user's shard in the
+# directory (users.shard, on the primary) and stores it in g. From then on every statement that
+# touches a sharded table goes to that shard's engine; the users table stays on the primary.
+# CLI tasks and the change feed pick a shard explicitly with using_shard().
+#
+# Read replicas: replica engines are built from DATABASE_REPLICA_URLS with the primary's engine
+# options. They are not Flask-SQLAlchemy binds, so create_all/drop_all never touch them. During
+# a GET/HEAD request, plain SELECTs bound for the primary go to one replica chosen per request;
+# everything else (writes, flushes, SELECT ... FOR UPDATE, raw connections, work outside a
+# request) uses the primary. A user who wrote within the last REPLICA_PIN_SECONDS reads from
+# the primary too, so replication lag never hides their own changes. Pins live in the shared
+# state store so every worker sees them.
+import random
+from contextlib import contextmanager
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.sql.util import find_tables
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+READ_METHODS = ("GET", "HEAD")
+
+# Tables holding per-user data, stored on the user's shard
+SHARDED_TABLES = frozenset({
+    "entries", "entry_bodies", "snippets", "code_blobs", "revisions", "change_log", "id_sequences",
+    "entries_fts", "snippets_fts",
+})
+
+
+def current_shard():
+    """Shard the current request (or using_shard block) works on; None/0 is the primary."""
+    return g.get("_db_shard") if has_app_context() else None
+
+
+@contextmanager
+def using_shard(shard):
+    """Route sharded tables to `shard` for the duration of the block."""
+    previous = g.get("_db_shard")
+    g._db_shard = shard
+    try:
+        yield
+    finally:
+        g._db_shard = previous
+
+
+def _touches_sharded(mapper, clause):
+    if clause is not None:
+        return any(getattr(t, "name", None) in SHARDED_TABLES
+                   for t in find_tables(clause, check_columns=True, include_crud=True))
+    if mapper is not None:
+        return inspect(mapper).local_table.name in SHARDED_TABLES
+    return True  # session.connection() inside a shard context: data work such as blob refcounts
+
+
+def _pin_key(identity):
+    return f"pin:{identity}"
+
+
+def _identity():
+    # Set by flask_jwt_extended once the token is verified; None before that (account check)
+    jwt_data = g.get("_jwt_extended_jwt")
+    if jwt_data is None:
+        return None, False
+    return jwt_data.get(current_app.config["JWT_IDENTITY_CLAIM"]), True
+
+
+def is_pinned(app, identity):
+    """Whether the user wrote recently enough that their reads must come from the primary."""
+    return identity is not None and bool(app.extensions["shared_state"].get(_pin_key(identity)))
+
+
+def replica_for_reads():
+    """Name of the replica serving this request's reads, or None for the primary.
+
+    Decided once per request.
+    """
+    if not has_app_context():
+        return None
+    if "_db_replica" in g:
+        return g._db_replica
+    if not has_request_context() or request.method not in READ_METHODS:
+        return None
+    replicas = current_app.extensions.get("db_replicas")
+    if not replicas:
+        return None
+    identity, verified = _identity()
+    if not verified:
+        return None
+    g._db_replica = None if is_pinned(current_app, identity) else random.choice(list(replicas))
+    return g._db_replica
+
+
+def request_route():
+    """The current request's routing decisions, for threads doing work on its behalf
+    (e.g. /api/bootstrap's query threads); hand it to use_route() in the thread."""
+    return {"_db_replica": replica_for_reads(), "_db_shard": current_shard()}
+
+
+def use_route(route):
+    for key, value in route.items():
+        setattr(g, key, value)
+
+
+def _pin_writer(response):
+    if request.method not in READ_METHODS and response.status_code < 400:
+        identity, _ = _identity()
+        if identity is not None:
+            current_app.extensions["shared_state"].put(
+                _pin_key(identity), 1, current_app.config.get("REPLICA_PIN_SECONDS", 5))
+    return response
+
+
+def _is_plain_select(clause):
+    return getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            shard = current_shard()
+            if shard and _touches_sharded(mapper, clause):
+                return current_app.extensions["db_shards"][shard]
+            if not self._flushing and _is_plain_select(clause):
+                replica = replica_for_reads()
+                if replica is not None:
+                    return current_app.extensions["db_replicas"][replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_replicas(app):
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    app.extensions["db_replicas"] = {
+        f"replica_{i}": create_engine(url, **options)
+        for i, url in enumerate(app.config.get("DATABASE_REPLICA_URLS") or [])
+    }
+    if app.extensions["db_replicas"]:
+        app.after_request(_pin_writer)
@@ -0,0 +1,277 @@
+# Horizontal sharding of user data
+#
+# DATABASE_SHARD_URLS adds shards 1..N next to the primary, which is shard 0. users.shard on the
+# primary is the directory: it names the database holding a user's entries, snippets, bodies,
+# code blobs, revisions and change log (routing.SHARDED_TABLES). The users table is owned by the
+# primary; every shard keeps a copy of its residents' rows so foreign keys and joins work there.
+# Requests are routed by models/routing.py once the JWT check has read the directory.
+#
+# Entry and snippet ids are public and keep their value when a user moves, so with sharding on
+# each shard allocates them from its own residue class (id % SHARD_ID_STRIDE == shard) above
+# SHARD_ID_FLOOR. A shard's allocations follow a high-water mark in its id_sequences table that
+# only ever goes up: ids of deleted rows and of users moved away are never handed out again, so
+# a shard never reissues an id that now lives elsewhere, and ids can't collide between shards.
+# The same table keeps a mark for change_log seqs of users who moved away (see move_user).
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import case, create_engine, delete, event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .db_models import (ChangeLog, CodeBlob, Entry, EntryBody, IdSequence, Revision, Snippet, User, acquire_blob, db,
+                        release_blobs)
+from .routing import current_shard, using_shard
+
+
+class UserMoving(Exception):
+    """The user's data is being moved to another shard; writes have to wait."""
+
+
+def init_shards(app):
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    urls = app.config.get("DATABASE_SHARD_URLS") or []
+    if urls and len(urls) + 1 > app.config.get("SHARD_ID_STRIDE", 16):
+        raise ValueError("More shards than SHARD_ID_STRIDE allows")
+    app.extensions["db_shards"] = {shard: create_engine(url, **options) for shard, url in enumerate(urls, start=1)}
+
+
+def shard_count():
+    return len(current_app.extensions.get("db_shards") or {}) + 1
+
+
+def shard_engine(shard):
+    return current_app.extensions["db_shards"][shard] if shard else db.engine
+
+
+def each_shard():
+    """Run the body of a for loop once per shard, with sharded tables routed to it."""
+    for shard in range(shard_count()):
+        with using_shard(shard):
+            yield shard
+        db.session.remove()  # connections of one shard aren't reused for the next
+
+
+# Directory
+
+def _replace_user_copy(connection, user_id, shard):
+    """Put a resident's row on `shard`. Foreign keys and lock_change_log only need the id; the
+    other NOT NULL columns get placeholders, so emails and password hashes stay on the primary."""
+    users = User.__table__
+    placeholder = f"user-{user_id}"
+    connection.execute(delete(users).where(users.c.id == user_id))
+    connection.execute(insert(users).values(id=user_id, email=placeholder, username=placeholder, password_hashed="",
+                                            shard=shard, moving=False))
+
+
+# The JWT check looks the directory up on every authenticated request. Rows of accounts that are
+# neither deleted nor moving are cached in the host's shared state for ACCOUNT_CACHE_SECONDS.
+# Deleting an account drops the entry on the host that served the request; other hosts notice
+# within the TTL, and move_user waits at least that long after flagging a user before copying,
+# so no host still routes writes by a cached shard once the copy starts.
+
+def _directory_key(user_id):
+    return f"account:{user_id}"
+
+
+def cached_shard(app, user_id):
+    """The user's shard if an active, non-moving directory row is cached, else None."""
+    value = app.extensions["shared_state"].get(_directory_key(user_id))
+    return None if value is None else int(value)
+
+
+def cache_shard(app, user_id, shard):
+    ttl = app.config.get("ACCOUNT_CACHE_SECONDS", 0)
+    if ttl > 0:
+        app.extensions["shared_state"].put(_directory_key(user_id), shard, ttl)
+
+
+def forget_shard(app, user_id):
+    app.extensions["shared_state"].delete(_directory_key(user_id))
+
+
+def place_new_user(user):
+    """Assign a freshly flushed user to a shard and put the copy of their row there."""
+    user.shard = user.id % shard_count()
+    if user.shard:
+        with shard_engine(user.shard).begin() as connection:
+            _replace_user_copy(connection, user.id, user.shard)
+
+
+# Id allocation
+
+def _bump_sequence(connection, model, count, shard, stride, floor):
+    """Move the mark of `model` past `count` more ids of `shard`'s residue class; returns the new mark."""
+    seq = IdSequence.__table__
+    base = case((seq.c.last_id < floor, floor), else_=seq.c.last_id)
+    bump = (update(seq).where(seq.c.name == model.__tablename__)
+            .values(last_id=base + 1 + ((shard - base - 1) % stride + stride) % stride + (count - 1) * stride))
+    if connection.execute(bump).rowcount == 0:
+        # First allocation on this database: start above the ids it already holds
+        top = connection.execute(select(func.max(model.id))).scalar() or 0
+        connection.execute(insert(seq).values(name=model.__tablename__, last_id=top))
+        connection.execute(bump)
+    return connection.execute(select(seq.c.last_id).where(seq.c.name == model.__tablename__)).scalar()
+
+
+def allocate_ids(session, model, count):
+    """`count` new ids for `model` on the current shard, in ascending order.
+
+    On SQLite the mark moves in the session's transaction (writers run one at a time anyway). Other
+    databases move it in a short transaction of its own, so the lock on the sequence row is held
+    for a few statements rather than until the request commits; ids of a request that rolls back
+    are simply skipped.
+    """
+    shard = current_shard() or 0
+    stride = current_app.config.get("SHARD_ID_STRIDE", 16)
+    floor = current_app.config.get("SHARD_ID_FLOOR", 0)
+    args = (model, count, shard, stride, floor)
+    engine = session.get_bind(mapper=model)
+    if engine.dialect.name == "sqlite":
+        last = _bump_sequence(session.connection(bind_arguments={"mapper": model}), *args)
+    else:
+        try:
+            with engine.begin() as connection:
+                last = _bump_sequence(connection, *args)
+        except IntegrityError:
+            # Another worker created the sequence row first; it exists now
+            with engine.begin() as connection:
+                last = _bump_sequence(connection, *args)
+    return [last - (count - 1 - k) * stride for k in range(count)]
+
+
+@event.listens_for(Session, "before_flush")
+def _allocate_sharded_ids(session, flush_context, instances):
+    if not has_app_context() or not current_app.extensions.get("db_shards"):
+        return
+    pending = {}
+    for obj in session.new:
+        if type(obj) in (Entry, Snippet) and obj.id is None:
+            pending.setdefault(type(obj), []).append(obj)
+    with session.no_autoflush:
+        for model, objects in pending.items():
+            for obj, id_ in zip(objects, allocate_ids(session, model, len(objects))):
+                obj.id = id_
+
+
+# Rebalancing
+
+CHANGE_LOG_MARK = "change_log"
+
+
+def _change_log_mark(connection):
+    """Highest change_log seq this database issued to users who have since moved away."""
+    seq = IdSequence.__table__
+    return connection.execute(select(seq.c.last_id).where(seq.c.name == CHANGE_LOG_MARK)).scalar() or 0
+
+
+def _raise_change_log_mark(connection, last_seq):
+    seq = IdSequence.__table__
+    raised = (update(seq).where(seq.c.name == CHANGE_LOG_MARK)
+              .values(last_id=case((seq.c.last_id < last_seq, last_seq), else_=seq.c.last_id)))
+    if connection.execute(raised).rowcount == 0:
+        connection.execute(insert(seq).values(name=CHANGE_LOG_MARK, last_id=last_seq))
+
+
+def _copy_rows(source, target, table, condition, order_by, batch_size, exclude=()):
+    """Copy matching rows in `order_by` order, batch by batch. Columns in `exclude` are
+    left to the target's defaults (renumbered keys). Returns the number copied."""
+    columns = [c for c in table.columns if c.name not in exclude]
+    copied, last = 0, None
+    while True:
+        stmt = select(*columns, order_by.label("_key")).where(condition).order_by(order_by).limit(batch_size)
+        if last is not None:
+            stmt = stmt.where(order_by > last)
+        rows = source.execute(stmt).all()
+        if not rows:
+            return copied
+        last = rows[-1]._key
+        target.execute(insert(table), [{c.name: row._mapping[c.name] for c in columns} for row in rows])
+        copied += len(rows)
+
+
+def move_user(user_id, target, batch_size=500, grace=2.0):
+    """Move a user's data to shard `target` and repoint the directory.
+
+    Writes for the user are refused (503) from the start until the directory points at the
+    target; `grace` seconds (at least ACCOUNT_CACHE_SECONDS, see cached_shard) are given to
+    writes already in flight. The copy runs in one
+    transaction on the target, so a failed move leaves the user where they were. Entry and
+    snippet ids are kept; revisions and change log rows are renumbered. The copied change log
+    lands above every seq the target issued before, so a token from another shard starts a
+    full resync and one kept from an earlier stay on the target can't skip anything. Returns
+    {table: rows copied}.
+    """
+    users = User.__table__
+    user = db.session.get(User, user_id)
+    if user is None:
+        raise ValueError(f"No user {user_id}")
+    source = user.shard
+    if not 0 <= target < shard_count():
+        raise ValueError(f"No shard {target}")
+    if source == target:
+        return {}
+    db.session.execute(update(users).where(users.c.id == user_id).values(moving=True))
+    db.session.commit()
+    forget_shard(current_app, user_id)
+
+    try:
+        time.sleep(max(grace, current_app.config.get("ACCOUNT_CACHE_SECONDS", 0)))
+        report = {}
+        entries, bodies, snippets = Entry.__table__, EntryBody.__table__, Snippet.__table__
+        revisions, changes = Revision.__table__, ChangeLog.__table__
+        with shard_engine(source).connect() as src, shard_engine(target).begin() as dst:
+            if target:
+                _replace_user_copy(dst, user_id, target)
+            report["entries"] = _copy_rows(src, dst, entries, entries.c.user_id == user_id, entries.c.id, batch_size)
+            report["entry_bodies"] = _copy_rows(
+                src, dst, bodies, bodies.c.entry_id.in_(select(entries.c.id).where(entries.c.user_id == user_id)),
+                bodies.c.entry_id, batch_size)
+            blob_counts = dict(src.execute(
+                select(snippets.c.code_hash, func.count()).where(snippets.c.user_id == user_id).group_by(snippets.c.code_hash)
+            ).all())
+            for digest, count in blob_counts.items():
+                code = src.execute(select(CodeBlob.__table__.c.code).where(CodeBlob.__table__.c.hash == digest)).scalar()
+                acquire_blob(dst, digest, code, count)
+            report["code_blobs"] = len(blob_counts)
+            report["snippets"] = _copy_rows(src, dst, snippets, snippets.c.user_id == user_id, snippets.c.id, batch_size)
+            report["revisions"] = _copy_rows(src, dst, revisions, revisions.c.user_id == user_id, revisions.c.id,
+                                             batch_size, exclude=("id",))
+            report["change_log"] = _copy_rows(src, dst, changes, changes.c.user_id == user_id, changes.c.seq,
+                                              batch_size, exclude=("seq",))
+            # SQLite hands out the seqs of deleted top rows again, so the fresh ones can be at or
+            # below seqs this user was given on an earlier stay here: shift them past the mark
+            mark = _change_log_mark(dst)
+            first, last = dst.execute(
+                select(func.min(changes.c.seq), func.max(changes.c.seq)).where(changes.c.user_id == user_id)
+            ).one()
+            if first is not None and first <= mark:
+                # Past the user's own rows too, so no seq is taken twice while the UPDATE runs
+                dst.execute(update(changes).where(changes.c.user_id == user_id)
+                            .values(seq=changes.c.seq + (max(mark, last) + 1 - first)))
+    except BaseException:
+        db.session.execute(update(users).where(users.c.id == user_id).values(moving=False))
+        db.session.commit()
+        raise
+
+    db.session.execute(update(users).where(users.c.id == user_id).values(shard=target, moving=False))
+    db.session.commit()
+
+    with shard_engine(source).begin() as src:
+        last_seq = src.execute(select(func.max(changes.c.seq)).where(changes.c.user_id == user_id)).scalar()
+        if last_seq is not None:
+            _raise_change_log_mark(src, last_seq)
+        src.execute(delete(revisions).where(revisions.c.user_id == user_id))
+        src.execute(delete(changes).where(changes.c.user_id == user_id))
+        src.execute(delete(bodies).where(bodies.c.entry_id.in_(select(entries.c.id).where(entries.c.user_id == user_id))))
+        src.execute(delete(entries).where(entries.c.user_id == user_id))
+        src.execute(delete(snippets).where(snippets.c.user_id == user_id))
+        release_blobs(src, blob_counts)
+        if source:
+            src.execute(delete(users).where(users.c.id == user_id))
+    return report
+
+
+def delete_user_copy(shard, user_id):
+    if shard:
+        users = User.__table__
+        with shard_engine(shard).begin() as connection:
+            connection.execute(delete(users).where(users.c.id == user_id))
@@ -0,0 +1,172 @@
+# Embedded SQLite mode: per-connection pragmas, write transactions and FTS5 search
+#
+# With SQLITE_PATH set the app runs on a single SQLite file instead of MySQL. Every connection
+# to a database file gets SQLITE_PRAGMAS (WAL, synchronous=NORMAL, cache, mmap, busy_timeout).
+# A deferred transaction that reads first and writes later can't wait for a concurrent writer
+# (it fails with SQLITE_BUSY), an immediate one queues for up to busy_timeout but holds the
+# database's single write lock from its first statement. So transactions start deferred and
+# only switch to BEGIN IMMEDIATE at their first write or locking read (FOR UPDATE, which SQLite
+# otherwise ignores): the reads before it see a snapshot, as plain reads do on MySQL, and the
+# lock isn't held across password hashing, model calls or upload streaming. Search uses
+# trigram FTS5 tables kept in sync by triggers, when the SQLite build has them (3.34+ with
+# FTS5); otherwise LIKE as on MySQL.
+import sqlite3
+from flask import current_app
+from sqlalchemy import TextClause, UpdateBase, event, inspect, literal_column, select, table
+from sqlalchemy.schema import ExecutableDDLElement
+from .db_models import db
+from .types import decode_body
+
+FTS_TABLES = {"entries": "entries_fts", "snippets": "snippets_fts"}
+
+# devlog_body() is registered on every connection (see _on_connect) and decodes compressed
+# bodies, so the index holds plain text whatever the storage encoding
+_ENTRY_ROW = ("SELECT e.id, e.title, coalesce(e.tags, ''), coalesce(devlog_body(b.content), '') "
+              "FROM entries e LEFT JOIN entry_bodies b ON b.entry_id = e.id")
+_SNIPPET_ROW = ("SELECT s.id, s.title, coalesce(s.tags, ''), coalesce(s.language, ''), "
+                "coalesce(devlog_body(c.code), '') FROM snippets s LEFT JOIN code_blobs c ON c.hash = s.code_hash")
+
+SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(title, tags, content, tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN "
+    f"INSERT INTO entries_fts (rowid, title, tags, content) {_ENTRY_ROW} WHERE e.id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS entries_fts_update AFTER UPDATE OF title, tags ON entries BEGIN "
+    "UPDATE entries_fts SET title = new.title, tags = coalesce(new.tags, '') WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN "
+    "DELETE FROM entries_fts WHERE rowid = old.id; END",
+    # The body row is written after its entry
+    "CREATE TRIGGER IF NOT EXISTS entry_bodies_fts_insert AFTER INSERT ON entry_bodies BEGIN "
+    "UPDATE entries_fts SET content = devlog_body(new.content) WHERE rowid = new.entry_id; END",
+    "CREATE TRIGGER IF NOT EXISTS entry_bodies_fts_update AFTER UPDATE OF content ON entry_bodies BEGIN "
+    "UPDATE entries_fts SET content = devlog_body(new.content) WHERE rowid = new.entry_id; END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS snippets_fts USING fts5(title, tags, language, code, tokenize='trigram')",
+    # Blobs are content-addressed and written before the snippet that points at them
+    f"CREATE TRIGGER IF NOT EXISTS snippets_fts_insert AFTER INSERT ON snippets BEGIN "
+    f"INSERT INTO snippets_fts (rowid, title, tags, language, code) {_SNIPPET_ROW} WHERE s.id = new.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS snippets_fts_update AFTER UPDATE OF title, tags, language, code_hash ON snippets "
+    f"BEGIN DELETE FROM snippets_fts WHERE rowid = old.id; "
+    f"INSERT INTO snippets_fts (rowid, title, tags, language, code) {_SNIPPET_ROW} WHERE s.id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS snippets_fts_delete AFTER DELETE ON snippets BEGIN "
+    "DELETE FROM snippets_fts WHERE rowid = old.id; END",
+]
+
+
+def fts_supported(connection):
+    return (sqlite3.sqlite_version_info >= (3, 34)
+            and bool(connection.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar()))
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite" and fts_supported(connection):
+        for statement in SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        for fts in FTS_TABLES.values():
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+
+
+def rebuild_search_index(connection):
+    """Refill the FTS tables from the stored rows (e.g. for a database created before them)."""
+    connection.exec_driver_sql("DELETE FROM entries_fts")
+    connection.exec_driver_sql(f"INSERT INTO entries_fts (rowid, title, tags, content) {_ENTRY_ROW}")
+    connection.exec_driver_sql("DELETE FROM snippets_fts")
+    connection.exec_driver_sql(f"INSERT INTO snippets_fts (rowid, title, tags, language, code) {_SNIPPET_ROW}")
+
+
+def _search_index_ready(model):
+    """Whether the database a search on `model` reads from has the FTS tables (cached per engine:
+    the primary, a replica or a shard may have been created differently)."""
+    bind = db.session.get_bind(mapper=inspect(model), clause=select(model.id))
+    cache = current_app.extensions.setdefault("sqlite_search", {})
+    ready = cache.get(bind)
+    if ready is None:
+        ready = bind.dialect.name == "sqlite" and db.session.execute(db.text(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN ('entries_fts', 'snippets_fts')"
+        ), bind_arguments={"bind": bind}).scalar() == len(FTS_TABLES)
+        cache[bind] = ready
+    return ready
+
+
+def search_condition(model, terms):
+    """Condition matching rows of `model` that contain any of the terms the FTS index can answer.
+
+    Returns (condition or None, remaining terms); the caller ORs it with its LIKE conditions for
+    the remaining terms, so a row matches if it contains any term, as without the index.
+    Trigram matching is a case-insensitive substring match like the LIKE path, but needs at
+    least three characters; shorter terms, and every term when the index isn't there, are left
+    to the LIKE conditions.
+    """
+    indexed = [term for term in terms if len(term) >= 3]
+    if not indexed or not _search_index_ready(model):
+        return None, terms
+    fts = FTS_TABLES[model.__tablename__]
+    query = " OR ".join('"%s"' % term.replace('"', '""') for term in indexed)
+    matching = select(literal_column("rowid")).select_from(table(fts)).where(literal_column(fts).op("MATCH")(query))
+    return model.id.in_(matching), [term for term in terms if len(term) < 3]
+
+
+def _on_connect(pragmas, file_backed):
+    def connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("devlog_body", 1, decode_body, deterministic=True)
+        if file_backed:
+            dbapi_connection.isolation_level = None  # transactions are begun in _begin
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    return connect
+
+
+_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def _takes_write_lock(statement):
+    if isinstance(statement, (str, TextClause)):
+        sql = statement if isinstance(statement, str) else statement.text
+        return sql.lstrip().upper().startswith(_WRITES)
+    if isinstance(statement, (UpdateBase, ExecutableDDLElement)):
+        return True
+    return getattr(statement, "_for_update_arg", None) is not None
+
+
+def _begin(connection):
+    connection.info["sqlite_write_lock"] = False
+    connection.exec_driver_sql("BEGIN")
+
+
+def _lock_for_write(connection, statement, multiparams, params, execution_options):
+    if connection.info.get("sqlite_write_lock", True) or not _takes_write_lock(statement):
+        return
+    connection.info["sqlite_write_lock"] = True
+    if connection.in_nested_transaction():
+        return  # ending the transaction would drop the savepoint; let SQLite upgrade in place
+    # Nothing has been written yet, so ending the read transaction loses nothing; what was read
+    # before is checked by the version columns and locking reads, as on MySQL
+    connection.exec_driver_sql("COMMIT")
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def configure_sqlite_engine(engine, pragmas):
+    """Hook pragmas and transaction handling into one (sync) engine; other dialects are left alone."""
+    if engine.dialect.name != "sqlite":
+        return
+    file_backed = engine.url.database not in (None, "", ":memory:")
+    event.listen(engine, "connect", _on_connect(pragmas, file_backed))
+    if file_backed:
+        event.listen(engine, "begin", _begin)
+        event.listen(engine, "before_execute", _lock_for_write)
+
+
+def init_sqlite(app):
+    """Hook pragmas and transaction handling into the app's SQLite engines (primary, replicas, shards)."""
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    with app.app_context():
+        engines = [*db.engines.values(), *app.extensions.get("db_replicas", {}).values(),
+                   *app.extensions.get("db_shards", {}).values()]
+    for engine in engines:
+        configure_sqlite_engine(engine, pragmas)
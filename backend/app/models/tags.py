@@ -0,0 +1,78 @@
+# Set-based tag rewrites over the comma-separated `tags` columns
+from datetime import datetime
+from sqlalchemy import literal, func, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+from sqlalchemy.types import String
+from .changes import record_changes
+from .db_models import Entry, Snippet, db
+
+
+class strip_commas(GenericFunction):
+    """Remove leading/trailing commas (no portable TRIM(chars) across SQLite and MySQL)."""
+    type = String()
+    inherit_cache = True
+
+
+@compiles(strip_commas)
+def _strip_commas_default(element, compiler, **kw):
+    return "trim(%s, ',')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(strip_commas, "mysql")
+def _strip_commas_mysql(element, compiler, **kw):
+    return "TRIM(BOTH ',' FROM %s)" % compiler.process(element.clauses, **kw)
+
+
+def _wrapped(column):
+    """',a,b,c,' form of a tags value, with the ', ' separators written by autogen normalized."""
+    normalized = func.replace(func.replace(func.coalesce(column, ""), ", ", ","), " ,", ",")
+    return literal(",") + normalized + literal(",")
+
+
+def _has_tag(wrapped, tag):
+    """Whether `tag` is one of the tags, compared exactly. LIKE would follow the column collation,
+    which is case-insensitive on MySQL (and for ASCII on SQLite), while REPLACE always matches
+    exactly: a row LIKE picked up could come out of the rewrite unchanged. So the test is
+    whether REPLACE finds anything to remove."""
+    return func.length(func.replace(wrapped, f",{tag},", "")) < func.length(wrapped)
+
+
+def _replace_tag(wrapped, old, new):
+    # twice: REPLACE doesn't see overlapping matches, so ",a,a," needs a second pass
+    once = func.replace(wrapped, f",{old},", new)
+    return strip_commas(func.replace(once, f",{old},", new))
+
+
+def merge_tags(user_id, sources, target):
+    """Rewrite tag `sources` to `target` on all of a user's entries and snippets.
+
+    Per source and table this is two UPDATEs: rows already carrying `target` just drop the
+    source, the others have it replaced. Tags match exactly (case-sensitive) on every database.
+    Nothing is loaded into Python. Touched rows get the separators normalized to "," and their
+    version/updated_at bumped.
+    Returns {"entries": n, "snippets": n} row updates (a row holding two sources counts
+    twice). Does not commit.
+    """
+    changed = {}
+    now = datetime.utcnow()
+    for key, model in (("entries", Entry), ("snippets", Snippet)):
+        changed[key] = 0
+        wrapped = _wrapped(model.tags)
+        for source in sources:
+            if source == target:
+                continue
+            has_source = _has_tag(wrapped, source)
+            has_target = _has_tag(wrapped, target)
+            for condition, replacement in ((has_target, ","), (~has_target, f",{target},")):
+                selected = (model.user_id == user_id) & has_source & condition
+                record_changes(model, selected)
+                result = db.session.execute(
+                    update(model)
+                    .where(selected)
+                    .values(tags=_replace_tag(wrapped, source, replacement),
+                            updated_at=now, version=model.version + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                changed[key] += result.rowcount
+    return changed
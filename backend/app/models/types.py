@@ -0,0 +1,76 @@
+# Custom column types
+import base64
+import zlib
+from sqlalchemy import Text
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.types import TypeDecorator
+
+# First character of a stored value says how it is encoded. Anything else is a plain
+# (legacy, never rewritten) value, so existing rows stay readable without a migration.
+RAW_MARKER = "\x00"
+ZLIB_MARKER = "\x01"
+
+# Tuned from the app config in create_app (see configure_compression)
+settings = {
+    "threshold": 4096,  # bytes; bodies shorter than this are stored as-is
+    "level": 6,
+}
+
+
+def configure_compression(config):
+    settings["threshold"] = config.get("BODY_COMPRESSION_THRESHOLD", settings["threshold"])
+    settings["level"] = config.get("BODY_COMPRESSION_LEVEL", settings["level"])
+
+
+def is_compressed(stored):
+    return stored is not None and stored.startswith(ZLIB_MARKER)
+
+
+def encode_body(value):
+    """Return the stored form of a body: zlib + base64 behind a marker when it pays off."""
+    if value is None:
+        return None
+    threshold = settings["threshold"]
+    raw = value.encode("utf-8")
+    if threshold and len(raw) >= threshold:
+        packed = base64.b64encode(zlib.compress(raw, settings["level"])).decode("ascii")
+        if len(packed) + 1 < len(raw):
+            return ZLIB_MARKER + packed
+    if value.startswith((RAW_MARKER, ZLIB_MARKER)):
+        return RAW_MARKER + value  # escape so a literal marker isn't mistaken for an encoding
+    return value
+
+
+def decode_body(stored):
+    if stored is None:
+        return None
+    if stored.startswith(ZLIB_MARKER):
+        return zlib.decompress(base64.b64decode(stored[1:])).decode("utf-8")
+    if stored.startswith(RAW_MARKER):
+        return stored[1:]
+    return stored
+
+
+class CompressedText(TypeDecorator):
+    """TEXT column that transparently compresses large values.
+
+    Values stay text (base64 after compression) so uncompressed rows remain LIKE-searchable
+    and rows written before this type existed are read back unchanged.
+    """
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(MEDIUMTEXT())  # TEXT caps at 64 KB
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        return encode_body(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_body(value)
+
+    def coerce_compared_value(self, op, value):
+        # LIKE patterns and other comparison operands must reach the database untouched
+        return Text()
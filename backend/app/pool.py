@@ -0,0 +1,73 @@
+# Connection pool instrumentation for /api/health/pool
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that counts checkouts, time spent waiting for a connection, and timeouts.
+
+    The wait includes opening a new connection when the pool grows, which is what a
+    request actually pays. Counters are per pool, i.e. per worker process.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_overflow = kwargs.get("max_overflow", 10)  # QueuePool keeps it private
+        self._stats_lock = threading.Lock()
+        self.stats = {"checkouts": 0, "timeouts": 0, "wait_total": 0.0, "wait_max": 0.0, "peak_checked_out": 0}
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeout:
+            with self._stats_lock:
+                self.stats["timeouts"] += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            stats = self.stats
+            stats["checkouts"] += 1
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+            stats["peak_checked_out"] = max(stats["peak_checked_out"], self.checkedout())
+        return conn
+
+
+def configure_pool(config):
+    """Use the instrumented pool wherever the engine options configure a QueuePool."""
+    options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if "pool_size" in options:
+        options.setdefault("poolclass", InstrumentedQueuePool)
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def pool_status(pool):
+    """Current occupancy plus (for the instrumented pool) cumulative wait statistics."""
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            timeout=pool.timeout(),
+        )
+    if hasattr(pool, "max_overflow"):
+        status["max_overflow"] = pool.max_overflow
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        with pool._stats_lock:
+            stats = dict(stats)
+        checkouts = stats.pop("checkouts")
+        wait_total = stats.pop("wait_total")
+        status.update(
+            checkouts=checkouts,
+            timeouts=stats["timeouts"],
+            peak_checked_out=stats["peak_checked_out"],
+            wait_avg_ms=round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+            wait_max_ms=round(stats["wait_max"] * 1000, 3),
+        )
+    return status
@@ -0,0 +1,92 @@
+# Preloading under gunicorn (gunicorn.conf.py)
+#
+# With preload_app the master imports the app once and forks the workers from it, so Flask,
+# SQLAlchemy and pydantic are loaded once and shared copy-on-write instead of once per worker.
+# warm_up() moves the rest of the first request's one-off work into the master as well: loading
+# google.generativeai (deferred at import, see lazy.py) when autogen is enabled and has a key,
+# mapper configuration, dialect initialization (one connection per engine), the URL map's
+# matcher, and the compiled SQL of the hot read queries, which stays in each engine's statement
+# cache across the fork. No connection may cross the fork: the master closes its own
+# once warm, and each worker drops whatever pool state it inherited in after_fork(). A step
+# that fails (say, a database that is down at deploy time) is logged and skipped.
+from sqlalchemy.orm import configure_mappers, selectinload
+from .models.db_models import Entry, Snippet, User, db
+from .models.sharding import each_shard, shard_engine
+
+# The queries behind the account check and the entry/snippet reads, written exactly as the
+# routes write them so they compile to the same cache keys. That includes the parameter types:
+# the routes filter on the JWT identity, which is a string. Nobody has id 0.
+NOBODY, NOBODY_IDENTITY = 0, "0"
+DIRECTORY_QUERIES = [
+    lambda: db.session.query(User.deleted_at, User.shard, User.moving).filter_by(id=NOBODY).first(),
+]
+SHARD_QUERIES = [
+    lambda: Entry.query.options(selectinload(Entry.body)).filter_by(user_id=NOBODY_IDENTITY).all(),
+    lambda: Snippet.query.options(selectinload(Snippet.blob)).filter_by(user_id=NOBODY_IDENTITY).all(),
+    lambda: Entry.query.filter_by(user_id=NOBODY_IDENTITY).all(),  # ?summary=1
+    lambda: Snippet.query.filter_by(user_id=NOBODY_IDENTITY).all(),
+    lambda: Entry.query.filter_by(id=NOBODY, user_id=NOBODY_IDENTITY).first(),
+    lambda: Snippet.query.filter_by(id=NOBODY, user_id=NOBODY_IDENTITY).first(),
+]
+
+
+def _engines(app):
+    with app.app_context():
+        return [*db.engines.values(), *app.extensions.get("db_replicas", {}).values(),
+                *app.extensions.get("db_shards", {}).values()]
+
+
+def _attempt(app, what, step):
+    # Warm-up is an optimization: whatever fails here is simply done by each worker on first use
+    try:
+        step()
+    except Exception:
+        app.logger.warning("warm-up: %s failed, workers will start cold", what, exc_info=True)
+        return False
+    return True
+
+
+def _run(queries):
+    for query in queries:
+        query()
+
+
+def warm_up(app):
+    """Do the first request's one-off work in the master. Call after the app is loaded, before forking.
+
+    Never raises for an unreachable database: the failure is logged and gunicorn still forks.
+    """
+    if "autogen" in app.blueprints and app.config.get("GEMINI_API_KEY"):
+        from .routes.autogen_route import genai
+        _attempt(app, "loading google.generativeai", lambda: genai.GenerativeModel)  # first access runs the module
+    configure_mappers()
+    try:
+        reachable = []
+        for engine in _engines(app):
+            # The first connection initializes the dialect (server version, collation, ...)
+            if _attempt(app, f"connecting to {engine.url.render_as_string(hide_password=True)}",
+                        lambda: engine.connect().close()):
+                reachable.append(engine)
+        with app.app_context():
+            if db.engine in reachable:
+                _attempt(app, "directory queries", lambda: _run(DIRECTORY_QUERIES))
+            for shard in each_shard():
+                if shard_engine(shard) in reachable:  # don't wait out another connect timeout
+                    _attempt(app, f"shard {shard} queries", lambda: _run(SHARD_QUERIES))
+        # Request machinery: URL matcher, JSON provider, the JWT error path (no token, so no DB access)
+        client = app.test_client()
+        _attempt(app, "request machinery", lambda: (client.get("/api/entries"), client.get("/api/health/pool")))
+    finally:
+        for engine in _engines(app):
+            engine.dispose()
+
+
+def after_fork(app):
+    """Drop pooled connections inherited from the master without closing them under its feet."""
+    for engine in _engines(app):
+        engine.dispose(close=False)
+
+
+def close_connections(app):
+    for engine in _engines(app):
+        engine.dispose()
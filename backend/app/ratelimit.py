@@ -0,0 +1,85 @@
+# Rate limits for the routes a scripted client could abuse: login/register (bcrypt CPU) and
+# autogen (the Gemini quota)
+#
+# One token bucket per rule and client (the user for authenticated routes, the IP address
+# otherwise, or the account a login names), kept in the SharedState SQLite file so every gunicorn worker on the host spends
+# from the same bucket. A check is a single UPSERT on a local file, with no external service.
+# Responses of limited routes carry RateLimit-Policy/-Limit/-Remaining/-Reset headers; an empty
+# bucket means 429 with Retry-After. Behind a reverse proxy, set PROXY_FIX_X_FOR so the IP is
+# the client's and not the proxy's.
+import functools
+import itertools
+import math
+from collections import namedtuple
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+Decision = namedtuple("Decision", "allowed limit period remaining reset retry_after")
+
+# Every SWEEP_EVERY checks a process drops the buckets that are full again
+SWEEP_EVERY = 1000
+_checks = itertools.count(1)
+
+
+def check(app, rule, client):
+    """Spend a token of `rule` for `client`. None if the rule has no limit configured."""
+    limits = app.config.get("RATE_LIMITS", {}).get(rule)
+    if not limits or limits["limit"] <= 0:
+        return None
+    limit, period = limits["limit"], limits["period"]
+    interval = period / limit
+    state = app.extensions["shared_state"]
+    allowed, full_in = state.take(f"ratelimit:{rule}:{client}", interval, period)
+    if next(_checks) % SWEEP_EVERY == 0:
+        state.sweep_buckets()
+    remaining = max(int((period - full_in) / interval + 1e-9), 0)
+    retry_after = 0 if allowed else max(math.ceil(full_in + interval - period), 1)
+    return Decision(allowed, limit, period, remaining, math.ceil(full_in), retry_after)
+
+
+def headers(decision):
+    result = {
+        "RateLimit-Policy": f"{decision.limit};w={decision.period}",
+        "RateLimit-Limit": str(decision.limit),
+        "RateLimit-Remaining": str(decision.remaining),
+        "RateLimit-Reset": str(decision.reset),
+    }
+    if not decision.allowed:
+        result["Retry-After"] = str(decision.retry_after)
+    return result
+
+
+TOO_MANY = {"error": "Too many requests, retry later"}
+
+
+def _client(by):
+    if by == "user":
+        return f"user:{get_jwt_identity()}"
+    if by == "account":
+        # The username/email a login names, whichever address sends it
+        data = request.get_json(silent=True)
+        name = (data.get("username") or data.get("email")) if isinstance(data, dict) else None
+        return f"account:{name.strip().lower() if isinstance(name, str) else ''}"
+    return f"ip:{request.remote_addr}"
+
+
+def rate_limit(rule, by="ip"):
+    """Limit the view by RATE_LIMITS[rule], per client IP, per login account (by="account") or
+    (by="user", below @jwt_required()) per user. Rules can be stacked; a 429 keeps the headers
+    of the rule that refused it."""
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            decision = check(current_app, rule, _client(by))
+            if decision is None:
+                return view(*args, **kwargs)
+            if not decision.allowed:
+                response = make_response(jsonify(TOO_MANY), 429)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 429:
+                    return response  # refused by a rule further in
+            response.headers.update(headers(decision))
+            return response
+        return wrapper
+    return decorate
@@ -1 +1,17 @@
 # API routes
+from flask import jsonify, request
+from pydantic import ValidationError
+
+
+def parse_json(request_model):
+    """Parse and validate the JSON body in one pass (pydantic-core reads the raw bytes).
+
+    Returns (model, None) or (None, error response): 415 if the body isn't JSON, 400 if it
+    doesn't validate.
+    """
+    if not request.is_json:
+        return None, (jsonify({'error': 'Request must be JSON'}), 415)
+    try:
+        return request_model.model_validate_json(request.get_data()), None
+    except ValidationError as e:
+        return None, (jsonify({'error': 'Invalid request', 'details': str(e)}), 400)
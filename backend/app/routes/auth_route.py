@@ -1,8 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, g, request, jsonify
 from flask_bcrypt import Bcrypt
 from app.models.db_models import User, db
 from app.models.models import CreateUserRequest
-from flask_jwt_extended import JWTManager, create_access_token
+from app.models.routing import READ_METHODS
+from app.models.sharding import UserMoving, cache_shard, cached_shard, forget_shard, place_new_user
+from app.ratelimit import rate_limit
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, jwt_required
+from datetime import datetime
 from re import match
 
 bcrypt = Bcrypt()
@@ -10,7 +14,39 @@ jwt = JWTManager()
 
 auth_bp = Blueprint('auth', __name__)
 
+@jwt.token_in_blocklist_loader
+def account_deleted(jwt_header, jwt_payload):
+    """Tokens of accounts pending deletion stop working immediately, not when they expire.
+
+    The same directory lookup routes the rest of the request to the user's shard. It is cached
+    briefly (models/sharding.py), so on other hosts a deleted account's tokens may keep working
+    for up to ACCOUNT_CACHE_SECONDS.
+    """
+    user_id = int(jwt_payload['sub'])
+    shard = cached_shard(current_app, user_id)
+    if shard is None:
+        row = db.session.query(User.deleted_at, User.shard, User.moving).filter_by(id=user_id).first()
+        if row is None or row.deleted_at is not None:
+            return True
+        if row.moving and request.method not in READ_METHODS:
+            raise UserMoving()
+        if not row.moving:
+            cache_shard(current_app, user_id, row.shard)
+        shard = row.shard
+    g._db_shard = shard
+    return False
+
+@jwt.token_verification_loader
+def stream_token_scope(jwt_header, jwt_payload):
+    """Stream tokens (POST /api/events/token) open /api/events and nothing else."""
+    return jwt_payload.get('scope') != 'events' or request.endpoint == 'events.events'
+
+@jwt.token_verification_failed_loader
+def stream_token_refused(jwt_header, jwt_payload):
+    return jsonify({"msg": "Stream tokens only open /api/events"}), 401
+
 @auth_bp.route('/api/register', methods=['POST'])
+@rate_limit("register")
 def register():
     data = request.get_json()
     email = data.get('email')
@@ -43,11 +79,19 @@ def register():
 
     # Add to database
     db.session.add(new_user)
-    db.session.commit()
+    try:
+        db.session.flush()
+        place_new_user(new_user)
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
     return jsonify({"message": f"User {username} registered successfully!"}), 201
 
 @auth_bp.route('/api/login', methods=['POST'])
+@rate_limit("login")
+@rate_limit("login_account", by="account")
 def login():
     data = request.get_json()
     username = data.get('username')
@@ -67,7 +111,7 @@ def login():
     else:
         user = User.query.filter_by(email=email).first()
     
-    if not user:
+    if not user or user.deleted_at is not None:
         return jsonify({"error": "Invalid credentials"}), 401
 
     # Verify password is correct
@@ -81,3 +125,27 @@ def login():
         }), 200
     else:
         return jsonify({'message': 'Incorrect Password'}), 401
+
+@auth_bp.route('/api/account', methods=['DELETE'])
+@jwt_required()
+def delete_account():
+    """Delete the authenticated user's account and all of its entries and snippets.
+
+    Expects JSON body {"password": ...} as confirmation. The account is disabled right away
+    (login and existing tokens are refused) and its data is removed in the background by
+    `flask purge-accounts`. Returns 202.
+    """
+    data = request.get_json(silent=True) or {}
+    user = db.session.get(User, int(get_jwt_identity()))
+    if not data.get('password') or not bcrypt.check_password_hash(user.password_hashed, data['password']):
+        return jsonify({"error": "Password confirmation required"}), 403
+
+    user.deleted_at = datetime.utcnow()
+    try:
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+    forget_shard(current_app, user.id)
+
+    return jsonify({"message": "Account scheduled for deletion"}), 202
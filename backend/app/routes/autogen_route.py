@@ -1,34 +1,100 @@
-from flask import Blueprint, request, jsonify
-from app.models.db_models import User, db
+import threading
+from functools import wraps
+from flask import Blueprint, current_app, request, jsonify
+from app.lazy import lazy_import
 from flask_jwt_extended import jwt_required
-from dotenv import load_dotenv
-import os
-import google.generativeai as genai
+from app.admission import admit
+from app.ratelimit import rate_limit
 
-load_dotenv()
+# The SDK (gRPC, protobuf) is imported on the first auto-generation request, not at startup
+genai = lazy_import("google.generativeai")
 
 autogen_bp = Blueprint('autogen', __name__)
 
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise EnvironmentError("GEMINI_API_KEY not found in environment variables")
+MODEL_NAME = 'gemini-2.0-flash'
+
+_configured_key = None
+_configure_lock = threading.Lock()
+
+def model(api_key):
+    """The Gemini model, configuring the SDK with `api_key` on first use."""
+    global _configured_key
+    if _configured_key != api_key:
+        with _configure_lock:
+            if _configured_key != api_key:
+                genai.configure(api_key=api_key)
+                _configured_key = api_key
+    return genai.GenerativeModel(MODEL_NAME)
+
+NOT_CONFIGURED = {"error": "Auto-generation is not configured (GEMINI_API_KEY is not set)"}
+
+def requires_api_key(fn):
+    """503 while GEMINI_API_KEY is unset. Goes below @jwt_required(), so anonymous callers get 401."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not current_app.config.get("GEMINI_API_KEY"):
+            return jsonify(NOT_CONFIGURED), 503
+        return fn(*args, **kwargs)
+    return wrapper
+
+# Prompts are shared with the async handlers in app/asgi.py
+
+def title_prompt(content):
+    return f"""Generate a short and clear TITLE for the following code snippet or markdown documentation. Only return the title, nothing else.
+
+{content}"""
+
+def description_prompt(content, language, title):
+    return f"""
+Generate a very short description (maximum 2 lines, around 20–30 words total)
+for the following code snippet or technical content.
+
+Your output must:
+- Be concise
+- Be easy to understand
+- Be helpful for developers
+- NOT include unnecessary details
+- Return ONLY the description text (no title, no bullet points, no explanations)
+
+Title: {title}
+Language: {language}
+Content:
+{content}
+"""
+
+def tags_prompt(content, language, title):
+    return f"""
+Based on the following code snippet or technical content, generate 3 to 6 SHORT, meaningful TAGS.
+
+Rules:
+- Tags must be single words or very short phrases.
+- DO NOT include '#', bullet points, numbering, or explanations.
+- DO NOT include quotes or formatting.
+- Return ONLY the tags separated by commas (example: sorting, python, arrays).
+- No extra text before or after.
+
+Title: {title}
+Language: {language}
+Content:
+{content}
+"""
 
-genai.configure(api_key=api_key)
 
 # route for handling title auto-generation
 @autogen_bp.route('/api/autogen/title', methods=['POST'])
 @jwt_required()
+@requires_api_key
+@admit("autogen")
+@rate_limit("autogen", by="user")
 def generate_title():
     try: 
         data = request.get_json()
         content = data.get("content", "")
         
-        prompt = f"""Generate a short and clear TITLE for the following code snippet or markdown documentation. Only return the title, nothing else.
+        prompt = title_prompt(content)
 
-{content}"""
-
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
+        llm = model(current_app.config['GEMINI_API_KEY'])
+        response = llm.generate_content(prompt)
         
         title = response.text.strip()
 
@@ -45,6 +111,9 @@ def generate_title():
 # route for handling description auto-generation
 @autogen_bp.route('/api/autogen/description', methods=['POST'])
 @jwt_required()
+@requires_api_key
+@admit("autogen")
+@rate_limit("autogen", by="user")
 def generate_description():
     try:
         data = request.get_json()
@@ -52,25 +121,10 @@ def generate_description():
         language = data.get("language", "")
         title = data.get("title", "")
 
-        prompt = f"""
-Generate a very short description (maximum 2 lines, around 20–30 words total)
-for the following code snippet or technical content.
+        prompt = description_prompt(content, language, title)
 
-Your output must:
-- Be concise
-- Be easy to understand
-- Be helpful for developers
-- NOT include unnecessary details
-- Return ONLY the description text (no title, no bullet points, no explanations)
-
-Title: {title}
-Language: {language}
-Content:
-{content}
-"""
-
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
+        llm = model(current_app.config['GEMINI_API_KEY'])
+        response = llm.generate_content(prompt)
 
         description = response.text.strip()
 
@@ -90,6 +144,9 @@ Content:
 # route for handling tags auto-generation
 @autogen_bp.route('/api/autogen/tags', methods=['POST'])
 @jwt_required()
+@requires_api_key
+@admit("autogen")
+@rate_limit("autogen", by="user")
 def generate_tags():
     try:
         data = request.get_json()
@@ -97,24 +154,10 @@ def generate_tags():
         language = data.get("language", "")
         title = data.get("title", "")
 
-        prompt = f"""
-Based on the following code snippet or technical content, generate 3 to 6 SHORT, meaningful TAGS.
-
-Rules:
-- Tags must be single words or very short phrases.
-- DO NOT include '#', bullet points, numbering, or explanations.
-- DO NOT include quotes or formatting.
-- Return ONLY the tags separated by commas (example: sorting, python, arrays).
-- No extra text before or after.
-
-Title: {title}
-Language: {language}
-Content:
-{content}
-"""
+        prompt = tags_prompt(content, language, title)
 
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
+        llm = model(current_app.config['GEMINI_API_KEY'])
+        response = llm.generate_content(prompt)
 
         tags = response.text.strip()
 
@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, select
+from app.models.db_models import ChangeLog, Entry, Snippet, User, db
+from app.models.changes import sync_token
+from app.models.models import BootstrapResponse
+from app.models.routing import request_route, use_route
+
+bootstrap_bp = Blueprint('bootstrap', __name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _pool(workers):
+    # Created on first use, i.e. inside the serving process rather than a pre-fork parent
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bootstrap')
+    return _executor
+
+def _forget_pool():
+    # A forked child has none of the parent's threads; start over with a fresh pool
+    global _executor, _executor_lock
+    _executor, _executor_lock = None, threading.Lock()
+
+os.register_at_fork(after_in_child=_forget_pool)
+
+def gather(*queries):
+    """Run independent query functions, concurrently when the database allows it.
+
+    Each function gets its own app context (and so its own session and pooled connection),
+    reads from the same databases as the request and must return plain rows, not ORM objects. An in-memory SQLite database has a single
+    shared connection, so there they run one after another.
+    """
+    app = current_app._get_current_object()
+    workers = app.config.get('BOOTSTRAP_WORKERS', 4)
+    if workers <= 1 or db.engine.url.database in (None, '', ':memory:'):
+        return [query() for query in queries]
+
+    route = request_route()
+
+    def run(query):
+        with app.app_context():
+            use_route(route)
+            try:
+                return query()
+            finally:
+                db.session.remove()
+
+    return [future.result() for future in [_pool(workers).submit(run, query) for query in queries]]
+
+def _recent_tags(rows, limit=10):
+    counts = Counter(tag.strip() for (tags,) in rows if tags for tag in tags.split(',') if tag.strip())
+    return [{'tag': tag, 'count': count} for tag, count in counts.most_common(limit)]
+
+@bootstrap_bp.route('/api/bootstrap', methods=['GET'])
+@jwt_required()
+def bootstrap():
+    """Everything the web UI needs for its first paint, in one request.
+
+    Returns the username, entry/snippet counts, the most used tags among recently updated
+    items, the first page of entries and snippets in summary form (no bodies, newest first)
+    and a `sync` token for /api/sync and /api/events.
+    """
+    user_id = int(get_jwt_identity())
+    config = current_app.config
+    page = config.get('BOOTSTRAP_PAGE_SIZE', 20)
+    sample = config.get('BOOTSTRAP_TAG_SAMPLE', 200)
+
+    def username():
+        # On its own so it is read from the directory: a shard's copy of the user has no real name
+        return db.session.execute(select(User.username).where(User.id == user_id)).scalar_one()
+
+    def summary():
+        # Counts and the sync position as scalar subqueries: one round trip to the user's shard
+        return db.session.execute(select(
+            select(func.count()).where(Entry.user_id == user_id).scalar_subquery(),
+            select(func.count()).where(Snippet.user_id == user_id).scalar_subquery(),
+            select(func.max(ChangeLog.seq)).where(ChangeLog.user_id == user_id).scalar_subquery(),
+        )).one()
+
+    def first_page(model, *columns):
+        return lambda: db.session.execute(
+            select(model.id, model.title, model.tags, model.created_at, model.updated_at, model.version, *columns)
+            .where(model.user_id == user_id)
+            .order_by(model.updated_at.desc(), model.id.desc())
+            .limit(page)
+        ).all()
+
+    def tag_sample():
+        recent = [
+            select(model.tags).where(model.user_id == user_id, model.tags.isnot(None))
+            .order_by(model.updated_at.desc()).limit(sample).subquery()
+            for model in (Entry, Snippet)
+        ]
+        return db.session.execute(select(recent[0].c.tags).union_all(select(recent[1].c.tags))).all()
+
+    try:
+        name, (entries, snippets, seq), entry_rows, snippet_rows, tag_rows = gather(
+            username, summary, first_page(Entry), first_page(Snippet, Snippet.language, Snippet.description), tag_sample,
+        )
+    except Exception as exc:
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    body = BootstrapResponse.model_validate({
+        'username': name,
+        'counts': {'entries': entries, 'snippets': snippets},
+        'recent_tags': _recent_tags(tag_rows),
+        'entries': entry_rows,
+        'snippets': snippet_rows,
+        'sync': sync_token(seq or 0),
+    }, from_attributes=True)
+    return current_app.response_class(body.model_dump_json(), mimetype='application/json')
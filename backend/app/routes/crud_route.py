@@ -1,11 +1,93 @@
-from flask import Blueprint, request, jsonify
-from app.models.db_models import Entry, Snippet, db
-from app.models.models import CreateEntryRequest, CreateSnippetRequest, UpdateEntryRequest, UpdateSnippetRequest
-from sqlalchemy import or_, and_
+import codecs
+import tempfile
+from collections import Counter
+from flask import Blueprint, current_app, request, jsonify
+from app.models.db_models import Entry, EntryBody, Snippet, acquire_blob, db, release_blobs
+from app.models.types import ZLIB_MARKER
+from app.models.revisions import delete_revisions, item_state, record_revision
+from app.models.edits import apply_edits
+from app.models.changes import DELETE, lock_change_log, log_inserted, record_changes
+from app.models.sharding import allocate_ids
+from app.models.sqlite import search_condition
+from app.models.models import (ENTRY_LIST, ENTRY_SUMMARIES, SNIPPET_LIST, SNIPPET_SUMMARIES, BatchRequest,
+                               BulkEntriesRequest, BulkSnippetsRequest, CreateEntryRequest, CreateSnippetRequest,
+                               EntryResponse, SnippetResponse, UpdateEntryRequest, UpdateSnippetRequest)
+from pydantic import TypeAdapter, ValidationError
+from datetime import datetime
+from sqlalchemy import or_, and_, delete, func, insert, select, update
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.admission import admit
+from app.routes import parse_json
 
 bp = Blueprint('routes', __name__)
 
+def _missing(validated, *fields):
+    """Error response for the first required field that is empty, or None."""
+    for field in fields:
+        if not getattr(validated, field):
+            return jsonify({'error': f'"{field}" is required.'}), 400
+    return None
+
+def _respond(response_model, obj, status=200):
+    """Serialize an ORM object (or list, with a list TypeAdapter) straight to a JSON response."""
+    if isinstance(response_model, TypeAdapter):
+        body = response_model.dump_json(response_model.validate_python(obj, from_attributes=True))
+    else:
+        body = response_model.model_validate(obj).model_dump_json()
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+# List, search and filter routes return full items, bodies loaded in one extra query. With
+# ?summary=1 they return summaries instead (no content / snippet) and never read the bodies
+LIST_BODIES = {Entry: Entry.body, Snippet: Snippet.blob}
+LIST_SCHEMAS = {Entry: (ENTRY_LIST, ENTRY_SUMMARIES), Snippet: (SNIPPET_LIST, SNIPPET_SUMMARIES)}
+
+def _summaries_only():
+    return request.args.get('summary', '').lower() in ('1', 'true')
+
+def _list_query(model):
+    return model.query if _summaries_only() else model.query.options(selectinload(LIST_BODIES[model]))
+
+def _respond_list(model, rows):
+    return _respond(LIST_SCHEMAS[model][_summaries_only()], rows)
+
+def _assign(obj, update, *fields):
+    """Copy the fields the client sent onto the ORM object; null leaves a field alone, except `tags`."""
+    for name, value in update.model_dump(include=set(fields), exclude_unset=True).items():
+        if value is not None or name == 'tags':
+            setattr(obj, name, value)
+
+def _expected_version(update):
+    """Version the client last saw: the body's "version", else an If-Match header. None = unconditional.
+
+    Raises ValueError for an If-Match that isn't one of our version ETags.
+    """
+    if update.version is not None:
+        return update.version
+    if_match = request.headers.get('If-Match')
+    if not if_match or if_match.strip() == '*':
+        return None
+    return int(if_match.strip().removeprefix('W/').strip('"'))
+
+def _edited_body(update, body_field, current):
+    """New body for a PATCH: the full value, the current one with `edits` applied, or None if unchanged.
+
+    Edits only make sense against a known base, so they require a version (body or If-Match);
+    the caller has already rejected stale versions by the time this runs. Raises ValueError.
+    """
+    full = getattr(update, body_field)
+    if update.edits is None:
+        return full
+    if full is not None:
+        raise ValueError(f"send either '{body_field}' or 'edits', not both")
+    return apply_edits(current, update.edits)
+
+def _matches_any(terms, *fields):
+    """Python-side twin of the ilike search conditions, for bodies stored compressed."""
+    haystacks = [f.lower() for f in fields if f]
+    return any(term.lower() in h for term in terms for h in haystacks)
+
 # Insertion 
 
 @bp.route('/api/snippets', methods=['POST'])
@@ -14,36 +96,20 @@ def create_code():
     """Insert a new Code.
 
     Expects JSON body with:
-      - language (str, required)
-      - snippet (str, required)
+      - title, language, snippet, description (str, required)
       - tags (str, optional)
 
     Returns created code (JSON) with status 201 on success, or JSON error with
     appropriate status code."""
+    create_snippet, error = parse_json(CreateSnippetRequest)
+    if error:
+        return error
+    error = _missing(create_snippet, 'title', 'snippet')
+    if error:
+        return error
 
-    data = request.get_json() 
-
-    try:
-        create_snippet = CreateSnippetRequest(**data)
-    except Exception as e:
-        return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
+    code_entry = Snippet(**create_snippet.model_dump(by_alias=True), user_id=get_jwt_identity())
 
-    if not data:
-        return jsonify({'error': 'Request must be JSON'}), 400   # validare request is of json type
-    
-    title = data.get('title')   #Get each key
-    snippets = data.get('snippet')
-    tags = data.get('tags')
-    language = data.get('language')
-    description = data.get('description')
-
-    if not title:
-        return jsonify({'error': '"title" is required.'}), 400  #Validate Each value
-    if not snippets:
-        return jsonify({'error': '"snippets" is required.'}), 400
-   
-    code_entry = Snippet(title=title, code=snippets, tags=tags, language=language, user_id=get_jwt_identity(), description=description)  # ORM or model object for code
-    
     try:
         db.session.add(code_entry) # insert the new entry
         db.session.commit() # commit the transaction
@@ -52,15 +118,7 @@ def create_code():
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
     # Return created resource
-    return jsonify({
-        'id': code_entry.id,
-        'title': code_entry.title,
-        'snippet': code_entry.code,
-        'language': code_entry.language,
-        'tags': code_entry.tags,
-        'created_at': code_entry.created_at.isoformat() if code_entry.created_at else None,
-        'updated_at': code_entry.updated_at.isoformat() if code_entry.updated_at else None,
-    }), 201
+    return _respond(SnippetResponse, code_entry, 201)
 
 
 @bp.route('/api/entries', methods=['POST'])
@@ -76,98 +134,302 @@ def create_entry():
     Returns created entry (JSON) with status 201 on success, or JSON error with
     appropriate status code.
     """
-    data = request.get_json() 
+    create_entry, error = parse_json(CreateEntryRequest)
+    if error:
+        return error
+    error = _missing(create_entry, 'title', 'content')
+    if error:
+        return error
 
-    if not data:
-        return jsonify({'error': 'Request must be JSON'}), 400   # validare request is of json type
+    entry = Entry(**create_entry.model_dump(), user_id=get_jwt_identity())
 
     try:
-        create_entry = CreateEntryRequest(**data)
-    except Exception as e:
-        return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
+        db.session.add(entry) # insert the new entry
+        db.session.commit() # commit the transaction
+    except Exception as exc: 
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    # Return created resource
+    return _respond(EntryResponse, entry, 201)
 
-    title = data.get('title')   #Get each key
-    content = data.get('content')
-    tags = data.get('tags')
+def _batch_create(request_model, required, build):
+    """Validate every item of a batch and insert the valid ones in a single transaction.
 
-    if not title:
-        return jsonify({'error': '"title" is required.'}), 400  #Validate Each value
-    if not content:
-        return jsonify({'error': '"content" is required.'}), 400
+    `required` lists fields that must be non-empty (same checks as the single-item routes)
+    and `build` turns a validated request into an unsaved ORM object.
+    Returns (list of (index, object) inserted, per-item results, error response or None).
+    """
+    batch, error = parse_json(BatchRequest)
+    if error:
+        return None, None, error
+    items = batch.items
+    max_items = current_app.config.get('BATCH_MAX_ITEMS', 1000)
+    if len(items) > max_items:
+        return None, None, (jsonify({'error': f'At most {max_items} items per batch'}), 400)
+
+    results = [None] * len(items)
+    objects = []
+    for index, item in enumerate(items):
+        try:
+            validated = request_model.model_validate(item)
+        except ValidationError as e:
+            results[index] = {'index': index, 'error': 'Invalid request', 'details': str(e)}
+            continue
+        missing = [field for field in required if not getattr(validated, field)]
+        if missing:
+            results[index] = {'index': index, 'error': f'"{missing[0]}" is required.'}
+            continue
+        objects.append((index, build(validated)))
+    return objects, results, None
+
+
+# model -> columns a batch copies from the built objects (plus user_id, version and timestamps)
+BATCH_COLUMNS = {
+    Entry: ("title", "tags"),
+    Snippet: ("title", "description", "language", "tags", "code_hash"),
+}
+
+def _insert_returning_ids(model, rows):
+    """INSERT `rows` into `model`'s table as one multi-row statement and return their new ids, in row order."""
+    table = model.__table__
+    if current_app.extensions.get("db_shards"):
+        ids = allocate_ids(db.session, model, len(rows))
+        db.session.execute(insert(table).values([dict(row, id=id_) for row, id_ in zip(rows, ids)]))
+        return ids
+    # Autoincrement ids of one statement increase in VALUES order
+    stmt = insert(table).values(rows)
+    if db.session.get_bind(mapper=model).dialect.insert_returning:
+        return sorted(db.session.execute(stmt.returning(table.c.id)).scalars())
+    # MySQL has no RETURNING (so the ORM would INSERT row by row to read each id). A multi-row
+    # INSERT is a "simple insert" for InnoDB: it reserves one consecutive block of ids for the
+    # statement up front and reports the first one as LAST_INSERT_ID()
+    first = db.session.execute(stmt).lastrowid
+    return list(range(first, first + len(rows)))
+
+def _insert_in_chunks(model, objects, user_id):
+    """INSERT the objects chunk by chunk, without committing: per chunk one multi-row INSERT into
+    the table (and entry_bodies for entries) and one into change_log. Sets each object's id.
+
+    Statements go through Core rather than a flush, which on MySQL would issue one INSERT per row.
+    Snippet blob references must be acquired beforehand.
+    """
+    chunk_size = current_app.config.get('BATCH_CHUNK_SIZE', 500)
+    columns = BATCH_COLUMNS[model]
+    now = datetime.utcnow()
+    for start in range(0, len(objects), chunk_size):
+        chunk = [obj for _, obj in objects[start:start + chunk_size]]
+        rows = [{**{name: getattr(obj, name) for name in columns},
+                 'user_id': user_id, 'version': 1, 'created_at': now, 'updated_at': now} for obj in chunk]
+        for obj, id_ in zip(chunk, _insert_returning_ids(model, rows)):
+            obj.id = id_
+        if model is Entry:
+            db.session.execute(insert(EntryBody.__table__).values(
+                [{'entry_id': obj.id, 'content': obj.content} for obj in chunk]))
+        log_inserted(model, user_id, [obj.id for obj in chunk])
+
+def _batch_response(objects, results):
+    for index, obj in objects:
+        results[index] = {'index': index, 'id': obj.id}
+    return jsonify({
+        'created': len(objects),
+        'failed': len(results) - len(objects),
+        'results': results,
+    }), 201 if objects else 400
 
-    entry = Entry(title=title, content=content, tags=tags, user_id=get_jwt_identity())  # ORM or model object for entry
+
+@bp.route('/api/snippets/batch', methods=['POST'])
+@jwt_required()
+def create_snippets_batch():
+    """Insert many snippets in one request.
+
+    Expects JSON body {"items": [...]}, each item shaped like the POST /api/snippets body.
+    Invalid items are reported per index and skipped; valid ones are inserted together in one
+    transaction. Returns {"created", "failed", "results": [{"index", "id" | "error"}]}.
+    """
+    user_id = get_jwt_identity()
+    objects, results, error = _batch_create(
+        CreateSnippetRequest, ('title', 'snippet'),
+        lambda s: Snippet(**s.model_dump(by_alias=True), user_id=user_id),
+    )
+    if error:
+        return error
 
     try:
-        db.session.add(entry) # insert the new entry
-        db.session.commit() # commit the transaction
-    except Exception as exc: 
+        lock_change_log(db.session, [user_id])  # before the blob rows, like a flush would
+        # One refcount bump per distinct code instead of one per snippet
+        connection = db.session.connection()
+        counts = Counter(obj.code_hash for _, obj in objects)
+        codes = {obj.code_hash: obj.code for _, obj in objects}
+        for digest, count in counts.items():
+            acquire_blob(connection, digest, codes[digest], count)
+
+        _insert_in_chunks(Snippet, objects, user_id)
+        db.session.commit()
+    except Exception as exc:
         db.session.rollback()
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    # Return created resource
+    return _batch_response(objects, results)
+
+
+@bp.route('/api/entries/batch', methods=['POST'])
+@jwt_required()
+def create_entries_batch():
+    """Insert many entries in one request.
+
+    Expects JSON body {"items": [...]}, each item shaped like the POST /api/entries body.
+    Invalid items are reported per index and skipped; valid ones are inserted together in one
+    transaction. Returns {"created", "failed", "results": [{"index", "id" | "error"}]}.
+    """
+    user_id = get_jwt_identity()
+    objects, results, error = _batch_create(
+        CreateEntryRequest, ('title', 'content'),
+        lambda e: Entry(**e.model_dump(), user_id=user_id),
+    )
+    if error:
+        return error
+
+    try:
+        _insert_in_chunks(Entry, objects, user_id)
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    return _batch_response(objects, results)
+
+# Upload: raw request body as the entry content / snippet code, metadata in the query string.
+# The body is read off the socket in chunks; each chunk is decoded as it arrives and written
+# to a spool that moves to a temporary file past UPLOAD_SPOOL_SIZE, so the raw bytes are never
+# held whole and the text exists in memory once, as the value handed to the model. It is
+# never JSON-parsed.
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SPOOL_SIZE = 1024 * 1024
+
+def _read_upload():
+    """Read request.stream as UTF-8 text. Returns (text, size in bytes).
+
+    Raises ValueError for an empty or non-UTF-8 body. Bodies over MAX_CONTENT_LENGTH are refused
+    with 413 (by Content-Length, or while reading).
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    size = 0
+    # newline='' keeps line endings exactly as sent
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE, mode='w+', encoding='utf-8', newline='') as spool:
+        try:
+            while True:
+                chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                spool.write(decoder.decode(chunk))
+            spool.write(decoder.decode(b'', final=True))  # a character cut off at the end
+        except UnicodeDecodeError as exc:
+            raise ValueError('Request body must be UTF-8 text') from exc
+        if not size:
+            raise ValueError('Request body is empty')
+        spool.seek(0)
+        return spool.read(), size
+
+def _upload(request_model, body_field, build):
+    """Create an item from an uploaded body. Returns (item, body size in bytes, None) or (None, None, error response)."""
+    try:
+        body, size = _read_upload()  # a too-large body raises 413 from here, which must not become a 400
+    except ValueError as e:
+        return None, None, (jsonify({'error': 'Invalid request', 'details': str(e)}), 400)
+    try:
+        fields = request_model.model_validate({**request.args.to_dict(), body_field: body})
+    except ValidationError as e:
+        return None, None, (jsonify({'error': 'Invalid request', 'details': str(e)}), 400)
+    error = _missing(fields, 'title', body_field)
+    if error:
+        return None, None, error
+
+    item = build(fields)
+    try:
+        db.session.add(item)
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return None, None, (jsonify({'error': 'Database error', 'details': str(exc)}), 500)
+    return item, size, None
+
+@bp.route('/api/entries/upload', methods=['POST'])
+@jwt_required()
+def upload_entry():
+    """Create an entry from a large text body.
+
+    The request body is the content (any content type, UTF-8); `title` and `tags` go in the
+    query string. The content is not echoed back, only its size in bytes as received.
+    """
+    entry, size, error = _upload(CreateEntryRequest, 'content', lambda f: Entry(
+        **f.model_dump(), user_id=get_jwt_identity()))
+    if error:
+        return error
+
     return jsonify({
         'id': entry.id,
         'title': entry.title,
-        'content': entry.content,
         'tags': entry.tags,
+        'size': size,
         'created_at': entry.created_at.isoformat() if entry.created_at else None,
-        'updated_at': entry.updated_at.isoformat() if entry.updated_at else None,
+        'version': entry.version,
+    }), 201
+
+@bp.route('/api/snippets/upload', methods=['POST'])
+@jwt_required()
+def upload_snippet():
+    """Create a snippet from a large code body.
+
+    The request body is the code; `title`, `language`, `description` and `tags` go in the
+    query string.
+    """
+    snippet, size, error = _upload(CreateSnippetRequest, 'snippet', lambda f: Snippet(
+        **f.model_dump(by_alias=True), user_id=get_jwt_identity()))
+    if error:
+        return error
+
+    return jsonify({
+        'id': snippet.id,
+        'title': snippet.title,
+        'language': snippet.language,
+        'tags': snippet.tags,
+        'size': size,
+        'created_at': snippet.created_at.isoformat() if snippet.created_at else None,
+        'version': snippet.version,
     }), 201
 
 # Display
 @bp.route('/api/entries', methods=['GET'])
 @jwt_required()
 def get_entries():
-    """Retrieve all entries.
+    """Retrieve all entries (summaries without the content with ?summary=1).
 
     Returns a list of entries (JSON) with status 200 on success, or JSON error with
     appropriate status code.
     """
     try:
-        entries = Entry.query.filter_by(user_id=get_jwt_identity()) # query.all to get all entries
+        entries = _list_query(Entry).filter_by(user_id=get_jwt_identity()).all() # query.all to get all entries
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    entries_list = []
-    for entry in entries:
-        entries_list.append({
-            'id': entry.id,
-            'title': entry.title,
-            'content': entry.content,
-            'tags': entry.tags,
-            'created_at': entry.created_at.isoformat() if entry.created_at else None,
-            'updated_at': entry.updated_at.isoformat() if entry.updated_at else None,
-        })
-
-    return jsonify(entries_list), 200
+    return _respond_list(Entry, entries)
 
 @bp.route('/api/snippets', methods=['GET'])
 @jwt_required()
 def get_snippets():
-    """Retrieve all snippets.
+    """Retrieve all snippets (summaries without the code with ?summary=1).
 
     Returns a list of snippets (JSON) with status 200 on success, or JSON error with
     appropriate status code.
     """
     try:
-        snippets = Snippet.query.filter_by(user_id=get_jwt_identity()) # query.all to get all code snippets
+        snippets = _list_query(Snippet).filter_by(user_id=get_jwt_identity()).all() # query.all to get all code snippets
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    snippets_list = []
-    for snippets in snippets:
-        snippets_list.append({
-            'id': snippets.id,
-            'title': snippets.title,
-            'snippet': snippets.code,
-            'language': snippets.language,
-            'tags': snippets.tags,
-            'description': snippets.description,
-            'created_at': snippets.created_at.isoformat() if snippets.created_at else None,
-            'updated_at': snippets.updated_at.isoformat() if snippets.updated_at else None,
-        })
-
-    return jsonify(snippets_list), 200
+    return _respond_list(Snippet, snippets)
 
 @bp.route('/api/entries/<int:id>', methods=['GET'])
 @jwt_required()
@@ -184,16 +446,9 @@ def get_entry(id):
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    entry_data = {
-        'id': entry.id,
-        'title': entry.title,
-        'content': entry.content,
-        'tags': entry.tags,
-        'created_at': entry.created_at.isoformat() if entry.created_at else None,
-        'updated_at': entry.updated_at.isoformat() if entry.updated_at else None,
-    }
-
-    return jsonify(entry_data), 200
+    response = _respond(EntryResponse, entry)
+    response.set_etag(str(entry.version))  # echo back in If-Match on PATCH
+    return response
 
 @bp.route('/api/snippets/<int:id>', methods=['GET'])
 @jwt_required()
@@ -210,18 +465,9 @@ def get_snippet(id):
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    snippet_data = {
-        'id': snippet.id,
-        'title': snippet.title,
-        'snippet': snippet.code,
-        'tags': snippet.tags,
-        'language': snippet.language,
-        'description': snippet.description,
-        'created_at': snippet.created_at.isoformat() if snippet.created_at else None,
-        'updated_at': snippet.updated_at.isoformat() if snippet.updated_at else None,
-    }
-
-    return jsonify(snippet_data), 200
+    response = _respond(SnippetResponse, snippet)
+    response.set_etag(str(snippet.version))  # echo back in If-Match on PATCH
+    return response
 
 @bp.route('/api/snippets/<int:id>', methods=['DELETE'])
 @jwt_required()
@@ -239,6 +485,7 @@ def delete_snippet(id):
             return jsonify({'error': 'Snippet not found'}), 404
 
         db.session.delete(snippet)
+        delete_revisions('snippet', [id])
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
@@ -262,6 +509,7 @@ def delete_entries(id):
             return jsonify({'error': 'Entry not found'}), 404
 
         db.session.delete(entry)
+        delete_revisions('entry', [id])
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
@@ -274,36 +522,47 @@ def delete_entries(id):
 @jwt_required()
 def update_entry():
     """Update an existing entry by ID."""
-    data = request.get_json()
+    update_entry, error = parse_json(UpdateEntryRequest)
+    if error:
+        return error
 
-    # Validate request body using Pydantic model
     try:
-        update_entry = UpdateEntryRequest(**data)
-    except Exception as e:
-        return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
-
-    if not data:
-        return jsonify({'error': 'Request must be JSON'}), 400
+        expected_version = _expected_version(update_entry)
+    except ValueError:
+        return jsonify({'error': 'Invalid If-Match header'}), 400
 
-    entry = Entry.query.filter_by(id=data['id'], user_id=get_jwt_identity()).first()
+    entry = Entry.query.filter_by(id=update_entry.id, user_id=get_jwt_identity()).first()
     if not entry:
         return jsonify({'error': 'Entry not found'}), 404
 
+    # Optimistic concurrency: refuse to overwrite changes the client hasn't seen
+    if expected_version is not None and expected_version != entry.version:
+        return jsonify({'error': 'Entry was modified by another request', 'version': entry.version}), 409
+
+    if update_entry.edits is not None and expected_version is None:
+        return jsonify({'error': 'Edits require the base version (version or If-Match)'}), 428
+    if expected_version is None and current_app.config.get('REQUIRE_UPDATE_VERSION'):
+        return jsonify({'error': 'Updates require the version last read (version or If-Match)'}), 428
+
+    old_state = item_state('entry', entry)
+    try:
+        content = _edited_body(update_entry, 'content', old_state['content'])
+    except ValueError as exc:
+        return jsonify({'error': 'Invalid edits', 'details': str(exc)}), 400
+
     # Update only provided fields
-    entry.title = data.get('title', entry.title)
-    entry.content = data.get('content', entry.content)
-    entry.tags = data.get('tags', entry.tags)
+    _assign(entry, update_entry, 'title', 'tags')
+    if content is not None:
+        entry.content = content
 
     try:
+        record_revision('entry', entry.id, entry.user_id, old_state, item_state('entry', entry))
         db.session.commit()
-        return jsonify({
-            'id': entry.id,
-            'title': entry.title,
-            'content': entry.content,
-            'tags': entry.tags,
-            'created_at': entry.created_at.isoformat() if entry.created_at else None,
-            'updated_at': entry.updated_at.isoformat() if entry.updated_at else None,
-        }), 200
+        return _respond(EntryResponse, entry)
+    except StaleDataError:
+        # Someone else updated the row between our read and our write (the UPDATE matched no row)
+        db.session.rollback()
+        return jsonify({'error': 'Entry was modified by another request'}), 409
     except Exception as exc:
         db.session.rollback()
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
@@ -313,48 +572,192 @@ def update_entry():
 @jwt_required()
 def update_snippet():
     """Update an existing snippet by ID."""
-    data = request.get_json()
+    update_snippet, error = parse_json(UpdateSnippetRequest)
+    if error:
+        return error
 
-    # Validate request body using Pydantic model
     try:
-        update_snippet = UpdateSnippetRequest(**data)
-    except Exception as e:
-        return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
-    
-    if not data:
-        return jsonify({'error': 'Request must be JSON'}), 400
+        expected_version = _expected_version(update_snippet)
+    except ValueError:
+        return jsonify({'error': 'Invalid If-Match header'}), 400
 
-    snippet = Snippet.query.filter_by(id=data['id'], user_id=get_jwt_identity()).first()
+    snippet = Snippet.query.filter_by(id=update_snippet.id, user_id=get_jwt_identity()).first()
     if not snippet:
         return jsonify({'error': 'Snippet not found'}), 404
 
-    snippet.title = data.get('title', snippet.title)
-    snippet.code = data.get('snippet', snippet.code)
-    snippet.tags = data.get('tags', snippet.tags)
-    snippet.language = data.get('language', snippet.language)
-    snippet.description = data.get('description', snippet.description)
+    # Optimistic concurrency: refuse to overwrite changes the client hasn't seen
+    if expected_version is not None and expected_version != snippet.version:
+        return jsonify({'error': 'Snippet was modified by another request', 'version': snippet.version}), 409
+
+    if update_snippet.edits is not None and expected_version is None:
+        return jsonify({'error': 'Edits require the base version (version or If-Match)'}), 428
+    if expected_version is None and current_app.config.get('REQUIRE_UPDATE_VERSION'):
+        return jsonify({'error': 'Updates require the version last read (version or If-Match)'}), 428
 
+    old_state = item_state('snippet', snippet)
     try:
+        code = _edited_body(update_snippet, 'snippet', old_state['code'])
+    except ValueError as exc:
+        return jsonify({'error': 'Invalid edits', 'details': str(exc)}), 400
+
+    _assign(snippet, update_snippet, 'title', 'tags', 'language', 'description')
+    if code is not None:
+        snippet.code = code
+
+    try:
+        record_revision('snippet', snippet.id, snippet.user_id, old_state, item_state('snippet', snippet))
         db.session.commit()
-        return jsonify({
-            'id': snippet.id,
-            'title': snippet.title,
-            'snippet': snippet.code,
-            'language': snippet.language,
-            'tags': snippet.tags,
-            'description': snippet.description,
-            'created_at': snippet.created_at.isoformat() if snippet.created_at else None,
-            'updated_at': snippet.updated_at.isoformat() if snippet.updated_at else None,
-        }), 200
+        return _respond(SnippetResponse, snippet)
+    except StaleDataError:
+        # Someone else updated the row between our read and our write (the UPDATE matched no row)
+        db.session.rollback()
+        return jsonify({'error': 'Snippet was modified by another request'}), 409
     except Exception as exc:
         db.session.rollback()
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
     
 
 
+# Bulk update / delete (set-based, one statement per table)
+
+# filter key -> column it matches with "contains", same semantics as the /filter/ routes
+BULK_FILTER_COLUMNS = {
+    Entry: {'tag': Entry.tags, 'title': Entry.title},
+    Snippet: {'tag': Snippet.tags, 'title': Snippet.title, 'language': Snippet.language},
+}
+
+def _bulk_condition(model, bulk):
+    """WHERE clause for the caller's selected rows. Returns (condition, None) or (None, error response)."""
+    if (bulk.ids is None) == (bulk.filter is None):
+        return None, (jsonify({'error': 'Provide exactly one of "ids" or "filter"'}), 400)
+
+    # Always scoped to the caller, whatever else the selection says
+    conditions = [model.user_id == get_jwt_identity()]
+    if bulk.ids is not None:
+        max_ids = current_app.config.get('BULK_MAX_IDS', 1000)
+        if not bulk.ids or len(bulk.ids) > max_ids:
+            return None, (jsonify({'error': f'"ids" must list between 1 and {max_ids} ids'}), 400)
+        conditions.append(model.id.in_(bulk.ids))
+    else:
+        given = bulk.filter.model_dump(exclude_none=True)
+        if not given:
+            return None, (jsonify({'error': '"filter" needs at least one condition'}), 400)
+        columns = BULK_FILTER_COLUMNS[model]
+        conditions.extend(columns[key].contains(value) for key, value in given.items())
+    return and_(*conditions), None
+
+def _bulk_update(model, request_model):
+    bulk, error = parse_json(request_model)
+    if error:
+        return error
+    condition, error = _bulk_condition(model, bulk)
+    if error:
+        return error
+    values = bulk.set.model_dump(exclude_none=True) if bulk.set else {}
+    if not values:
+        return jsonify({'error': '"set" needs at least one field'}), 400
+
+    try:
+        record_changes(model, condition)
+        # Bumping version makes in-flight single-item PATCHes of these rows fail with 409
+        result = db.session.execute(
+            update(model).where(condition)
+            .values(**values, updated_at=datetime.utcnow(), version=model.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    return jsonify({'updated': result.rowcount}), 200
+
+@bp.route('/api/entries/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update_entries():
+    """Update title/tags of many entries with one UPDATE.
+
+    Expects JSON body with "ids" (list of ids) or "filter" ({"tag", "title"}), and "set"
+    ({"title", "tags"}). Returns {"updated": <count>}.
+    """
+    return _bulk_update(Entry, BulkEntriesRequest)
+
+@bp.route('/api/snippets/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update_snippets():
+    """Update metadata of many snippets with one UPDATE.
+
+    Expects JSON body with "ids" (list of ids) or "filter" ({"tag", "title", "language"}),
+    and "set" ({"title", "language", "tags", "description"}). Returns {"updated": <count>}.
+    """
+    return _bulk_update(Snippet, BulkSnippetsRequest)
+
+@bp.route('/api/entries/bulk', methods=['DELETE'])
+@jwt_required()
+def bulk_delete_entries():
+    """Delete many entries (with their bodies and history) in one transaction.
+
+    Expects JSON body with "ids" or "filter" as for PATCH /api/entries/bulk.
+    Returns {"deleted": <count>}.
+    """
+    bulk, error = parse_json(BulkEntriesRequest)
+    if error:
+        return error
+    condition, error = _bulk_condition(Entry, bulk)
+    if error:
+        return error
+
+    selected = select(Entry.id).where(condition)
+    try:
+        record_changes(Entry, condition, DELETE)
+        db.session.execute(delete(EntryBody).where(EntryBody.entry_id.in_(selected)).execution_options(synchronize_session=False))
+        delete_revisions('entry', selected)
+        result = db.session.execute(delete(Entry).where(condition).execution_options(synchronize_session=False))
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    return jsonify({'deleted': result.rowcount}), 200
+
+@bp.route('/api/snippets/bulk', methods=['DELETE'])
+@jwt_required()
+def bulk_delete_snippets():
+    """Delete many snippets (releasing their code blobs) in one transaction.
+
+    Expects JSON body with "ids" or "filter" as for PATCH /api/snippets/bulk.
+    Returns {"deleted": <count>}.
+    """
+    bulk, error = parse_json(BulkSnippetsRequest)
+    if error:
+        return error
+    condition, error = _bulk_condition(Snippet, bulk)
+    if error:
+        return error
+
+    try:
+        # The user row first, as every writer does (see lock_change_log), then the snippet rows
+        lock_change_log(db.session, [get_jwt_identity()])
+        # References to drop per blob, gathered before the rows disappear
+        blob_counts = dict(db.session.execute(
+            select(Snippet.code_hash, func.count()).where(condition).group_by(Snippet.code_hash).with_for_update()
+        ).all())
+        record_changes(Snippet, condition, DELETE)
+        delete_revisions('snippet', select(Snippet.id).where(condition))
+        result = db.session.execute(delete(Snippet).where(condition).execution_options(synchronize_session=False))
+        release_blobs(db.session.connection(), blob_counts)
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    return jsonify({'deleted': result.rowcount}), 200
+
+
 # search entries 
 @bp.route('/api/entries/search', methods=['GET'])
 @jwt_required()
+@admit("search")
 def search_entries():
     """fuzzy search entries by title, content, or tags."""
     query = request.args.get('q')
@@ -362,10 +765,10 @@ def search_entries():
         return jsonify({'error': 'Search query (q) is required'}), 400
 
     try:
-        # Split the query into individual words
-        search_terms = query.strip().split()
-        
-        conditions = []
+        # Split the query into individual words; the FTS index (SQLite) answers the ones it can
+        terms = query.strip().split()
+        fts_match, search_terms = search_condition(Entry, terms)
+        conditions = [] if fts_match is None else [fts_match]
         for term in search_terms:
             term_pattern = f'%{term}%'
             conditions.append(
@@ -375,7 +778,13 @@ def search_entries():
                     Entry.tags.ilike(term_pattern)
                 )
             )
-        results = Entry.query.filter(and_(Entry.user_id == get_jwt_identity(), or_(*conditions))).all()
+        # Compressed bodies can't be matched with LIKE, so pull those rows in too and check them
+        # below (the FTS index holds them decoded)
+        compressed = Entry.content.startswith(ZLIB_MARKER)
+        if search_terms or not conditions:
+            conditions.append(compressed)
+        candidates = _list_query(Entry).add_columns(compressed).filter(and_(Entry.user_id == get_jwt_identity(), or_(*conditions))).all()
+        results = [e for e, is_compressed in candidates if not is_compressed or _matches_any(terms, e.title, e.content, e.tags)]
         
         # SQL equivalent:
         """
@@ -392,20 +801,12 @@ def search_entries():
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    entries_list = [{
-        'id': e.id,
-        'title': e.title,
-        'content': e.content,
-        'tags': e.tags,
-        'created_at': e.created_at.isoformat() if e.created_at else None,
-        'updated_at': e.updated_at.isoformat() if e.updated_at else None,
-    } for e in results]
-
-    return jsonify(entries_list), 200
+    return _respond_list(Entry, results)
 
 
 @bp.route('/api/snippets/search', methods=['GET'])
 @jwt_required()
+@admit("search")
 def search_snippets():
     """fuzzy search snippet by title, code, language or tags."""
     query = request.args.get('q')
@@ -413,10 +814,10 @@ def search_snippets():
         return jsonify({'error': 'Search query (q) is required'}), 400
 
     try:
-        # Split the query into individual words
-        search_terms = query.strip().split()
-        
-        conditions = []
+        # Split the query into individual words; the FTS index (SQLite) answers the ones it can
+        terms = query.strip().split()
+        fts_match, search_terms = search_condition(Snippet, terms)
+        conditions = [] if fts_match is None else [fts_match]
         for term in search_terms:
             term_pattern = f'%{term}%'
             conditions.append(
@@ -427,7 +828,13 @@ def search_snippets():
                     Snippet.language.ilike(term_pattern)
                 )
             )
-        results = Snippet.query.filter(and_(Snippet.user_id == get_jwt_identity(),or_(*conditions))).all()
+        # Compressed bodies can't be matched with LIKE, so pull those rows in too and check them
+        # below (the FTS index holds them decoded)
+        compressed = Snippet.code.startswith(ZLIB_MARKER)
+        if search_terms or not conditions:
+            conditions.append(compressed)
+        candidates = _list_query(Snippet).add_columns(compressed).filter(and_(Snippet.user_id == get_jwt_identity(), or_(*conditions))).all()
+        results = [s for s, is_compressed in candidates if not is_compressed or _matches_any(terms, s.title, s.code, s.tags, s.language)]
         
         # SQL equivalent:
         """
@@ -444,17 +851,7 @@ def search_snippets():
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    snippets_list = [{
-        'id': s.id,
-        'title': s.title,
-        'snippet': s.code,
-        'language': s.language,
-        'tags': s.tags,
-        'created_at': s.created_at.isoformat() if s.created_at else None,
-        'updated_at': s.updated_at.isoformat() if s.updated_at else None,
-    } for s in results]
-
-    return jsonify(snippets_list), 200
+    return _respond_list(Snippet, results)
 
 @bp.route('/api/snippets/filter/tag/<string:tag>', methods=['GET'])
 @jwt_required()
@@ -463,26 +860,13 @@ def filter_snippet_by_tag(tag):
     Returns the snippet (JSON) with status 200 on success, or JSON error with appropriate status code.
     """
     try:
-        snippets = Snippet.query.filter(Snippet.user_id==get_jwt_identity(), Snippet.tags.contains(tag)).all()
+        snippets = _list_query(Snippet).filter(Snippet.user_id==get_jwt_identity(), Snippet.tags.contains(tag)).all()
         if not snippets:
             return jsonify({'error': 'No snippets found'}), 404
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    snippets_data = []
-    for snippet in snippets:
-        snippets_data.append({
-        'id': snippet.id,
-        'title': snippet.title,
-        'snippet': snippet.code,
-        'language': snippet.language,
-        'tags': snippet.tags,
-        'description': snippet.description,
-        'created_at': snippet.created_at.isoformat() if snippet.created_at else None,
-        'updated_at': snippet.updated_at.isoformat() if snippet.updated_at else None,
-    })
-    
-    return jsonify(snippets_data), 200
+    return _respond_list(Snippet, snippets)
 
 @bp.route('/api/snippets/filter/language/<string:lang>', methods=['GET'])
 @jwt_required()
@@ -491,26 +875,13 @@ def filter_snippet_by_lang(lang):
     Returns the snippet (JSON) with status 200 on success, or JSON error with appropriate status code.
     """
     try:
-        snippets = Snippet.query.filter(Snippet.user_id==get_jwt_identity(), Snippet.language.contains(lang)).all()
+        snippets = _list_query(Snippet).filter(Snippet.user_id==get_jwt_identity(), Snippet.language.contains(lang)).all()
         if not snippets:
             return jsonify({'error': 'No snippets found'}), 404
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    snippets_data = []
-    for snippet in snippets:
-        snippets_data.append({
-        'id': snippet.id,
-        'title': snippet.title,
-        'snippet': snippet.code,
-        'language': snippet.language,
-        'tags': snippet.tags,
-        'description': snippet.description,
-        'created_at': snippet.created_at.isoformat() if snippet.created_at else None,
-        'updated_at': snippet.updated_at.isoformat() if snippet.updated_at else None,
-    })
-    
-    return jsonify(snippets_data), 200
+    return _respond_list(Snippet, snippets)
 
 @bp.route('/api/entries/filter/tag/<string:tag>', methods=['GET'])
 @jwt_required()
@@ -519,24 +890,13 @@ def filter_entry_by_tag(tag):
     Returns the entry (JSON) with status 200 on success, or JSON error with appropriate status code.
     """
     try:
-        entries = Entry.query.filter(Entry.user_id==get_jwt_identity(), Entry.tags.contains(tag)).all()
+        entries = _list_query(Entry).filter(Entry.user_id==get_jwt_identity(), Entry.tags.contains(tag)).all()
         if not entries:
             return jsonify({'error': 'No entries found'}), 404
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    entry_data = []
-    for entry in entries:
-        entry_data.append({
-            'id': entry.id,
-        'title': entry.title,
-        'content': entry.content,
-        'tags': entry.tags,
-        'created_at': entry.created_at.isoformat() if entry.created_at else None,
-        'updated_at': entry.updated_at.isoformat() if entry.updated_at else None,
-    })
-
-    return jsonify(entry_data), 200
+    return _respond_list(Entry, entries)
 
 @bp.route('/api/entries/filter/title/<string:title>', methods=['GET'])
 @jwt_required()
@@ -545,24 +905,13 @@ def filter_entry_by_title(title):
     Returns the entry (JSON) with status 200 on success, or JSON error with appropriate status code.
     """
     try:
-        entries = Entry.query.filter(Entry.user_id==get_jwt_identity(), Entry.title.contains(title)).all()
+        entries = _list_query(Entry).filter(Entry.user_id==get_jwt_identity(), Entry.title.contains(title)).all()
         if not entries:
             return jsonify({'error': 'No entries found'}), 404
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    entry_data = []
-    for entry in entries:
-        entry_data.append({
-            'id': entry.id,
-        'title': entry.title,
-        'content': entry.content,
-        'tags': entry.tags,
-        'created_at': entry.created_at.isoformat() if entry.created_at else None,
-        'updated_at': entry.updated_at.isoformat() if entry.updated_at else None,
-    })
-
-    return jsonify(entry_data), 200
+    return _respond_list(Entry, entries)
 
 @bp.route('/api/snippets/filter/title/<string:title>', methods=['GET'])
 @jwt_required()
@@ -571,23 +920,10 @@ def filter_snippet_by_title(title):
     Returns the snippet (JSON) with status 200 on success, or JSON error with appropriate status code.
     """
     try:
-        snippets = Snippet.query.filter(Snippet.user_id==get_jwt_identity(), Snippet.title.contains(title)).all()
+        snippets = _list_query(Snippet).filter(Snippet.user_id==get_jwt_identity(), Snippet.title.contains(title)).all()
         if not snippets:
             return jsonify({'error': 'No snippets found'}), 404
     except Exception as exc:
         return jsonify({'error': 'Database error', 'details': str(exc)}), 500
 
-    snippet_data = []
-    for snippet in snippets:
-        snippet_data.append({
-            'id': snippet.id,
-            'title': snippet.title,
-            'snippet': snippet.code,
-            'language': snippet.language,
-            'tags': snippet.tags,
-            'description': snippet.description,
-        'created_at': snippet.created_at.isoformat() if snippet.created_at else None,
-        'updated_at': snippet.updated_at.isoformat() if snippet.updated_at else None,
-    })
-
-    return jsonify(snippet_data), 200
\ No newline at end of file
+    return _respond_list(Snippet, snippets)
\ No newline at end of file
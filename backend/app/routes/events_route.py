@@ -0,0 +1,131 @@
+import json
+import queue
+import time
+from datetime import timedelta
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, get_jwt_request_location, jwt_required
+from app.admission import shed
+from app.events import events_since, latest_seq
+from app.models.changes import parse_sync_token, sync_token
+from app.models.db_models import db
+
+events_bp = Blueprint('events', __name__)
+
+def format_event(evt, shard=None):
+    """One SSE message; the id is the sync token of the change, for Last-Event-ID."""
+    data = {k: evt[k] for k in ('type', 'id', 'op', 'version')}
+    return f"id: {sync_token(evt['seq'], shard)}\nevent: change\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+def keep_alive(token=None):
+    """SSE comment that keeps proxies from closing an idle stream; with `token`, it also sets
+    the EventSource's Last-Event-ID (an id line without data dispatches no event)."""
+    return f"id: {token}\n: keep-alive\n\n" if token is not None else ": keep-alive\n\n"
+
+# Stream tokens: EventSource can't send an Authorization header, so /api/events also takes a
+# token as ?jwt=<token>. URLs end up in access logs, so only a short-lived token scoped to the
+# stream is accepted there (auth_route.stream_token_scope keeps it off every other route)
+STREAM_SCOPE = 'events'
+
+def query_token_refused(claims, location):
+    """Error message if a token from `location` may not open a stream, else None."""
+    if location == 'query_string' and claims.get('scope') != STREAM_SCOPE:
+        return 'Only stream tokens (POST /api/events/token) are accepted in the query string'
+    return None
+
+@events_bp.route('/api/events/token', methods=['POST'])
+@jwt_required()
+def stream_token():
+    """A token that opens /api/events (and nothing else) for EVENTS_TOKEN_SECONDS.
+
+    Returns {"token", "expires_in"}. It is checked when a stream opens, not while it runs.
+    """
+    seconds = current_app.config.get('EVENTS_TOKEN_SECONDS', 60)
+    token = create_access_token(identity=get_jwt_identity(), expires_delta=timedelta(seconds=seconds),
+                                additional_claims={'scope': STREAM_SCOPE})
+    return jsonify({'token': token, 'expires_in': seconds}), 200
+
+@events_bp.route('/api/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def events():
+    """Server-Sent Events stream of the user's entry/snippet changes.
+
+    Each event is `{"type", "id", "op", "version"}` with the change log seq as its id, so a
+    reconnecting EventSource resumes after Last-Event-ID without gaps. A stream opened without
+    a position carries the current one on its first keep-alive. The stream ends after
+    EVENTS_MAX_STREAM_SECONDS and the browser reconnects on its own.
+
+    Each open stream holds a request thread for its whole life, so a worker serves at most the
+    "events" admission class's concurrency of them and answers 503 beyond that (under ASGI,
+    streams hold no thread and aren't capped).
+    """
+    refused = query_token_refused(get_jwt(), get_jwt_request_location())
+    if refused:
+        return jsonify({'msg': refused}), 401
+    user_id = int(get_jwt_identity())
+    try:
+        since = parse_sync_token(request.headers.get('Last-Event-ID') or request.args.get('since') or -1)
+    except ValueError:
+        return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+
+    gate = current_app.extensions['admission'].get('events')
+    if gate is not None and not gate.acquire():
+        return shed('events')
+    try:
+        response = _open_stream(user_id, since)
+    except BaseException:
+        if gate is not None:
+            gate.release()
+        raise
+    if gate is not None:
+        if response.status_code == 200:
+            response.call_on_close(gate.release)  # runs however the stream ends
+        else:
+            gate.release()
+    return response
+
+def _open_stream(user_id, since):
+    config = current_app.config
+    feed = current_app.extensions['change_feed']
+    subscription = feed.subscribe(user_id)
+    try:
+        # Catch up on what was missed while disconnected; live events come from the feed
+        if since < 0:
+            backlog, sent = [], latest_seq(user_id)
+        else:
+            backlog = events_since(user_id, since, config.get('SYNC_PAGE_SIZE', 500))
+            sent = backlog[-1]['seq'] if backlog else since
+    except Exception as exc:
+        feed.unsubscribe(user_id, subscription)
+        response = jsonify({'error': 'Database error', 'details': str(exc)})
+        response.status_code = 500
+        return response
+    finally:
+        db.session.remove()  # don't hold a pooled connection for the life of the stream
+
+    heartbeat = config.get('EVENTS_HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + config.get('EVENTS_MAX_STREAM_SECONDS', 300)
+
+    def stream(sent):
+        try:
+            yield 'retry: 3000\n\n'
+            for evt in backlog:
+                yield format_event(evt)
+            position = since < 0  # no event carries an id yet: give the reconnect a position
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    evt = subscription.get(timeout=min(heartbeat, remaining))
+                except queue.Empty:
+                    yield keep_alive(sync_token(sent) if position else None)
+                    position = False
+                    continue
+                if evt['seq'] > sent:
+                    sent = evt['seq']
+                    position = False
+                    yield format_event(evt)
+        finally:
+            feed.unsubscribe(user_id, subscription)
+
+    return Response(stream_with_context(stream(sent)), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # nginx must not buffer the stream
+    })
@@ -3,11 +3,13 @@ import json
 from app.models.db_models import Entry, Snippet, db
 from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.admission import admit
 
 e_bp = Blueprint('export_route', __name__)
 
 @e_bp.route('/api/export-entry-md/<int:entry_id>',methods=['GET'])
 @jwt_required()
+@admit("export")
 def export_entry_md(entry_id):
 
     '''
@@ -50,6 +52,7 @@ def export_entry_md(entry_id):
 
 @e_bp.route('/api/export-snippet-md/<int:snippet_id>',methods=['GET'])
 @jwt_required()
+@admit("export")
 def export_snippet_md(snippet_id):
     '''
     Export the selected entry in the form of a Markdown (.md) file using the provided snippet id
@@ -90,6 +93,7 @@ def export_snippet_md(snippet_id):
 
 @e_bp.route('/api/export-snippet-json/<int:snippet_id>',methods=['GET'])
 @jwt_required()
+@admit("export")
 def export_snippet_json(snippet_id):
     '''
     Export the selected snippet in the form of a json (.json) file using the provided entry id
@@ -132,6 +136,7 @@ def export_snippet_json(snippet_id):
 
 @e_bp.route('/api/export-entry-json/<int:entry_id>',methods=['GET'])
 @jwt_required()
+@admit("export")
 def export_entry_json(entry_id):
     '''
     Export the selected entry in the form of a json (.json) file using the provided entry id
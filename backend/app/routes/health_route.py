@@ -0,0 +1,36 @@
+import hmac
+import os
+from flask import Blueprint, current_app, jsonify, request
+from app.models.db_models import db
+from app.admission import admission_status
+from app.pool import pool_status
+
+health_bp = Blueprint('health', __name__)
+
+LOOPBACK = ('127.0.0.1', '::1')
+
+@health_bp.before_request
+def internal_only():
+    """The health routes expose worker pids and capacity. With HEALTH_TOKEN set they need it in
+    X-Health-Token; without one they only answer requests from the host itself."""
+    token = current_app.config.get('HEALTH_TOKEN')
+    if token:
+        if not hmac.compare_digest(request.headers.get('X-Health-Token', '').encode(), token.encode()):
+            return jsonify({'error': 'Health token required'}), 401
+    elif request.remote_addr not in LOOPBACK:
+        return jsonify({'error': 'Health endpoints are only served to localhost without HEALTH_TOKEN'}), 403
+    return None
+
+@health_bp.route('/api/health/pool', methods=['GET'])
+def get_pool_health():
+    """Connection pool occupancy and wait statistics of the worker that serves the request.
+
+    Each gunicorn worker has its own pool; `pid` tells the workers apart when polling.
+    """
+    return jsonify({'pid': os.getpid(), 'pool': pool_status(db.engine.pool)}), 200
+
+@health_bp.route('/api/health/admission', methods=['GET'])
+def get_admission_health():
+    """Admission gates of the worker that serves the request: slots in use, queue depth, and
+    admitted/queued/shed counters per route class (see app/admission.py)."""
+    return jsonify({'pid': os.getpid(), 'admission': admission_status(current_app)}), 200
@@ -0,0 +1,75 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.revisions import list_revisions, load_revision
+
+rev_bp = Blueprint('revisions', __name__)
+
+def _revision_list(item_type, item_id):
+    try:
+        revisions = list_revisions(item_type, item_id, get_jwt_identity())
+    except Exception as exc:
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+    if not revisions:
+        return jsonify({'error': 'No revisions found'}), 404
+
+    return jsonify([{
+        'number': r.number,
+        'snapshot': r.is_snapshot,
+        'created_at': r.created_at.isoformat() if r.created_at else None,
+    } for r in revisions]), 200
+
+@rev_bp.route('/api/entries/<int:id>/revisions', methods=['GET'])
+@jwt_required()
+def get_entry_revisions(id):
+    """List the stored revisions of an entry, oldest first."""
+    return _revision_list('entry', id)
+
+@rev_bp.route('/api/snippets/<int:id>/revisions', methods=['GET'])
+@jwt_required()
+def get_snippet_revisions(id):
+    """List the stored revisions of a snippet, oldest first."""
+    return _revision_list('snippet', id)
+
+@rev_bp.route('/api/entries/<int:id>/revisions/<int:number>', methods=['GET'])
+@jwt_required()
+def get_entry_revision(id, number):
+    """Return an entry as it was at revision `number`."""
+    try:
+        found = load_revision('entry', id, get_jwt_identity(), number)
+    except Exception as exc:
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+    if not found:
+        return jsonify({'error': 'Revision not found'}), 404
+
+    state, created_at = found
+    return jsonify({
+        'id': id,
+        'number': number,
+        'title': state['title'],
+        'content': state['content'],
+        'tags': state['tags'],
+        'created_at': created_at.isoformat() if created_at else None,
+    }), 200
+
+@rev_bp.route('/api/snippets/<int:id>/revisions/<int:number>', methods=['GET'])
+@jwt_required()
+def get_snippet_revision(id, number):
+    """Return a snippet as it was at revision `number`."""
+    try:
+        found = load_revision('snippet', id, get_jwt_identity(), number)
+    except Exception as exc:
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+    if not found:
+        return jsonify({'error': 'Revision not found'}), 404
+
+    state, created_at = found
+    return jsonify({
+        'id': id,
+        'number': number,
+        'title': state['title'],
+        'snippet': state['code'],
+        'language': state['language'],
+        'tags': state['tags'],
+        'description': state['description'],
+        'created_at': created_at.isoformat() if created_at else None,
+    }), 200
@@ -0,0 +1,59 @@
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import selectinload
+from app.models.changes import DELETE, changes_since, parse_sync_token, sync_token
+from app.models.db_models import Entry, Snippet
+from app.models.models import SyncResponse
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('/api/sync', methods=['GET'])
+@jwt_required()
+def sync():
+    """Entries and snippets created, updated or deleted since a sync token.
+
+    Query parameters: `since` (token from the previous response, 0 or omitted for everything
+    in the change log) and `limit` (changes per page, capped at SYNC_PAGE_SIZE).
+    Returns the current state of changed items, the ids of deleted ones, the `next` token
+    and `has_more`; keep calling with `next` until `has_more` is false.
+    """
+    page_size = current_app.config.get('SYNC_PAGE_SIZE', 500)
+    try:
+        since = parse_sync_token(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', page_size)), page_size)
+    except ValueError:
+        return jsonify({'error': '"since" must be a sync token and "limit" an integer'}), 400
+    if since < 0 or limit < 1:
+        return jsonify({'error': '"since" and "limit" must be positive'}), 400
+
+    user_id = get_jwt_identity()
+    try:
+        rows = changes_since(user_id, since, limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Latest op per item wins; an item changed several times in the page is sent once
+        latest = {(row.item_type, row.item_id): row.op for row in rows}
+        deleted = {'entry': [], 'snippet': []}
+        changed = {'entry': [], 'snippet': []}
+        for (item_type, item_id), op in latest.items():
+            (deleted if op == DELETE else changed)[item_type].append(item_id)
+
+        # An item logged as changed but gone by now has its delete further down the log
+        entries = (Entry.query.options(selectinload(Entry.body))
+                   .filter(Entry.user_id == user_id, Entry.id.in_(changed['entry'])).all()
+                   if changed['entry'] else [])
+        snippets = (Snippet.query.options(selectinload(Snippet.blob))
+                    .filter(Snippet.user_id == user_id, Snippet.id.in_(changed['snippet'])).all()
+                    if changed['snippet'] else [])
+    except Exception as exc:
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    body = SyncResponse.model_validate({
+        'entries': entries,
+        'snippets': snippets,
+        'deleted': {'entries': deleted['entry'], 'snippets': deleted['snippet']},
+        'next': sync_token(rows[-1].seq if rows else since),
+        'has_more': has_more,
+    }, from_attributes=True)
+    return current_app.response_class(body.model_dump_json(), mimetype='application/json')
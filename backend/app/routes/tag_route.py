@@ -0,0 +1,56 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.db_models import db
+from app.models.models import MergeTagsRequest, RenameTagRequest
+from app.models.tags import merge_tags
+from app.routes import parse_json
+
+tag_bp = Blueprint('tags', __name__)
+
+def _clean_tag(tag):
+    """Tags are stored comma-separated, so a usable tag is non-empty and has no comma."""
+    tag = tag.strip()
+    return tag if tag and ',' not in tag else None
+
+def _rewrite(sources, target):
+    cleaned = [_clean_tag(t) for t in sources]
+    target = _clean_tag(target)
+    if not cleaned or None in cleaned or target is None:
+        return jsonify({'error': 'Tags must be non-empty and must not contain commas'}), 400
+
+    try:
+        changed = merge_tags(get_jwt_identity(), cleaned, target)
+        db.session.commit()  # entries and snippets change together or not at all
+    except Exception as exc:
+        db.session.rollback()
+        return jsonify({'error': 'Database error', 'details': str(exc)}), 500
+
+    return jsonify({'target': target, **changed}), 200
+
+@tag_bp.route('/api/tags/rename', methods=['POST'])
+@jwt_required()
+def rename_tag():
+    """Rename a tag across all of the user's entries and snippets.
+
+    Expects JSON body {"from": "js", "to": "javascript"}.
+    Returns the number of entries and snippets rewritten.
+    """
+    rename, error = parse_json(RenameTagRequest)
+    if error:
+        return error
+
+    return _rewrite([rename.from_tag], rename.to_tag)
+
+@tag_bp.route('/api/tags/merge', methods=['POST'])
+@jwt_required()
+def merge_tag():
+    """Merge several tags into one across all of the user's entries and snippets.
+
+    Expects JSON body {"sources": ["js", "ecmascript"], "target": "javascript"}.
+    Items carrying several of the tags end up with `target` once.
+    """
+    merge, error = parse_json(MergeTagsRequest)
+    if error:
+        return error
+
+    return _rewrite(merge.sources, merge.target)
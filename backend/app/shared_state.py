@@ -0,0 +1,84 @@
+# Small expiring key/value store shared by the gunicorn workers of one host
+#
+# Worker processes share nothing in memory, so per-user state that any worker may be asked
+# about (e.g. the read-your-writes pins in models/routing.py, the directory cache in
+# models/sharding.py, the rate limit buckets in ratelimit.py) lives in a local SQLite file.
+# Each thread keeps its own connection; WAL lets readers run while another worker writes.
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+_memory_ids = itertools.count()
+
+
+class SharedState:
+    def __init__(self, path):
+        if path == ":memory:":
+            # Process-local, for tests: a named in-memory database every thread can open
+            self._target = f"file:devlog-shared-{os.getpid()}-{next(_memory_ids)}?mode=memory&cache=shared"
+            self._anchor = sqlite3.connect(self._target, uri=True, check_same_thread=False)
+        else:
+            self._target = f"file:{path}"
+        self._local = threading.local()
+
+    def _connect(self):
+        local = self._local
+        # Connections are per thread and per process: never reuse one across a fork
+        if getattr(local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self._target, uri=True, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS shared_state "
+                         "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS shared_buckets "
+                         "(key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID")
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value FROM shared_state WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, value, ttl):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("DELETE FROM shared_state WHERE expires <= ?", (now,))
+        conn.execute("INSERT OR REPLACE INTO shared_state (key, value, expires) VALUES (?, ?, ?)",
+                     (key, str(value), now + ttl))
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM shared_state WHERE key = ?", (key,))
+
+    def take(self, key, interval, period):
+        """Spend one token from the bucket `key`, which refills one token per `interval` seconds
+        and holds period / interval tokens. Returns (taken, seconds until the bucket is full).
+
+        The bucket is stored as the time it will be full again (its "theoretical arrival time",
+        as in GCRA), so taking a token is one UPSERT: atomic across workers without a transaction,
+        and a no-op when the bucket is empty.
+        """
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "INSERT INTO shared_buckets (key, tat) VALUES (:key, :now + :interval) "
+            "ON CONFLICT (key) DO UPDATE SET tat = max(tat, :now) + :interval "
+            "WHERE max(tat, :now) + :interval - :now <= :period "
+            "RETURNING tat",
+            {"key": key, "now": now, "interval": interval, "period": period},
+        ).fetchone()
+        if row is not None:
+            return True, row[0] - now
+        row = conn.execute("SELECT tat FROM shared_buckets WHERE key = ?", (key,)).fetchone()
+        return False, (row[0] - now) if row else 0.0
+
+    def sweep_buckets(self):
+        """Forget buckets that have refilled completely; they behave exactly like missing ones."""
+        self._connect().execute("DELETE FROM shared_buckets WHERE tat <= ?", (time.time(),))
+
+
+def init_shared_state(app):
+    app.extensions["shared_state"] = SharedState(app.config.get("SHARED_STATE_PATH", ":memory:"))
@@ -0,0 +1,240 @@
+# Maintenance tasks, exposed as flask CLI commands
+import time
+import click
+from sqlalchemy import delete, func, select, type_coerce, Text
+from .models.db_models import (ChangeLog, CodeBlob, Entry, EntryBody, Revision, Snippet, User, acquire_blob,
+                               code_digest, collect_blobs, db, normalize_code, release_blobs)
+from .models.changes import compact_change_log
+from .models.revisions import delete_revisions
+from .models.routing import using_shard
+from .models.sharding import delete_user_copy, each_shard, move_user, shard_engine
+from .models.sqlite import fts_supported, rebuild_search_index
+from .models.types import decode_body, encode_body, is_compressed, settings
+
+# (table, primary key column, body column) for every CompressedText body
+COMPRESSED_BODIES = [
+    (EntryBody.__table__, EntryBody.__table__.c.entry_id, EntryBody.__table__.c.content),
+    (CodeBlob.__table__, CodeBlob.__table__.c.hash, CodeBlob.__table__.c.code),
+]
+
+
+def compress_bodies(batch_size=500, pause=0.0):
+    """Rewrite stored bodies that are over the threshold but still uncompressed.
+
+    Walks each body table in primary-key order, one short transaction per batch, so it can
+    run against the live database while the app keeps serving: the batch is read FOR UPDATE,
+    and each UPDATE also requires the row to still hold the text that was compressed, so a
+    body that a request rewrote in the meantime (where FOR UPDATE is a no-op, e.g. SQLite)
+    is left alone. Returns {table name: (rows rewritten, bytes before, bytes after)}.
+    """
+    report = {}
+    for table, pk, column in COMPRESSED_BODIES:
+        rewritten, before, after = 0, 0, 0
+        last_id = None
+        stored_text = type_coerce(column, Text)
+        while True:
+            # Read the stored text as-is (no decoding) to see which rows still need work
+            stmt = select(pk, stored_text).order_by(pk).limit(batch_size).with_for_update()
+            if last_id is not None:
+                stmt = stmt.where(pk > last_id)
+            rows = db.session.execute(stmt).all()
+            if not rows:
+                db.session.commit()
+                break
+            last_id = rows[-1][0]
+
+            for row_id, stored in rows:
+                if is_compressed(stored) or len(stored.encode("utf-8")) < settings["threshold"]:
+                    continue
+                packed = encode_body(decode_body(stored))  # a RAW_MARKER escape is not part of the text
+                if not is_compressed(packed):
+                    continue
+                result = db.session.execute(
+                    table.update()
+                    .where(pk == row_id, stored_text == stored)
+                    .values({column.name: type_coerce(packed, Text)})
+                )
+                if result.rowcount:  # 0: changed since it was read, the new value is left as written
+                    rewritten += 1
+                    before += len(stored.encode("utf-8"))
+                    after += len(packed)
+            db.session.commit()
+            if pause:
+                time.sleep(pause)
+        report[table.name] = (rewritten, before, after)
+    return report
+
+
+def migrate_snippet_bodies(batch_size=500):
+    """Move code from the legacy snippet_bodies table into shared code_blobs (migration 003).
+
+    Bodies may already be compressed, so hashing has to happen here rather than in SQL.
+    Returns the number of snippets migrated.
+    """
+    migrated = 0
+    while True:
+        rows = db.session.execute(
+            db.text(
+                "SELECT b.snippet_id, b.code FROM snippet_bodies b "
+                "JOIN snippets s ON s.id = b.snippet_id "
+                "WHERE s.code_hash IS NULL ORDER BY b.snippet_id LIMIT :n"
+            ),
+            {"n": batch_size},
+        ).all()
+        if not rows:
+            return migrated
+        connection = db.session.connection()
+        for snippet_id, stored in rows:
+            code = normalize_code(decode_body(stored))
+            digest = code_digest(code)
+            acquire_blob(connection, digest, code)
+            connection.execute(
+                Snippet.__table__.update().where(Snippet.__table__.c.id == snippet_id).values(code_hash=digest)
+            )
+        db.session.commit()
+        migrated += len(rows)
+
+
+def recount_blobs():
+    """Recompute every blob refcount from the snippets table and drop unreferenced blobs.
+
+    Repairs drift left by deletes that bypass the ORM (e.g. database-level cascades).
+    Returns the number of blobs removed.
+    """
+    blobs = CodeBlob.__table__
+    snippets = Snippet.__table__
+    db.session.execute(
+        blobs.update().values(
+            refcount=select(func.count()).where(snippets.c.code_hash == blobs.c.hash).scalar_subquery()
+        )
+    )
+    removed = collect_blobs(db.session.connection())
+    db.session.commit()
+    return removed
+
+
+def purge_deleted_users(batch_size=500, pause=0.0):
+    """Remove accounts marked deleted by DELETE /api/account, with all their data.
+
+    Children go in primary-key batches of `batch_size`, one short transaction each, so no
+    single statement locks or holds a user's whole library; an interrupted run just resumes.
+    The user row is deleted last. Returns the number of accounts purged.
+    """
+    purged = 0
+    while True:
+        account = db.session.execute(
+            select(User.id, User.shard).where(User.deleted_at.isnot(None)).order_by(User.id).limit(1)
+        ).first()
+        if account is None:
+            return purged
+        user_id, shard = account
+
+        with using_shard(shard):
+            for ids in _owned_id_batches(Snippet, user_id, batch_size, pause):
+                blob_counts = dict(db.session.execute(
+                    select(Snippet.code_hash, func.count()).where(Snippet.id.in_(ids)).group_by(Snippet.code_hash)
+                ).all())
+                delete_revisions('snippet', ids)
+                db.session.execute(delete(Snippet).where(Snippet.id.in_(ids)))
+                release_blobs(db.session.connection(), blob_counts)
+
+            for ids in _owned_id_batches(Entry, user_id, batch_size, pause):
+                delete_revisions('entry', ids)
+                db.session.execute(delete(EntryBody).where(EntryBody.entry_id.in_(ids)))
+                db.session.execute(delete(Entry).where(Entry.id.in_(ids)))
+
+            db.session.execute(delete(Revision).where(Revision.user_id == user_id))
+            db.session.execute(delete(ChangeLog).where(ChangeLog.user_id == user_id))
+            db.session.commit()
+        delete_user_copy(shard, user_id)
+        db.session.execute(delete(User).where(User.id == user_id, User.deleted_at.isnot(None)))
+        db.session.commit()
+        purged += 1
+
+
+def _owned_id_batches(model, user_id, batch_size, pause):
+    # Yields id batches to delete; the caller's statements are committed before the next batch
+    while True:
+        ids = db.session.execute(
+            select(model.id).where(model.user_id == user_id).order_by(model.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return
+        yield ids
+        db.session.commit()
+        if pause:
+            time.sleep(pause)
+
+
+def register_commands(app):
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create missing tables on every shard (SQLite: plus the FTS search index, refilled from the data)."""
+        for shard in each_shard():
+            engine = shard_engine(shard)
+            db.metadata.create_all(engine)
+            with engine.begin() as connection:
+                if connection.dialect.name == "sqlite" and fts_supported(connection):
+                    rebuild_search_index(connection)
+                    click.echo(f"shard {shard}: search index rebuilt")
+            click.echo(f"shard {shard}: tables created")
+
+    @app.cli.command("move-user")
+    @click.argument("user_id", type=int)
+    @click.argument("shard", type=int)
+    @click.option("--batch-size", default=500, show_default=True)
+    @click.option("--grace", default=2.0, show_default=True, help="Seconds to let in-flight writes finish.")
+    def move_user_command(user_id, shard, batch_size, grace):
+        """Move a user's data to another shard and update the shard directory."""
+        report = move_user(user_id, shard, batch_size, grace)
+        if not report:
+            click.echo(f"user {user_id} already on shard {shard}")
+        for table, rows in report.items():
+            click.echo(f"{table}: {rows} rows copied")
+
+    @app.cli.command("compress-bodies")
+    @click.option("--batch-size", default=500, show_default=True)
+    @click.option("--pause", default=0.05, show_default=True, help="Seconds to sleep between batches.")
+    def compress_bodies_command(batch_size, pause):
+        """Compress existing large entry/snippet bodies in the background."""
+        if not settings["threshold"]:
+            click.echo("BODY_COMPRESSION_THRESHOLD is 0, nothing to do")
+            return
+        for shard in each_shard():
+            for table, (rewritten, before, after) in compress_bodies(batch_size, pause).items():
+                ratio = f"{before / after:.1f}x" if after else "-"
+                click.echo(f"shard {shard} {table}: {rewritten} rows compressed, {before} -> {after} bytes ({ratio})")
+
+    @app.cli.command("migrate-code-blobs")
+    @click.option("--batch-size", default=500, show_default=True)
+    def migrate_code_blobs_command(batch_size):
+        """Move legacy snippet_bodies rows into deduplicated code_blobs."""
+        click.echo(f"{migrate_snippet_bodies(batch_size)} snippets migrated")
+
+    @app.cli.command("gc-blobs")
+    def gc_blobs_command():
+        """Recount code blob references and delete unreferenced blobs."""
+        for shard in each_shard():
+            click.echo(f"shard {shard}: {recount_blobs()} unreferenced blobs removed")
+
+    @app.cli.command("compact-change-log")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def compact_change_log_command(batch_size):
+        """Drop sync change log rows superseded by a later change to the same item."""
+        for shard in each_shard():
+            click.echo(f"shard {shard}: {compact_change_log(batch_size)} change log rows removed")
+
+    @app.cli.command("purge-accounts")
+    @click.option("--batch-size", default=500, show_default=True)
+    @click.option("--pause", default=0.05, show_default=True, help="Seconds to sleep between batches.")
+    @click.option("--watch", default=0, show_default=True, help="Keep running, checking every N seconds.")
+    def purge_accounts_command(batch_size, pause, watch):
+        """Delete the data of accounts removed through DELETE /api/account."""
+        while True:
+            purged = purge_deleted_users(batch_size, pause)
+            if purged or not watch:
+                click.echo(f"{purged} accounts purged")
+            if not watch:
+                return
+            db.session.remove()
+            time.sleep(watch)
@@ -0,0 +1,5 @@
+# asgi.py
+# Async serving mode (see app/asgi.py): uvicorn asgi:app --workers 3
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,175 @@
+# benchmarks/bench_asgi.py
+"""Sync (gunicorn, threads) vs async (uvicorn, asgi.py) serving under concurrency.
+
+Usage:
+    python benchmarks/bench_asgi.py [--workers 3] [--threads 8] [--concurrency 64]
+                                    [--requests 3000] [--streams 200] [--port 5055]
+
+Needs gunicorn, httpx and requirements-asgi.txt. Both servers run as real processes on the
+same seeded SQLite file (SQLITE_PATH), one after the other, with the same worker count.
+Two scenarios per server:
+
+  busy   --concurrency clients send --requests GET /api/entries as fast as they can
+  idle   --streams /api/events connections are held open (mostly-idle clients, like an open
+         browser tab), then the busy scenario runs again next to them
+
+gunicorn's capacity is workers x threads requests in flight; every open stream holds one
+of those slots. uvicorn keeps a stream as a coroutine.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes")
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+import httpx  # noqa: E402
+from app import create_app  # noqa: E402
+from app.models.db_models import db  # noqa: E402
+from config.config import Config  # noqa: E402
+
+
+def seed(path, entries):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SHARED_STATE_PATH = ":memory:"
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.post("/api/register", json={"email": "b@example.com", "username": "bench", "password": "pw"})
+    token = client.post("/api/login", json={"username": "bench", "password": "pw"}).get_json()["access_token"]
+    items = [{"title": f"note {i}", "content": f"body {i}\n" * 20, "tags": "bench"} for i in range(entries)]
+    client.post("/api/entries/batch", json={"items": items}, headers={"Authorization": f"Bearer {token}"})
+    with app.app_context():
+        db.engine.dispose()
+    return token
+
+
+def start(command, env, port):
+    server = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/health/pool", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"server did not start: {' '.join(command)}")
+
+
+async def busy(base, token, concurrency, requests):
+    latencies, errors = [], 0
+    todo = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=10,
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        async def worker():
+            nonlocal errors
+            for _ in todo:
+                start = time.perf_counter()
+                try:
+                    res = await client.get("/api/entries")
+                    res.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+async def with_streams(base, token, streams, concurrency, requests):
+    """Hold `streams` open event streams while the busy scenario runs."""
+    client = httpx.AsyncClient(base_url=base, timeout=httpx.Timeout(10, read=None),
+                               limits=httpx.Limits(max_connections=streams))
+    opened = asyncio.Event()
+    count = 0
+
+    async def hold():
+        nonlocal count
+        try:
+            async with client.stream("GET", "/api/events", params={"jwt": token}) as res:
+                async for _ in res.aiter_lines():
+                    count += 1
+                    if count >= streams:
+                        opened.set()
+                    await asyncio.sleep(3600)
+        except (httpx.HTTPError, asyncio.CancelledError):
+            pass
+
+    holders = [asyncio.create_task(hold()) for _ in range(streams)]
+    try:
+        await asyncio.wait_for(opened.wait(), 10)
+    except asyncio.TimeoutError:
+        pass  # the server could not accept them all; measure anyway
+    result = await busy(base, token, concurrency, requests)
+    result["streams"] = min(count, streams)
+    for task in holders:
+        task.cancel()
+    await asyncio.gather(*holders, return_exceptions=True)
+    await client.aclose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="devlog-bench-")
+    path = os.path.join(workdir, "devlog.db")
+    token = seed(path, args.entries)
+    env = dict(os.environ, SQLITE_PATH=path, SHARED_STATE_PATH=os.path.join(workdir, "shared.db"))
+    bind = f"127.0.0.1:{args.port}"
+    servers = [
+        (f"gunicorn {args.workers}x{args.threads}",
+         ["gunicorn", "--bind", bind, "--workers", str(args.workers), "--threads", str(args.threads), "wsgi:app"]),
+        (f"uvicorn {args.workers}",
+         ["uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(args.workers),
+          "--log-level", "warning"]),
+    ]
+
+    print(f"GET /api/entries ({args.entries} entries), {args.requests} requests from {args.concurrency} clients")
+    print(f"{'server':<16}{'scenario':<14}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    base = f"http://{bind}"
+    for name, command in servers:
+        server = start(command, env, args.port)
+        try:
+            asyncio.run(busy(base, token, args.concurrency, 200))  # warm up
+            results = [("busy", asyncio.run(busy(base, token, args.concurrency, args.requests)))]
+            idle = asyncio.run(with_streams(base, token, args.streams, args.concurrency, args.requests))
+            results.append((f"+{idle['streams']} streams", idle))
+            for scenario, r in results:
+                print(f"{name:<16}{scenario:<14}{r['rps']:>8.0f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['errors']:>8}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
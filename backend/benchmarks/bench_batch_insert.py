@@ -0,0 +1,75 @@
+# benchmarks/bench_batch_insert.py
+"""Inserts per second through POST /api/entries (one item per request) vs POST /api/entries/batch.
+
+Usage:
+    python benchmarks/bench_batch_insert.py [--items 2000] [--batch 500] [--mysql-url mysql+pymysql://...]
+
+Runs the real app in-process (Flask test client) against an on-disk SQLite file so that
+every commit pays for a real fsync, like a commit on MySQL does. With --mysql-url it runs
+against that (scratch!) MySQL database instead; its tables are dropped and recreated. MySQL
+has no RETURNING, which is the case the batch route's multi-row INSERTs are written for.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes")
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from app import create_app  # noqa: E402
+from app.models.db_models import db  # noqa: E402
+from config.config import TestConfig  # noqa: E402
+
+
+def make_client(uri):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    client = app.test_client()
+    client.post("/api/register", json={"email": "b@example.com", "username": "bench", "password": "pw"})
+    token = client.post("/api/login", json={"username": "bench", "password": "pw"}).get_json()["access_token"]
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+
+def items(n):
+    return [{"title": f"Imported note {i}", "content": f"Imported body {i}\n" * 20, "tags": "import"} for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--mysql-url", default=None)
+    args = parser.parse_args()
+    payload = items(args.items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = make_client(args.mysql_url or f"sqlite:///{os.path.join(tmp, 'single.db')}")
+        start = time.perf_counter()
+        for item in payload:
+            assert client.post("/api/entries", json=item).status_code == 201
+        single = time.perf_counter() - start
+
+        client = make_client(args.mysql_url or f"sqlite:///{os.path.join(tmp, 'batch.db')}")
+        start = time.perf_counter()
+        for i in range(0, len(payload), args.batch):
+            res = client.post("/api/entries/batch", json={"items": payload[i:i + args.batch]})
+            assert res.status_code == 201
+        batched = time.perf_counter() - start
+
+    print(f"{args.items} entries")
+    print(f"single-item route: {args.items / single:>10.0f} inserts/s ({single:.2f} s)")
+    print(f"batch route ({args.batch}/req): {args.items / batched:>7.0f} inserts/s ({batched:.2f} s)")
+    print(f"speedup: {single / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
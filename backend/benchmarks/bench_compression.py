@@ -0,0 +1,86 @@
+# benchmarks/bench_compression.py
+"""Compression ratio and CPU cost of CompressedText for typical entry bodies.
+
+Usage:
+    python benchmarks/bench_compression.py [--level 6] [--threshold 4096]
+
+For each sample body it reports the stored size, the ratio, and the CPU time spent
+encoding (paid once per create/update request) and decoding (paid once per body read).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.types import decode_body, encode_body, settings  # noqa: E402
+
+
+def stack_trace_log(size, rnd):
+    frames = [
+        '  File "/app/app/routes/crud_route.py", line {n}, in create_entry\n    db.session.commit()\n',
+        '  File "/usr/local/lib/python3.12/site-packages/sqlalchemy/orm/session.py", line {n}, in commit\n',
+        '  File "/usr/local/lib/python3.12/site-packages/pymysql/connections.py", line {n}, in _read_packet\n',
+    ]
+    out = []
+    while sum(map(len, out)) < size:
+        out.append(f"2025-11-{rnd.randint(1, 30):02d} 12:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d} ERROR request failed\n")
+        out.append("Traceback (most recent call last):\n")
+        out.extend(f.format(n=rnd.randint(10, 2000)) for f in rnd.sample(frames, 3))
+        out.append(f"pymysql.err.OperationalError: (2013, 'Lost connection to MySQL server during query') id={rnd.getrandbits(32):08x}\n")
+    return "".join(out)[:size]
+
+
+def markdown_notes(size, rnd):
+    words = ("deploy flask api entry snippet python docker review fix cache query index "
+             "worker latency memory token session commit migration test").split()
+    out = []
+    while sum(map(len, out)) < size:
+        out.append("## " + " ".join(rnd.choices(words, k=4)) + "\n\n")
+        out.append(" ".join(rnd.choices(words, k=60)) + ".\n\n")
+    return "".join(out)[:size]
+
+
+def random_blob(size, rnd):
+    return "".join(chr(rnd.randint(33, 126)) for _ in range(size))
+
+
+SAMPLES = [
+    ("notes 2 KB", markdown_notes, 2 * 1024),
+    ("notes 32 KB", markdown_notes, 32 * 1024),
+    ("stack traces 64 KB", stack_trace_log, 64 * 1024),
+    ("stack traces 512 KB", stack_trace_log, 512 * 1024),
+    ("random 64 KB", random_blob, 64 * 1024),
+]
+
+
+def timed(fn, arg, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = fn(arg)
+    return result, (time.process_time() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--level", type=int, default=settings["level"])
+    parser.add_argument("--threshold", type=int, default=settings["threshold"])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    settings.update(level=args.level, threshold=args.threshold)
+
+    rnd = random.Random(7)
+    print(f"zlib level {args.level}, threshold {args.threshold} bytes")
+    print(f"{'sample':<22}{'raw':>10}{'stored':>10}{'ratio':>8}{'encode us':>12}{'decode us':>12}")
+    for label, make, size in SAMPLES:
+        body = make(size, rnd)
+        stored, enc_us = timed(encode_body, body, args.repeat)
+        _, dec_us = timed(decode_body, stored, args.repeat)
+        raw = len(body.encode("utf-8"))
+        print(f"{label:<22}{raw:>10}{len(stored):>10}{raw / len(stored):>7.1f}x{enc_us:>12.0f}{dec_us:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_preload.py
+"""Per-worker memory and first-request latency: plain gunicorn vs gunicorn.conf.py (preload + warm-up).
+
+Usage:
+    python benchmarks/bench_preload.py [--workers 3] [--runs 5] [--settle 5] [--port 5056]
+
+Needs gunicorn. Both setups serve the same seeded SQLite file (SQLITE_PATH) with the same
+worker and thread counts. "plain" is the former Dockerfile command line (without the
+config file); "preload" is `gunicorn -c gunicorn.conf.py`.
+
+first request  a single-worker server is started --runs times; after --settle seconds (the
+               worker has booted and imported the app) one authenticated GET /api/entries
+               is timed, then a second one for comparison. Medians are printed.
+memory         a --workers server answers 20 requests per worker, then each worker's RSS,
+               PSS (shared pages split between the processes using them) and USS (pages
+               only that worker has) are read from /proc/<pid>/smaps_rollup. Linux only.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes")
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+import requests  # noqa: E402
+from app import create_app  # noqa: E402
+from app.models.db_models import db  # noqa: E402
+from config.config import Config  # noqa: E402
+
+
+def seed(path, entries=50):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SHARED_STATE_PATH = ":memory:"
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.post("/api/register", json={"email": "b@example.com", "username": "bench", "password": "pw"})
+    token = client.post("/api/login", json={"username": "bench", "password": "pw"}).get_json()["access_token"]
+    items = [{"title": f"note {i}", "content": f"body {i}\n" * 20, "tags": "bench"} for i in range(entries)]
+    client.post("/api/entries/batch", json={"items": items}, headers={"Authorization": f"Bearer {token}"})
+    with app.app_context():
+        db.engine.dispose()
+    return token
+
+
+def command(setup, bind, workers, threads):
+    if setup == "preload":
+        return ["gunicorn", "-c", "gunicorn.conf.py", "--bind", bind, "--workers", str(workers)]
+    # An empty -c: gunicorn reads ./gunicorn.conf.py by default
+    return ["gunicorn", "-c", os.devnull, "--bind", bind, "wsgi:app", "--workers", str(workers),
+            "--threads", str(threads)]
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def memory(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {"rss": fields["Rss"], "pss": fields["Pss"], "uss": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def timed_get(url, token):
+    start = time.perf_counter()
+    res = requests.get(url, headers={"Authorization": f"Bearer {token}", "Connection": "close"}, timeout=30)
+    res.raise_for_status()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--settle", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=5056)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="devlog-bench-")
+    path = os.path.join(workdir, "devlog.db")
+    token = seed(path)
+    env = dict(os.environ, SQLITE_PATH=path, SHARED_STATE_PATH=os.path.join(workdir, "shared.db"))
+    bind = f"127.0.0.1:{args.port}"
+    url = f"http://{bind}/api/entries"
+
+    print(f"{'setup':<10}{'1st req ms':>12}{'2nd req ms':>12}{'RSS MiB':>10}{'PSS MiB':>10}{'USS MiB':>10}"
+          f"{'  (per worker, ' + str(args.workers) + ' workers)'}")
+    for setup in ("plain", "preload"):
+        first, second = [], []
+        for _ in range(args.runs):
+            server = subprocess.Popen(command(setup, bind, 1, args.threads), cwd=BACKEND, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                time.sleep(args.settle)
+                first.append(timed_get(url, token))
+                second.append(timed_get(url, token))
+            finally:
+                server.terminate()
+                server.wait()
+
+        server = subprocess.Popen(command(setup, bind, args.workers, args.threads), cwd=BACKEND, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            time.sleep(args.settle)
+            for _ in range(20 * args.workers):
+                timed_get(url, token)
+            usage = [memory(pid) for pid in children(server.pid)]
+        finally:
+            server.terminate()
+            server.wait()
+        mib = {key: statistics.mean(u[key] for u in usage) / 1024 for key in ("rss", "pss", "uss")}
+        print(f"{setup:<10}{statistics.median(first):>12.1f}{statistics.median(second):>12.1f}"
+              f"{mib['rss']:>10.1f}{mib['pss']:>10.1f}{mib['uss']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
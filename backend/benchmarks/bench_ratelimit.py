@@ -0,0 +1,82 @@
+# benchmarks/bench_ratelimit.py
+"""Cost of one rate limit check against the shared SQLite bucket store, alone and under contention.
+
+Usage:
+    python benchmarks/bench_ratelimit.py [--checks 20000] [--processes 1,4,8] [--keys 1000]
+
+Each of --processes processes (fork, like gunicorn workers) opens the same SHARED_STATE_PATH file
+and runs --checks checks through app.ratelimit.check(), spread over --keys clients of the "login"
+rule. Printed per process count: median microseconds per check across the processes, total
+checks/s, and the same with every process hammering a single key (worst-case write contention).
+The limit is high enough that most checks are allowed, which is the write path.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes")
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from app import create_app  # noqa: E402
+from app.ratelimit import check  # noqa: E402
+from config.config import Config  # noqa: E402
+
+
+def make_app(path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = "sqlite://"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SHARED_STATE_PATH = path
+        RATE_LIMITS = {"login": {"limit": 1_000_000, "period": 60}}
+    return create_app(BenchConfig)
+
+
+def worker(app, checks, keys, offset, start, results):
+    clients = [f"ip:10.0.{(offset + i) // 256 % 256}.{(offset + i) % 256}" for i in range(keys)]
+    check(app, "login", clients[0])  # open this process's connection
+    start.wait()
+    begin = time.perf_counter()
+    for i in range(checks):
+        check(app, "login", clients[i % keys])
+    results.put((time.perf_counter() - begin) / checks * 1e6)
+
+
+def run(app, processes, checks, keys):
+    ctx = multiprocessing.get_context("fork")
+    start, results = ctx.Barrier(processes + 1), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(app, checks, keys, n * keys, start, results))
+             for n in range(processes)]
+    for proc in procs:
+        proc.start()
+    start.wait()
+    begin = time.perf_counter()
+    per_check = [results.get() for _ in procs]
+    elapsed = time.perf_counter() - begin
+    for proc in procs:
+        proc.join()
+    return statistics.median(per_check), processes * checks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--processes", default="1,4,8")
+    parser.add_argument("--keys", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = make_app(os.path.join(tempfile.mkdtemp(prefix="devlog-bench-"), "shared.db"))
+    print(f"{'processes':>10}{'keys':>8}{'us/check':>10}{'checks/s':>12}")
+    for processes in (int(p) for p in args.processes.split(",")):
+        for keys in (args.keys, 1):
+            us, rate = run(app, processes, args.checks, keys)
+            print(f"{processes:>10}{keys if keys > 1 else 'one':>8}{us:>10.1f}{rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/bench_sqlite.py
+"""Throughput of the read-heavy API mix on SQLite (tuned vs default pragmas) and MySQL.
+
+Usage:
+    python benchmarks/bench_sqlite.py [--users 20] [--entries 200] [--threads 8] [--requests 4000]
+                                      [--mysql-url mysql+pymysql://user:pw@host/bench_db]
+
+Each target gets the same seeded data and the same request mix, spread over --threads
+threads through the Flask test client: 60% entry list, 20% single entry, 15% search
+(a three-term query), 5% writes (create or update). "sqlite tuned" is the SQLITE_PATH
+configuration (WAL, synchronous=NORMAL, cache/mmap, busy_timeout); "sqlite default" is a
+file with no pragmas. Both search through FTS5. The MySQL database given with --mysql-url
+is dropped and recreated, so point it at a scratch schema.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes")
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from app import create_app  # noqa: E402
+from app.models.db_models import db  # noqa: E402
+from config.config import Config  # noqa: E402
+
+WORDS = ("deploy cluster python flask query index cache worker retry timeout schema migrate "
+         "lambda docker review release hotfix lecture notes design").split()
+
+
+def make_config(uri, pragmas):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLITE_PRAGMAS = pragmas
+        SHARED_STATE_PATH = ":memory:"
+        RATE_LIMITS = {}  # seeding registers and logs in every user from one address
+    return BenchConfig
+
+
+def text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def seed(app, users, entries):
+    rng = random.Random(1)
+    tokens = []
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    client = app.test_client()
+    for u in range(users):
+        name = f"bench{u}"
+        client.post("/api/register", json={"email": f"{name}@example.com", "username": name, "password": "pw"})
+        token = client.post("/api/login", json={"username": name, "password": "pw"}).get_json()["access_token"]
+        items = [{"title": text(rng, 4), "content": text(rng, 120), "tags": ",".join(rng.sample(WORDS, 2))}
+                 for _ in range(entries)]
+        res = client.post("/api/entries/batch", json={"items": items},
+                          headers={"Authorization": f"Bearer {token}"})
+        ids = [item["id"] for item in res.get_json()["results"]]
+        tokens.append((token, ids))
+    return tokens
+
+
+def run(app, tokens, threads, requests):
+    latencies, errors = [], []
+    per_thread = requests // threads
+
+    def worker(n):
+        rng = random.Random(n)
+        client = app.test_client()
+        for _ in range(per_thread):
+            token, ids = rng.choice(tokens)
+            client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+            roll = rng.random()
+            start = time.perf_counter()
+            if roll < 0.60:
+                res = client.get("/api/entries")
+            elif roll < 0.80:
+                res = client.get(f"/api/entries/{rng.choice(ids)}")
+            elif roll < 0.95:
+                res = client.get("/api/entries/search", query_string={"q": text(rng, 3)})
+            elif roll < 0.975:
+                res = client.post("/api/entries", json={"title": text(rng, 4), "content": text(rng, 120), "tags": "x"})
+            else:
+                res = client.patch("/api/entries", json={"id": rng.choice(ids), "title": text(rng, 4)})
+            latencies.append(time.perf_counter() - start)
+            if res.status_code >= 400:
+                errors.append(res.status_code)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--mysql-url")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="devlog-bench-")
+    targets = [
+        ("sqlite tuned", f"sqlite:///{os.path.join(workdir, 'tuned.db')}", Config.SQLITE_PRAGMAS),
+        ("sqlite default", f"sqlite:///{os.path.join(workdir, 'default.db')}", {}),
+    ]
+    if args.mysql_url:
+        targets.append(("mysql", args.mysql_url, {}))
+
+    print(f"{args.users} users x {args.entries} entries, {args.requests} requests on {args.threads} threads")
+    print(f"{'target':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for name, uri, pragmas in targets:
+        app = create_app(make_config(uri, pragmas))
+        tokens = seed(app, args.users, args.entries)
+        result = run(app, tokens, args.threads, args.requests)
+        print(f"{name:<16}{result['rps']:>10.0f}{result['p50']:>10.2f}{result['p95']:>10.2f}{result['errors']:>8}")
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_startup.py
+"""Cold-start time of the app factory, with the slowest imports from `python -X importtime`.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 7] [--target-ms 900] [--top 15] [--blueprints ...]
+
+Every run is a fresh interpreter doing `from app import create_app; create_app(Config)`, so
+nothing is cached in sys.modules; the file system cache is warm after the first run. Printed:
+the median and best wall time of the factory (imports included), then the modules with the
+largest cumulative import time from one -X importtime run, which is where to look when the
+target is missed. Exits with status 1 if the median is over --target-ms.
+
+--blueprints sets ENABLED_BLUEPRINTS for the child processes (default: the config default).
+GEMINI_API_KEY is set in the children: with a key the autogen routes are enabled and the
+SDK must still not be imported at startup.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+from app import create_app
+from config.config import Config
+create_app(Config)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def child_env(args, workdir):
+    env = dict(os.environ,
+               JWT_SECRET_KEY=os.environ.get("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes"),
+               GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", "unused"),
+               SQLITE_PATH=os.path.join(workdir, "devlog.db"),
+               SHARED_STATE_PATH=os.path.join(workdir, "shared.db"))
+    if args.blueprints is not None:
+        env["ENABLED_BLUEPRINTS"] = args.blueprints
+    return env
+
+
+def cold_start(env):
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-1])
+
+
+def import_times(env):
+    """(cumulative us, module) for every import, from one -X importtime run."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", SCRIPT], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--target-ms", type=float, default=900.0)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--blueprints", default=None, help="comma-separated ENABLED_BLUEPRINTS")
+    args = parser.parse_args()
+
+    env = child_env(args, tempfile.mkdtemp(prefix="devlog-bench-"))
+    cold_start(env)  # fill the file system cache
+    times = [cold_start(env) for _ in range(args.runs)]
+    median = statistics.median(times)
+
+    rows = import_times(env)
+    print(f"{'cumulative ms':>14}  module (top {args.top} by cumulative import time)")
+    for cumulative, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+    loaded = {name.strip() for _, name in rows}
+    print(f"\ngoogle.generativeai imported at startup: {'google.generativeai.types' in loaded}")
+    print(f"create_app cold start: median {median:.0f} ms, best {min(times):.0f} ms over {args.runs} runs "
+          f"(target {args.target_ms:.0f} ms)")
+    if median > args.target_ms:
+        print("over target", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_user_clustering.py
+"""Per-user scans with a global id primary key vs a (user_id, id) clustered primary key.
+
+Usage:
+    python benchmarks/bench_user_clustering.py [--users 200] [--per-user 250] [--row-bytes 600]
+
+SQLite stands in for InnoDB: a WITHOUT ROWID table is clustered on its primary key exactly
+like an InnoDB table, while the rowid table plays the current global AUTO_INCREMENT layout
+(rows in insertion order, reached through a user_id secondary index). Rows are inserted
+interleaved across users, as real traffic does, and the page cache is kept far smaller
+than the table so layout shows up as I/O.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+GLOBAL_ID_SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    tags VARCHAR(500),
+    summary TEXT,
+    updated_at DATETIME
+);
+CREATE INDEX ix_entries_user_id ON entries (user_id);
+"""
+
+CLUSTERED_SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    tags VARCHAR(500),
+    summary TEXT,
+    updated_at DATETIME,
+    PRIMARY KEY (user_id, id)
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX uq_entries_id ON entries (id);
+"""
+
+QUERIES = [
+    ("list a user's entries", "SELECT id, title, tags, summary, updated_at FROM entries WHERE user_id = ?"),
+    ("filter a user's tags", "SELECT id, title FROM entries WHERE user_id = ? AND tags LIKE '%flask%'"),
+    ("count a user's entries", "SELECT COUNT(*) FROM entries WHERE user_id = ?"),
+]
+
+
+def seed(path, schema, users, per_user, row_bytes):
+    rnd = random.Random(1)
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    filler = "x" * row_bytes
+    rows = []
+    entry_id = 0
+    for n in range(per_user):
+        for user_id in rnd.sample(range(1, users + 1), users):
+            entry_id += 1
+            rows.append((entry_id, user_id, f"note {n}", rnd.choice(["flask,api", "sql", "react,js"]), filler))
+    conn.executemany(
+        "INSERT INTO entries (id, user_id, title, tags, summary, updated_at) VALUES (?, ?, ?, ?, ?, datetime('now'))",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(path, users, repeat):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA cache_size = -2000")  # ~2 MB page cache
+    rnd = random.Random(2)
+    results = {}
+    for label, sql in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, (rnd.randint(1, users),)).fetchall()
+        results[label] = (time.perf_counter() - start) / repeat * 1000
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    conn.close()
+    return results, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--per-user", type=int, default=250)
+    parser.add_argument("--row-bytes", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = os.path.join(tmp, "global_id.db")
+        clustered = os.path.join(tmp, "clustered.db")
+        seed(flat, GLOBAL_ID_SCHEMA, args.users, args.per_user, args.row_bytes)
+        seed(clustered, CLUSTERED_SCHEMA, args.users, args.per_user, args.row_bytes)
+        before, before_pages = run(flat, args.users, args.repeat)
+        after, after_pages = run(clustered, args.users, args.repeat)
+
+    print(f"{args.users} users x {args.per_user} entries, ~{args.row_bytes} B rows "
+          f"({before_pages} vs {after_pages} pages)")
+    print(f"{'query':<26}{'id PK (ms)':>14}{'(user_id, id) (ms)':>20}{'speedup':>10}")
+    for label, _ in QUERIES:
+        print(f"{label:<26}{before[label]:>14.3f}{after[label]:>20.3f}{before[label] / after[label]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_validation.py
+"""CPU per request for parsing/validating write bodies and serializing responses.
+
+Usage:
+    python benchmarks/bench_validation.py [--repeat 2000]
+
+"before" is the old route code: json.loads via request.get_json, a throwaway Pydantic model
+built from the dict, fields re-read from the dict, a response dict built by hand and
+json.dumps'ed by Flask. "after" is the current pipeline: one model_validate_json over the
+raw bytes, model_dump into the ORM constructor, and a response model serialized by
+pydantic-core. No database work is included; both sides get the same stand-in ORM object.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes")
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from app.models.models import ENTRY_LIST, CreateEntryRequest, EntryResponse  # noqa: E402
+
+
+def stored(title, content, tags, entry_id=1):
+    now = datetime(2025, 11, 3, 12, 0, 0, 123456)
+    return SimpleNamespace(id=entry_id, title=title, content=content, tags=tags, created_at=now, updated_at=now, version=1)
+
+
+def entry_dict(entry):
+    return {
+        'id': entry.id,
+        'title': entry.title,
+        'content': entry.content,
+        'tags': entry.tags,
+        'created_at': entry.created_at.isoformat() if entry.created_at else None,
+        'updated_at': entry.updated_at.isoformat() if entry.updated_at else None,
+        'version': entry.version,
+    }
+
+
+def create_before(raw):
+    data = json.loads(raw)
+    CreateEntryRequest(**data)
+    title, content, tags = data.get('title'), data.get('content'), data.get('tags')
+    if not title or not content:
+        raise ValueError
+    return json.dumps(entry_dict(stored(title, content, tags)), sort_keys=True).encode()
+
+
+def create_after(raw):
+    create = CreateEntryRequest.model_validate_json(raw)
+    if not create.title or not create.content:
+        raise ValueError
+    return EntryResponse.model_validate(stored(**create.model_dump())).model_dump_json().encode()
+
+
+def list_before(entries):
+    return json.dumps([entry_dict(e) for e in entries], sort_keys=True).encode()
+
+
+def list_after(entries):
+    return ENTRY_LIST.dump_json(ENTRY_LIST.validate_python(entries, from_attributes=True))
+
+
+def timed(fn, arg, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.process_time() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    cases = []
+    for label, size in (("create 200 B", 200), ("create 8 KB", 8 * 1024), ("create 256 KB", 256 * 1024)):
+        raw = json.dumps({"title": "Deploy notes", "content": "x" * size, "tags": "deploy,ops"}).encode()
+        cases.append((label, create_before, create_after, raw, args.repeat))
+    for count in (50, 500):
+        entries = [stored(f"Entry {i}", "note " * 100, "a,b", i) for i in range(count)]
+        cases.append((f"list {count} entries", list_before, list_after, entries, max(args.repeat // count, 20)))
+
+    print(f"{'case':<20}{'before us':>12}{'after us':>12}{'saved':>10}")
+    for label, before, after, arg, repeat in cases:
+        assert json.loads(before(arg)) == json.loads(after(arg))
+        b, a = timed(before, arg, repeat), timed(after, arg, repeat)
+        print(f"{label:<20}{b:>12.1f}{a:>12.1f}{(b - a) / b:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_vertical_partition.py
+"""Latency of the entry list views with and without reading the bodies from entry_bodies.
+
+Usage:
+    python benchmarks/bench_vertical_partition.py [--users 20] [--per-user 400] [--body-kb 16] [--repeat 20]
+
+The app runs on an on-disk SQLite file with a page cache far smaller than the data (the
+same situation as an InnoDB buffer pool that can't hold every body), seeded through
+POST /api/entries/batch with users' rows interleaved. "full" is each list view as clients get
+it by default: selectinload(Entry.body), serialized with EntryResponse. "summary" is the same
+route with ?summary=1, which returns EntrySummary rows and never touches entry_bodies. Both go
+through the test client with the same JWT, so auth, routing and serialization are included.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-at-least-32-bytes")
+os.environ.setdefault("GEMINI_API_KEY", "unused")
+
+from app import create_app  # noqa: E402
+from app.models.db_models import db  # noqa: E402
+from config.config import Config  # noqa: E402
+
+TAGS = ["python", "flask", "sql", "docker", "react", "notes", "logs", "aws"]
+
+# (label, path) -- requested as-is (full) and with ?summary=1
+VIEWS = [
+    ("list entries", "/api/entries"),
+    ("filter by tag", "/api/entries/filter/tag/python"),
+    ("filter by title", "/api/entries/filter/title/note 1"),
+]
+
+
+def make_config(path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SQLITE_PRAGMAS = {**Config.SQLITE_PRAGMAS, "cache_size": -8000, "mmap_size": 0}  # ~8 MB
+        SHARED_STATE_PATH = ":memory:"
+        RATE_LIMITS = {}  # seeding registers and logs in every user from one address
+        MAX_JSON_LENGTH = Config.MAX_CONTENT_LENGTH
+    return BenchConfig
+
+
+def seed(app, users, per_user, body_kb):
+    rnd = random.Random(42)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    tokens = []
+    for u in range(users):
+        name = f"bench{u}"
+        client.post("/api/register", json={"email": f"{name}@example.com", "username": name, "password": "pw"})
+        tokens.append(client.post("/api/login", json={"username": name, "password": "pw"}).get_json()["access_token"])
+    # Round-robin batches so one user's rows are interleaved with everyone else's, like real traffic
+    per_batch = 50
+    for start in range(0, per_user, per_batch):
+        for token in tokens:
+            items = [{"title": f"note {n}", "tags": ",".join(rnd.sample(TAGS, 3)),
+                      "content": "".join(rnd.choices(string.ascii_letters + " \n", k=body_kb * 1024))}
+                     for n in range(start, min(start + per_batch, per_user))]
+            res = client.post("/api/entries/batch", json={"items": items}, headers={"Authorization": f"Bearer {token}"})
+            assert res.status_code == 201, res.get_json()
+    return tokens
+
+
+def timed(client, tokens, path, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        res = client.get(path, headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+        assert res.status_code == 200, res.status_code
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--per-user", type=int, default=400)
+    parser.add_argument("--body-kb", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app(make_config(os.path.join(tmp, "bench.db")))
+        tokens = seed(app, args.users, args.per_user, args.body_kb)
+        client = app.test_client()
+        results = [(label, timed(client, tokens, path, args.repeat), timed(client, tokens, path + "?summary=1", args.repeat))
+                   for label, path in VIEWS]
+        with app.app_context():
+            db.engine.dispose()
+
+    print(f"{args.users} users x {args.per_user} entries, {args.body_kb} KB bodies")
+    print(f"{'view':<20}{'full (ms)':>14}{'summary (ms)':>14}{'speedup':>10}")
+    for label, full, summary in results:
+        print(f"{label:<20}{full:>14.2f}{summary:>14.2f}{full / summary:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from urllib.parse import quote_plus
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -14,15 +15,163 @@ class Config:
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     SECRET_KEY = os.getenv("SECRET_KEY")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # Gemini key for the /api/autogen routes; without one they answer 503
+    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-    SQLALCHEMY_DATABASE_URI = (
+    # Optional route groups to register (comma-separated; see OPTIONAL_BLUEPRINTS in app/__init__.py).
+    # Entry/snippet CRUD and auth are always on; groups left out aren't even imported
+    ENABLED_BLUEPRINTS = [name.strip() for name in os.getenv(
+        "ENABLED_BLUEPRINTS", "export,autogen,revisions,tags,sync,events,bootstrap,health").split(",") if name.strip()]
+
+    # Embedded single-node mode: an absolute path to a SQLite file, used instead of MySQL
+    SQLITE_PATH = os.getenv("SQLITE_PATH")
+
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{SQLITE_PATH}" if SQLITE_PATH else (
         f"mysql+pymysql://{MYSQL_USER}:{quote_plus(MYSQL_PASSWORD or '')}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool, per gunicorn worker. Size it for the worker's request threads (plus
+    # /api/bootstrap's query threads); workers x (size + overflow) must stay under the server's
+    # max_connections. Recycle below the server/RDS idle timeout, pre-ping to drop dead sockets.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 280))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING and not SQLITE_PATH,  # a local file has no stale sockets
+    }
+
+    # Set on every connection to a SQLite database file. WAL lets readers run alongside the one
+    # writer; synchronous=NORMAL is safe with WAL (a power loss may drop the last commits, never
+    # corrupts). cache_size is negative KiB per connection; busy_timeout is how long a writer
+    # queues for the write lock before failing.
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024)),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    }
+
+    # Read replicas (comma-separated URLs, optional). GET requests read from a replica unless the
+    # user wrote within the last REPLICA_PIN_SECONDS, which should exceed the replication lag
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+    # Shards 1..N for per-user data (comma-separated URLs, optional); the primary is shard 0 and
+    # holds the users directory. Entry/snippet ids are allocated per shard in residue classes
+    # modulo SHARD_ID_STRIDE (the shard limit, fixed once data exists) above SHARD_ID_FLOOR
+    DATABASE_SHARD_URLS = [url.strip() for url in os.getenv("DATABASE_SHARD_URLS", "").split(",") if url.strip()]
+    SHARD_ID_STRIDE = int(os.getenv("SHARD_ID_STRIDE", 16))
+    SHARD_ID_FLOOR = int(os.getenv("SHARD_ID_FLOOR", 0))
+
+    # Seconds the JWT check caches a user's directory row (deleted? which shard?) per host. A
+    # deleted account's tokens keep working on other hosts for up to this long; shard moves wait
+    # it out before copying. 0 looks the row up on every request
+    ACCOUNT_CACHE_SECONDS = int(os.getenv("ACCOUNT_CACHE_SECONDS", 5))
+
+    # SQLite file holding state shared by the workers on one host (read-your-writes pins,
+    # the directory cache, rate limits)
+    SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", os.path.join(tempfile.gettempdir(), "devlog-shared.db"))
+
+    # Shared secret for /api/health/* (sent as X-Health-Token); unset, they answer localhost only
+    HEALTH_TOKEN = os.getenv("HEALTH_TOKEN")
+
+    # Number of reverse proxies in front of the app whose X-Forwarded-For is trusted (werkzeug
+    # ProxyFix). 0: request.remote_addr is the peer address, which behind a proxy is the proxy's
+    PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", 0))
+
+    # Admission control (app/admission.py), per worker: requests of each expensive class running
+    # at once, and how many more may wait for a slot, for at most ADMISSION_QUEUE_TIMEOUT seconds.
+    # Waiting requests and open event streams hold a thread too: keep the sum of concurrency +
+    # queue over all classes below GUNICORN_THREADS so cheap requests always find one. The
+    # defaults add up to 2+1 + 1 + 1 + 2 = 7 of the 8 threads. Concurrency 0 disables a gate.
+    # Shed requests get 503 with Retry-After: ADMISSION_RETRY_AFTER seconds
+    ADMISSION_LIMITS = {
+        "search": {"concurrency": int(os.getenv("ADMISSION_SEARCH_CONCURRENCY", 2)),
+                   "queue": int(os.getenv("ADMISSION_SEARCH_QUEUE", 1))},
+        "export": {"concurrency": int(os.getenv("ADMISSION_EXPORT_CONCURRENCY", 1)),
+                   "queue": int(os.getenv("ADMISSION_EXPORT_QUEUE", 0))},
+        "autogen": {"concurrency": int(os.getenv("ADMISSION_AUTOGEN_CONCURRENCY", 1)),
+                    "queue": int(os.getenv("ADMISSION_AUTOGEN_QUEUE", 0))},
+        # Open /api/events streams; each holds a thread until it ends, so they never queue
+        "events": {"concurrency": int(os.getenv("ADMISSION_EVENTS_CONCURRENCY", 2)), "queue": 0},
+    }
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 2.0))
+    ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 2))
+
+    # Rate limits (app/ratelimit.py): `limit` requests per `period` seconds, with bursts of up to
+    # `limit`, shared by all workers on a host through SHARED_STATE_PATH. Login and register are
+    # counted per client IP, logins also per account named (against guessing one password from
+    # many addresses), autogen per user. A limit of 0 turns a rule off
+    RATE_LIMITS = {
+        "login": {"limit": int(os.getenv("RATE_LIMIT_LOGIN", 10)),
+                  "period": int(os.getenv("RATE_LIMIT_LOGIN_PERIOD", 60))},
+        "login_account": {"limit": int(os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", 10)),
+                          "period": int(os.getenv("RATE_LIMIT_LOGIN_ACCOUNT_PERIOD", 600))},
+        "register": {"limit": int(os.getenv("RATE_LIMIT_REGISTER", 5)),
+                     "period": int(os.getenv("RATE_LIMIT_REGISTER_PERIOD", 3600))},
+        "autogen": {"limit": int(os.getenv("RATE_LIMIT_AUTOGEN", 30)),
+                    "period": int(os.getenv("RATE_LIMIT_AUTOGEN_PERIOD", 60))},
+    }
+
+    # ASGI mode (asgi.py): threads per process running the routes that are served by Flask
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", 8))
+
+    # Entry/snippet bodies at least this many bytes are stored zlib-compressed (0 disables)
+    BODY_COMPRESSION_THRESHOLD = int(os.getenv("BODY_COMPRESSION_THRESHOLD", 4096))
+    BODY_COMPRESSION_LEVEL = int(os.getenv("BODY_COMPRESSION_LEVEL", 6))
+
+    # Refuse entry/snippet PATCHes that don't say which version they edit (428) instead of
+    # applying them unconditionally. Turn on once every client sends "version" or If-Match
+    REQUIRE_UPDATE_VERSION = os.getenv("REQUIRE_UPDATE_VERSION", "false").lower() in ("1", "true", "yes")
+
+    # Every Nth revision stores a full copy; the ones in between store deltas
+    REVISION_SNAPSHOT_INTERVAL = int(os.getenv("REVISION_SNAPSHOT_INTERVAL", 10))
+
+    # Batch create endpoints: items accepted per request / rows inserted per executemany
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+    BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", 500))
+    # Bulk update/delete endpoints: ids accepted per request
+    BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", 1000))
+
+    # GET /api/sync: change log rows returned per page
+    SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", 500))
+
+    # GET /api/events: seconds between change_log polls (picks up other workers' writes),
+    # keep-alive comment interval, and how long one stream lasts before the client reconnects
+    EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", 1.0))
+    EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+    EVENTS_MAX_STREAM_SECONDS = int(os.getenv("EVENTS_MAX_STREAM_SECONDS", 300))
+    # Lifetime of the stream-scoped tokens EventSource puts in the URL (POST /api/events/token);
+    # checked when a stream opens, so it only needs to cover the client's connect
+    EVENTS_TOKEN_SECONDS = int(os.getenv("EVENTS_TOKEN_SECONDS", 60))
+
+    # GET /api/bootstrap: items per first page, recent items scanned for the tag summary,
+    # and threads used to run its queries concurrently (1 = one after another)
+    BOOTSTRAP_PAGE_SIZE = int(os.getenv("BOOTSTRAP_PAGE_SIZE", 20))
+    BOOTSTRAP_TAG_SAMPLE = int(os.getenv("BOOTSTRAP_TAG_SAMPLE", 200))
+    BOOTSTRAP_WORKERS = int(os.getenv("BOOTSTRAP_WORKERS", 4))
+
+    # Request size caps: anything over MAX_CONTENT_LENGTH is refused with 413 before it is read,
+    # JSON bodies are held to MAX_JSON_LENGTH (bigger bodies go through the /upload endpoints)
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 16 * 1024 * 1024))
+    MAX_JSON_LENGTH = int(os.getenv("MAX_JSON_LENGTH", 2 * 1024 * 1024))
+
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # in-memory SQLite uses a single static connection
+    SHARED_STATE_PATH = ":memory:"
+    RATE_LIMITS = {}  # tests register and log in far more often than any client may
+    ACCOUNT_CACHE_SECONDS = 0  # tests flip users.moving/deleted_at directly
+    GEMINI_API_KEY = "test-key"  # the SDK itself is mocked; unset, the autogen routes answer 503
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     SECRET_KEY = os.getenv("SECRET_KEY")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
\ No newline at end of file
@@ -0,0 +1,34 @@
+# gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py — the app is loaded and warmed up once in the master, then
+# forked into the workers (see app/prefork.py)
+import gc
+import os
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", 3))
+# Threads (gthread workers) so open /api/events streams don't each take a whole worker
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported and before the first fork
+    from app.prefork import warm_up
+    warm_up(server.app.wsgi())
+    # Objects that exist now are shared with every worker. The collector writes to the header
+    # of each object it scans, which would copy the page into the worker; frozen objects are
+    # never scanned.
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app.prefork import after_fork
+    after_fork(server.app.wsgi())
+
+
+def worker_exit(server, worker):
+    # Close pooled connections instead of leaving the database to notice dead sockets
+    from app.prefork import close_connections
+    close_connections(server.app.wsgi())
@@ -42,3 +42,12 @@ def auth_client(test_app):
     client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
 
     return client
+
+@pytest.fixture
+def other_client(test_app):
+    """A second logged-in user ("other"), for checking that data stays scoped to its owner."""
+    client = test_app.test_client()
+    client.post("/api/register", json={"email": "o@example.com", "username": "other", "password": "pw"})
+    token = client.post("/api/login", json={"username": "other", "password": "pw"}).get_json()["access_token"]
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
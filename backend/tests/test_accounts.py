@@ -0,0 +1,74 @@
+# tests/test_accounts.py
+import pytest
+from app.models.db_models import CodeBlob, Entry, EntryBody, Revision, Snippet, User, db
+from app.tasks import purge_deleted_users
+
+@pytest.fixture
+def library(auth_client):
+    entries = [{"title": f"E{i}", "content": f"body {i}"} for i in range(7)]
+    ids = [r["id"] for r in auth_client.post("/api/entries/batch", json={"items": entries}).get_json()["results"]]
+    auth_client.patch("/api/entries", json={"id": ids[0], "content": "edited"})
+    snippets = [{"title": f"S{i}", "language": "Python", "snippet": f"code({i % 2})", "description": "d"}
+                for i in range(5)]
+    auth_client.post("/api/snippets/batch", json={"items": snippets})
+
+def test_delete_account_disables_immediately(auth_client, client, library):
+    res = auth_client.delete("/api/account", json={"password": "password123"})
+    assert res.status_code == 202
+
+    # existing token and new logins are refused, the data is still there until the purge
+    assert auth_client.get("/api/entries").status_code == 401
+    assert client.post("/api/login", json={"username": "authuser", "password": "password123"}).status_code == 401
+    assert Entry.query.count() == 7
+
+def test_delete_account_requires_password(auth_client, library):
+    assert auth_client.delete("/api/account", json={"password": "wrong"}).status_code == 403
+    assert auth_client.delete("/api/account").status_code == 403
+    assert auth_client.get("/api/entries").status_code == 200
+
+def test_purge_removes_everything_in_batches(auth_client, other_client, library):
+    other_client.post("/api/snippets", json={"title": "o", "language": "Python", "snippet": "code(0)", "description": "d"})
+    auth_client.delete("/api/account", json={"password": "password123"})
+
+    assert purge_deleted_users(batch_size=2) == 1
+
+    assert User.query.filter_by(username="authuser").first() is None
+    assert Entry.query.count() == 0
+    assert EntryBody.query.count() == 0
+    assert Revision.query.count() == 0
+    assert Snippet.query.count() == 1
+    # the blob the other user still references survives with the right count
+    assert [(b.code, b.refcount) for b in CodeBlob.query.all()] == [("code(0)", 1)]
+    assert other_client.get("/api/snippets").status_code == 200
+
+def test_purge_without_pending_accounts(auth_client, library):
+    assert purge_deleted_users() == 0
+    assert Entry.query.count() == 7
+
+def test_username_reusable_after_purge(auth_client, client):
+    auth_client.delete("/api/account", json={"password": "password123"})
+    purge_deleted_users()
+    res = client.post("/api/register", json={"email": "testauth@example.com", "username": "authuser", "password": "x"})
+    assert res.status_code == 201
+
+def test_account_check_is_cached_until_deleted(test_app, auth_client, library):
+    test_app.config["ACCOUNT_CACHE_SECONDS"] = 60
+    queries = []
+    listener = lambda conn, cursor, statement, *args: queries.append(statement)
+    db.event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        for _ in range(3):
+            assert auth_client.get("/api/entries").status_code == 200
+    finally:
+        db.event.remove(db.engine, "before_cursor_execute", listener)
+    assert sum("FROM users" in q for q in queries) == 1
+
+    assert auth_client.delete("/api/account", json={"password": "password123"}).status_code == 202
+    assert auth_client.get("/api/entries").status_code == 401  # the cache entry went with the account
+
+def test_users_are_not_deleted_through_the_orm(auth_client):
+    user = User.query.filter_by(username="authuser").one()
+    db.session.delete(user)
+    with pytest.raises(RuntimeError):
+        db.session.flush()
+    db.session.rollback()
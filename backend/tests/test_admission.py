@@ -0,0 +1,59 @@
+# tests/test_admission.py
+import threading
+import time
+from app.admission import AdmissionGate
+
+def test_gate_queues_then_sheds():
+    gate = AdmissionGate(concurrency=1, queue=1, wait=5)
+    assert gate.acquire()
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(gate.acquire()))
+    waiter.start()
+    while gate.waiting == 0:
+        time.sleep(0.01)
+    assert not gate.acquire()  # slot taken and the queue full: shed without waiting
+
+    gate.release()
+    waiter.join(timeout=5)
+    assert results == [True]
+    status = gate.status()
+    assert (status["active"], status["waiting"]) == (1, 0)
+    assert status["admitted"] == 2 and status["queued"] == 1
+    assert status["rejected_full"] == 1 and status["rejected_timeout"] == 0
+
+def test_gate_wait_times_out():
+    gate = AdmissionGate(concurrency=1, queue=1, wait=0.05)
+    assert gate.acquire()
+    assert not gate.acquire()
+    status = gate.status()
+    assert status["rejected_timeout"] == 1 and status["peak_waiting"] == 1 and status["waiting"] == 0
+
+def test_saturated_search_is_shed_and_cheap_routes_still_served(test_app, auth_client):
+    auth_client.post("/api/entries", json={"title": "needle", "content": "c", "tags": "t"})
+    gate = test_app.extensions["admission"]["search"]
+    held = [gate.acquire() for _ in range(gate.concurrency)]
+    assert all(held)
+    try:
+        start = time.perf_counter()
+        res = auth_client.get("/api/entries/search?q=needle")
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == str(test_app.config["ADMISSION_RETRY_AFTER"])
+        assert res.get_json()["class"] == "search"
+        assert time.perf_counter() - start < test_app.config["ADMISSION_QUEUE_TIMEOUT"] + 1
+
+        assert auth_client.get("/api/entries").status_code == 200
+        assert auth_client.get("/api/export-entry-md/1").status_code == 200  # other classes have their own gates
+    finally:
+        for _ in held:
+            gate.release()
+
+    res = auth_client.get("/api/entries/search?q=needle")
+    assert res.status_code == 200 and len(res.get_json()) == 1
+    search = auth_client.get("/api/health/admission").get_json()["admission"]["search"]
+    assert search["active"] == 0 and search["waiting"] == 0
+    assert search["rejected_full"] + search["rejected_timeout"] == 1
+
+def test_unauthenticated_requests_take_no_slot(test_app, client):
+    assert client.get("/api/entries/search?q=x").status_code == 401
+    assert test_app.extensions["admission"]["search"].status()["admitted"] == 0
@@ -0,0 +1,91 @@
+# tests/test_asgi.py
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+
+pytest.importorskip("starlette")
+pytest.importorskip("a2wsgi")
+pytest.importorskip("aiosqlite")
+pytest.importorskip("httpx")
+
+from starlette.testclient import TestClient  # noqa: E402
+from app.asgi import create_asgi_app  # noqa: E402
+from app.models.db_models import User, db  # noqa: E402
+from config.config import TestConfig  # noqa: E402
+
+@pytest.fixture
+def asgi_client(tmp_path):
+    class AsgiConfig(TestConfig):
+        # The async engines open the database themselves, so it has to be a file
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'devlog.db'}"
+        SHARED_STATE_PATH = str(tmp_path / 'shared.db')
+        EVENTS_POLL_INTERVAL = 0.05
+        EVENTS_MAX_STREAM_SECONDS = 2
+
+    app = create_asgi_app(AsgiConfig)
+    with app.state.flask.app_context():
+        db.create_all()
+    with TestClient(app) as client:
+        client.post("/api/register", json={"email": "a@example.com", "username": "async", "password": "pw"})
+        token = client.post("/api/login", json={"username": "async", "password": "pw"}).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
+
+def test_async_reads_match_flask_routes(asgi_client):
+    # Writes go through the Flask app, reads come back from the async handlers
+    created = asgi_client.post("/api/entries", json={"title": "async", "content": "body", "tags": "t"})
+    assert created.status_code == 201
+    entry_id = created.json()["id"]
+    snippet = asgi_client.post("/api/snippets", json={"title": "s", "description": "d", "snippet": "x = 1",
+                                                      "language": "py"}).json()
+
+    entries = asgi_client.get("/api/entries").json()
+    assert [(e["id"], e["content"]) for e in entries] == [(entry_id, "body")]
+    res = asgi_client.get(f"/api/entries/{entry_id}")
+    assert res.json()["title"] == "async" and res.headers["ETag"] == '"1"'
+    assert asgi_client.get("/api/snippets").json()[0]["snippet"] == "x = 1"
+    assert "snippet" not in asgi_client.get("/api/snippets?summary=1").json()[0]
+    assert "content" not in asgi_client.get("/api/entries?summary=true").json()[0]
+    assert asgi_client.get(f"/api/snippets/{snippet['id']}").json()["language"] == "py"
+    assert asgi_client.get("/api/entries/999").status_code == 404
+
+    # Routes without an async handler are still served
+    assert asgi_client.get("/api/entries/search", params={"q": "async"}).json()[0]["id"] == entry_id
+    assert asgi_client.patch("/api/entries", json={"id": entry_id, "title": "patched"}).status_code == 200
+    assert asgi_client.get(f"/api/entries/{entry_id}").json()["title"] == "patched"
+
+def test_async_auth_errors(asgi_client):
+    assert asgi_client.get("/api/entries", headers={"Authorization": ""}).status_code == 401
+    assert asgi_client.get("/api/entries", headers={"Authorization": "Bearer nonsense"}).status_code == 422
+
+    app = asgi_client.app
+    with app.state.flask.app_context():
+        db.session.execute(db.update(User).values(moving=True))
+        db.session.commit()
+    assert asgi_client.get("/api/entries").status_code == 200
+    refused = asgi_client.post("/api/autogen/title", json={"content": "x"})
+    assert refused.status_code == 503 and refused.headers["Retry-After"] == "2"
+
+def test_async_autogen(asgi_client):
+    with patch("app.routes.autogen_route.genai.GenerativeModel") as MockModel:
+        MockModel.return_value.generate_content_async = AsyncMock(return_value=type("R", (), {"text": " Adder "}))
+        res = asgi_client.post("/api/autogen/title", json={"content": "def add(a, b): return a + b"})
+    assert res.status_code == 200
+    assert res.json() == {"title": "Adder"}
+
+def test_async_event_stream(asgi_client):
+    first = asgi_client.post("/api/entries", json={"title": "one", "content": "c", "tags": "t"}).json()["id"]
+    with asgi_client.stream("GET", "/api/events", params={"since": 0}) as stream:
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        lines = stream.iter_lines()
+        data = [json.loads(line[len("data: "):]) for line in lines if line.startswith("data: ")][:1]
+    assert data == [{"type": "entry", "id": first, "op": "upsert", "version": 1}]
+
+def test_async_stream_takes_only_stream_tokens_in_query_string(asgi_client):
+    login_token = asgi_client.headers.pop("Authorization").split()[1]
+    assert asgi_client.get("/api/events", params={"jwt": login_token}).status_code == 401
+
+    stream_token = asgi_client.post("/api/events/token", headers={"Authorization": f"Bearer {login_token}"}).json()["token"]
+    assert asgi_client.get("/api/entries", headers={"Authorization": f"Bearer {stream_token}"}).status_code == 401
+    with asgi_client.stream("GET", "/api/events", params={"jwt": stream_token}) as stream:
+        assert stream.status_code == 200
@@ -36,3 +36,11 @@ def test_autogen_routes(auth_client, route, key):
         json_data = res.get_json()
         assert key in json_data
         assert json_data[key] == mock_response_text
+
+def test_autogen_without_key(test_app, client, auth_client):
+    test_app.config["GEMINI_API_KEY"] = None
+    # Authentication comes first: anonymous callers learn nothing about the configuration
+    assert client.post("/api/autogen/title", json={"content": "x"}).status_code == 401
+    res = auth_client.post("/api/autogen/title", json={"content": "x"})
+    assert res.status_code == 503
+    assert "GEMINI_API_KEY" in res.get_json()["error"]
@@ -85,6 +85,7 @@ def test_get_snippets_success(auth_client, snippet_data):
     assert res.status_code == 200
     data = res.get_json()
     assert len(data) >= 1
+    assert data[0]["snippet"] == snippet_data["snippet"]
 
 def test_get_entries_success(auth_client, entry_data):
     auth_client.post("/api/entries", json=entry_data)
@@ -92,6 +93,15 @@ def test_get_entries_success(auth_client, entry_data):
     assert res.status_code == 200
     data = res.get_json()
     assert len(data) >= 1
+    assert data[0]["content"] == entry_data["content"]
+
+def test_list_summaries_leave_out_the_bodies(auth_client, entry_data, snippet_data):
+    auth_client.post("/api/entries", json=entry_data)
+    auth_client.post("/api/snippets", json=snippet_data)
+    entries = auth_client.get("/api/entries?summary=1").get_json()
+    snippets = auth_client.get("/api/snippets?summary=1").get_json()
+    assert "content" not in entries[0] and entries[0]["title"] == entry_data["title"]
+    assert "snippet" not in snippets[0] and snippets[0]["title"] == snippet_data["title"]
 
 def test_get_snippet_by_invalid_id(auth_client):
     res = auth_client.get("/api/snippets/99999")
@@ -144,6 +154,40 @@ def test_update_nonexistent_entry(auth_client):
     res = auth_client.patch("/api/entries", json=patch_data)
     assert res.status_code == 404
 
+def test_write_routes_refuse_non_json(auth_client, entry_data, snippet_data):
+    res = auth_client.post("/api/entries", data="title=x", content_type="application/x-www-form-urlencoded")
+    assert res.status_code == 415
+    assert res.get_json()["error"] == "Request must be JSON"
+    assert auth_client.post("/api/snippets", data="x", content_type="text/plain").status_code == 415
+    entry_id = auth_client.post("/api/entries", json=entry_data).get_json()["id"]
+    assert auth_client.patch("/api/entries", data=f'{{"id": {entry_id}}}').status_code == 415  # no content type
+    # JSON content type with a body that isn't valid JSON is a validation error
+    assert auth_client.post("/api/entries", data="{", content_type="application/json").status_code == 400
+    for method, path in (("post", "/api/entries/batch"), ("delete", "/api/snippets/bulk"), ("post", "/api/tags/rename")):
+        assert getattr(auth_client, method)(path, data='{"ids": [1]}').status_code == 415
+
+def test_update_null_leaves_field_except_tags(auth_client, snippet_data):
+    snippet_id = auth_client.post("/api/snippets", json=snippet_data).get_json()["id"]
+    res = auth_client.patch("/api/snippets", json={
+        "id": snippet_id, "title": None, "snippet": None, "language": None, "description": None, "tags": None})
+    assert res.status_code == 200
+    updated = res.get_json()
+    assert (updated["title"], updated["snippet"], updated["language"], updated["description"]) == (
+        snippet_data["title"], snippet_data["snippet"], snippet_data["language"], snippet_data["description"])
+    assert updated["tags"] is None  # null clears tags
+
+def test_snippet_responses_include_description(auth_client, snippet_data):
+    created = auth_client.post("/api/snippets", json=snippet_data).get_json()
+    assert created["description"] == "A test snippet"
+    updated = auth_client.patch("/api/snippets", json={"id": created["id"], "description": "new"}).get_json()
+    assert updated["description"] == "new"
+    for url in ("/api/snippets", "/api/snippets/search?q=hello", "/api/snippets/filter/tag/python",
+                "/api/snippets/filter/language/Python", "/api/snippets/filter/title/Test"):
+        assert [s["description"] for s in auth_client.get(url).get_json()] == ["new"], url
+    fetched = auth_client.get(f"/api/snippets/{created['id']}")
+    assert fetched.get_json()["description"] == "new"
+    assert fetched.headers["ETag"] == '"2"'
+
 # ------------------------
 # DELETE ROUTES
 # ------------------------
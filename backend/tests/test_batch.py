@@ -0,0 +1,95 @@
+# tests/test_batch.py
+from sqlalchemy import event
+from app.models.db_models import CodeBlob, Entry, Snippet, db
+
+def _snippet(i, code="print('same')"):
+    return {"title": f"Snippet {i}", "language": "Python", "snippet": code, "description": "d", "tags": "batch"}
+
+def test_batch_create_entries(auth_client):
+    items = [{"title": f"Entry {i}", "content": f"body {i}", "tags": "batch"} for i in range(25)]
+    res = auth_client.post("/api/entries/batch", json={"items": items})
+    assert res.status_code == 201
+
+    data = res.get_json()
+    assert data["created"] == 25
+    assert data["failed"] == 0
+    ids = [r["id"] for r in data["results"]]
+    assert len(set(ids)) == 25
+
+    entry = auth_client.get(f"/api/entries/{ids[3]}").get_json()
+    assert entry["title"] == "Entry 3"
+    assert entry["content"] == "body 3"
+
+def test_batch_reports_invalid_items(auth_client):
+    items = [
+        {"title": "ok", "content": "fine"},
+        {"title": "missing content"},
+        {"title": "", "content": "empty title"},
+        {"title": "extra", "content": "x", "extra": 1},
+        "not an object",
+        {"title": "ok too", "content": "fine"},
+    ]
+    res = auth_client.post("/api/entries/batch", json={"items": items})
+    data = res.get_json()
+
+    assert res.status_code == 201
+    assert data["created"] == 2
+    assert data["failed"] == 4
+    assert [("id" in r) for r in data["results"]] == [True, False, False, False, False, True]
+    assert data["results"][2]["error"] == '"title" is required.'
+    assert Entry.query.count() == 2
+
+def test_batch_all_invalid(auth_client):
+    res = auth_client.post("/api/entries/batch", json={"items": [{"title": "x"}]})
+    assert res.status_code == 400
+    assert res.get_json()["created"] == 0
+
+def test_batch_requires_items(auth_client):
+    assert auth_client.post("/api/entries/batch", json={}).status_code == 400
+    assert auth_client.post("/api/entries/batch", json={"items": []}).status_code == 400
+    assert auth_client.post("/api/snippets/batch", json=[_snippet(0)]).status_code == 400
+
+def test_batch_size_limit(auth_client, test_app):
+    test_app.config["BATCH_MAX_ITEMS"] = 3
+    items = [{"title": f"E{i}", "content": "c"} for i in range(4)]
+    assert auth_client.post("/api/entries/batch", json={"items": items}).status_code == 400
+
+def test_batch_create_snippets_shares_blobs(auth_client, test_app):
+    test_app.config["BATCH_CHUNK_SIZE"] = 4
+    items = [_snippet(i) for i in range(10)] + [_snippet(10, "print('other')")]
+    res = auth_client.post("/api/snippets/batch", json={"items": items})
+    assert res.status_code == 201
+    assert res.get_json()["created"] == 11
+
+    assert Snippet.query.count() == 11
+    assert sorted(b.refcount for b in CodeBlob.query.all()) == [1, 10]
+
+    snippet_id = res.get_json()["results"][10]["id"]
+    assert auth_client.get(f"/api/snippets/{snippet_id}").get_json()["snippet"] == "print('other')"
+
+def test_batch_items_belong_to_caller(auth_client, other_client):
+    auth_client.post("/api/entries/batch", json={"items": [{"title": "mine", "content": "c"}]})
+    res = other_client.get("/api/entries")
+    assert res.get_json() == []
+
+def test_batch_inserts_one_statement_per_table_per_chunk(auth_client, test_app):
+    test_app.config["BATCH_CHUNK_SIZE"] = 10
+    inserts = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            inserts.append(statement.split()[2])
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        items = [{"title": f"Entry {i}", "content": f"body {i}", "tags": "batch"} for i in range(25)]
+        res = auth_client.post("/api/entries/batch", json={"items": items})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    assert res.status_code == 201
+    assert sorted(inserts) == ["change_log"] * 3 + ["entries"] * 3 + ["entry_bodies"] * 3
+
+    # Created rows are logged for sync like single creates
+    ids = {r["id"] for r in res.get_json()["results"]}
+    assert {item["id"] for item in auth_client.get("/api/sync").get_json()["entries"]} == ids
+    assert Entry.query.get(min(ids)).version == 1
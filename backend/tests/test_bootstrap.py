@@ -0,0 +1,64 @@
+# tests/test_bootstrap.py
+import pytest
+from app import create_app
+from app.routes import bootstrap_route
+from app.models.db_models import db
+from config.config import TestConfig
+
+def _seed(client):
+    for i in range(3):
+        client.post("/api/entries", json={"title": f"E{i}", "content": "body " * 500, "tags": "python, flask" if i else "python"})
+    client.post("/api/snippets", json={"title": "S", "language": "Go", "snippet": "x", "description": "d", "tags": "go"})
+
+def test_bootstrap(auth_client):
+    _seed(auth_client)
+    res = auth_client.get("/api/bootstrap")
+    assert res.status_code == 200
+    data = res.get_json()
+
+    assert data["username"] == "authuser"
+    assert data["counts"] == {"entries": 3, "snippets": 1}
+    assert data["recent_tags"][0] == {"tag": "python", "count": 3}
+    assert {"tag": "go", "count": 1} in data["recent_tags"]
+    # summaries, newest first, without bodies
+    assert [e["title"] for e in data["entries"]] == ["E2", "E1", "E0"]
+    assert "content" not in data["entries"][0]
+    assert data["snippets"][0]["language"] == "Go"
+    # the token continues where the bootstrap left off
+    assert auth_client.get(f"/api/sync?since={data['sync']}").get_json()["entries"] == []
+
+def test_bootstrap_page_size(test_app, auth_client):
+    test_app.config["BOOTSTRAP_PAGE_SIZE"] = 2
+    _seed(auth_client)
+    data = auth_client.get("/api/bootstrap").get_json()
+    assert len(data["entries"]) == 2
+    assert data["counts"]["entries"] == 3
+
+def test_bootstrap_empty_account(auth_client):
+    data = auth_client.get("/api/bootstrap").get_json()
+    assert data["counts"] == {"entries": 0, "snippets": 0}
+    assert data["entries"] == data["snippets"] == data["recent_tags"] == []
+    assert data["sync"] == "0"
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_concurrent_queries_match(tmp_path, workers):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'devlog.db'}"
+        BOOTSTRAP_WORKERS = workers
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.post("/api/register", json={"email": "a@example.com", "username": "a", "password": "pw"})
+        token = client.post("/api/login", json={"username": "a", "password": "pw"}).get_json()["access_token"]
+        client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        _seed(client)
+
+        data = client.get("/api/bootstrap").get_json()
+        assert data["counts"] == {"entries": 3, "snippets": 1}
+        assert len(data["entries"]) == 3
+        if workers > 1:
+            assert bootstrap_route._executor is not None
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,72 @@
+# tests/test_bulk.py
+import pytest
+from app.models.db_models import CodeBlob, Entry, EntryBody, Snippet
+
+@pytest.fixture
+def entry_ids(auth_client):
+    items = [{"title": f"Entry {i}", "content": f"body {i}", "tags": "stale" if i % 2 else "keep"} for i in range(6)]
+    res = auth_client.post("/api/entries/batch", json={"items": items})
+    return [r["id"] for r in res.get_json()["results"]]
+
+@pytest.fixture
+def snippet_ids(auth_client):
+    items = [{"title": f"S{i}", "language": "Python" if i < 3 else "Go", "snippet": "shared()",
+              "description": "d", "tags": "old"} for i in range(5)]
+    res = auth_client.post("/api/snippets/batch", json={"items": items})
+    return [r["id"] for r in res.get_json()["results"]]
+
+def test_bulk_update_by_ids(auth_client, entry_ids):
+    res = auth_client.patch("/api/entries/bulk", json={"ids": entry_ids[:3], "set": {"tags": "archived"}})
+    assert res.status_code == 200
+    assert res.get_json() == {"updated": 3}
+
+    entries = {e["id"]: e for e in auth_client.get("/api/entries").get_json()}
+    assert [entries[i]["tags"] for i in entry_ids[:4]] == ["archived"] * 3 + ["stale"]
+    assert entries[entry_ids[0]]["version"] == 2
+    assert entries[entry_ids[0]]["content"] == "body 0"
+
+def test_bulk_update_by_filter(auth_client, snippet_ids):
+    res = auth_client.patch("/api/snippets/bulk", json={"filter": {"language": "Go"}, "set": {"description": "golang"}})
+    assert res.get_json() == {"updated": 2}
+    assert Snippet.query.filter_by(description="golang").count() == 2
+
+def test_bulk_update_conflicts_with_stale_patch(auth_client, entry_ids):
+    auth_client.patch("/api/entries/bulk", json={"ids": [entry_ids[0]], "set": {"title": "bulk"}})
+    res = auth_client.patch("/api/entries", json={"id": entry_ids[0], "title": "late", "version": 1})
+    assert res.status_code == 409
+
+def test_bulk_delete_by_filter(auth_client, entry_ids):
+    res = auth_client.delete("/api/entries/bulk", json={"filter": {"tag": "stale"}})
+    assert res.get_json() == {"deleted": 3}
+    assert Entry.query.count() == 3
+    assert EntryBody.query.count() == 3
+
+def test_bulk_delete_snippets_releases_blobs(auth_client, snippet_ids):
+    auth_client.delete("/api/snippets/bulk", json={"ids": snippet_ids[:4]})
+    assert [b.refcount for b in CodeBlob.query.all()] == [1]
+
+    auth_client.delete("/api/snippets/bulk", json={"ids": snippet_ids[4:]})
+    assert CodeBlob.query.count() == 0
+
+def test_bulk_is_scoped_to_caller(auth_client, other_client, entry_ids):
+    res = other_client.delete("/api/entries/bulk", json={"ids": entry_ids})
+    assert res.get_json() == {"deleted": 0}
+    res = other_client.patch("/api/entries/bulk", json={"filter": {"tag": "keep"}, "set": {"title": "x"}})
+    assert res.get_json() == {"updated": 0}
+    assert Entry.query.count() == 6
+
+@pytest.mark.parametrize("body", [
+    {"set": {"title": "x"}},
+    {"ids": [1], "filter": {"tag": "a"}, "set": {"title": "x"}},
+    {"filter": {}, "set": {"title": "x"}},
+    {"ids": [], "set": {"title": "x"}},
+    {"ids": [1]},
+    {"ids": [1], "set": {"content": "not bulk-editable"}},
+    {"filter": {"language": "Python"}, "set": {"title": "x"}},
+])
+def test_bulk_update_rejects_bad_selection(auth_client, body):
+    assert auth_client.patch("/api/entries/bulk", json=body).status_code == 400
+
+def test_bulk_ids_limit(auth_client, test_app):
+    test_app.config["BULK_MAX_IDS"] = 2
+    assert auth_client.delete("/api/entries/bulk", json={"ids": [1, 2, 3]}).status_code == 400
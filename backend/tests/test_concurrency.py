@@ -0,0 +1,71 @@
+# tests/test_concurrency.py
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+from app.models.db_models import Entry, db
+
+@pytest.fixture
+def entry(auth_client):
+    res = auth_client.post("/api/entries", json={"title": "Shared", "content": "v1", "tags": "t"})
+    return res.get_json()
+
+def test_new_rows_start_at_version_1(entry):
+    assert entry["version"] == 1
+
+def test_update_bumps_version(auth_client, entry):
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "content": "v2", "version": 1})
+    assert res.status_code == 200
+    assert res.get_json()["version"] == 2
+
+def test_stale_version_conflicts(auth_client, entry):
+    auth_client.patch("/api/entries", json={"id": entry["id"], "title": "web edit", "version": 1})
+
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "title": "cli edit", "version": 1})
+    assert res.status_code == 409
+    assert res.get_json()["version"] == 2
+    assert auth_client.get(f"/api/entries/{entry['id']}").get_json()["title"] == "web edit"
+
+def test_if_match_header(auth_client, entry):
+    etag = auth_client.get(f"/api/entries/{entry['id']}").headers["ETag"]
+    assert etag == '"1"'
+
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "title": "ok"}, headers={"If-Match": etag})
+    assert res.status_code == 200
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "title": "late"}, headers={"If-Match": etag})
+    assert res.status_code == 409
+
+def test_invalid_if_match(auth_client, entry):
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "title": "x"}, headers={"If-Match": "abc"})
+    assert res.status_code == 400
+
+def test_unconditional_update_still_allowed(auth_client, entry):
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "title": "no version"})
+    assert res.status_code == 200
+
+def test_version_can_be_made_mandatory(test_app, auth_client, entry):
+    test_app.config["REQUIRE_UPDATE_VERSION"] = True
+    assert auth_client.patch("/api/entries", json={"id": entry["id"], "title": "no version"}).status_code == 428
+    assert auth_client.patch("/api/entries", json={"id": entry["id"], "title": "ok", "version": 1}).status_code == 200
+
+def test_snippet_stale_version_conflicts(auth_client):
+    res = auth_client.post("/api/snippets", json={
+        "title": "S", "language": "Python", "snippet": "x = 1", "description": "d"
+    })
+    snippet_id = res.get_json()["id"]
+    auth_client.patch("/api/snippets", json={"id": snippet_id, "snippet": "x = 2", "version": 1})
+
+    res = auth_client.patch("/api/snippets", json={"id": snippet_id, "snippet": "x = 3", "version": 1})
+    assert res.status_code == 409
+
+def test_lost_update_detected_at_write_time(auth_client, entry):
+    # Read the row, let another writer commit, then try to write: the versioned UPDATE matches nothing
+    row = db.session.get(Entry, entry["id"])
+    db.session.execute(db.text("UPDATE entries SET version = version + 1, title = 'other' WHERE id = :id"),
+                       {"id": entry["id"]})
+    row.title = "mine"
+    with pytest.raises(StaleDataError):
+        db.session.commit()
+    db.session.rollback()
+
+def test_content_only_edit_bumps_version(auth_client, entry):
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "content": "body only"})
+    assert res.get_json()["version"] == 2
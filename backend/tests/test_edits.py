@@ -0,0 +1,69 @@
+# tests/test_edits.py
+import pytest
+from app.models.edits import apply_edits
+from app.models.models import TextEdit
+
+BODY = "".join(f"line {i}\n" for i in range(1000))
+
+@pytest.fixture
+def entry(auth_client):
+    res = auth_client.post("/api/entries", json={"title": "Big", "content": BODY, "tags": "t"})
+    return res.get_json()
+
+def _edits(*ranges):
+    return [TextEdit(start=s, end=e, text=t) for s, e, t in ranges]
+
+def test_apply_edits_uses_base_offsets():
+    assert apply_edits("abcdef", _edits((0, 1, "X"), (3, 5, ""), (6, 6, "!"))) == "Xbcf!"
+
+@pytest.mark.parametrize("ranges", [[(2, 1, "")], [(0, 3, ""), (2, 4, "")], [(0, 7, "")]])
+def test_apply_edits_rejects_bad_ranges(ranges):
+    with pytest.raises(ValueError):
+        apply_edits("abcdef", _edits(*ranges))
+
+def test_patch_entry_with_edits(auth_client, entry):
+    start = BODY.index("line 500\n")
+    edits = [{"start": start, "end": start + len("line 500"), "text": "changed"}]
+
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "edits": edits, "version": 1})
+    assert res.status_code == 200
+    assert res.get_json()["version"] == 2
+
+    content = auth_client.get(f"/api/entries/{entry['id']}").get_json()["content"]
+    assert content == BODY.replace("line 500\n", "changed\n")
+
+def test_edits_are_recorded_as_revisions(auth_client, entry):
+    edits = [{"start": 0, "end": 0, "text": "# header\n"}]
+    auth_client.patch("/api/entries", json={"id": entry["id"], "edits": edits, "version": 1})
+    res = auth_client.get(f"/api/entries/{entry['id']}/revisions/1")
+    assert res.get_json()["content"] == BODY
+
+def test_edits_require_base_version(auth_client, entry):
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "edits": []})
+    assert res.status_code == 428
+
+def test_edits_against_stale_base_conflict(auth_client, entry):
+    auth_client.patch("/api/entries", json={"id": entry["id"], "title": "renamed"})
+    edits = [{"start": 0, "end": 4, "text": "LINE"}]
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "edits": edits, "version": 1})
+    assert res.status_code == 409
+
+def test_edits_and_full_body_are_exclusive(auth_client, entry):
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "content": "x", "edits": [], "version": 1})
+    assert res.status_code == 400
+
+def test_out_of_range_edit(auth_client, entry):
+    edits = [{"start": 0, "end": len(BODY) + 1, "text": ""}]
+    res = auth_client.patch("/api/entries", json={"id": entry["id"], "edits": edits, "version": 1})
+    assert res.status_code == 400
+
+def test_patch_snippet_with_edits(auth_client):
+    snippet = auth_client.post("/api/snippets", json={
+        "title": "s", "language": "Python", "snippet": "def f():\r\n    return 1\r\n", "description": "d"
+    }).get_json()
+    # offsets refer to the stored (LF-normalized) code
+    edits = [{"start": 20, "end": 21, "text": "2"}]
+    res = auth_client.patch("/api/snippets", json={"id": snippet["id"], "edits": edits},
+                            headers={"If-Match": '"1"'})
+    assert res.status_code == 200
+    assert res.get_json()["snippet"] == "def f():\n    return 2\n"
@@ -0,0 +1,130 @@
+# tests/test_events.py
+import json
+import pytest
+from app.events import ChangeFeed
+
+def _new_entry(client, title="E"):
+    return client.post("/api/entries", json={"title": title, "content": "body"}).get_json()
+
+def _parse(stream):
+    events = []
+    for block in stream.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields.get("event") == "change":
+            events.append((int(fields["id"]), json.loads(fields["data"])))
+    return events
+
+@pytest.fixture
+def short_streams(test_app):
+    test_app.config.update(EVENTS_MAX_STREAM_SECONDS=0.2, EVENTS_HEARTBEAT_SECONDS=0.1)
+    test_app.extensions["change_feed"].poll_interval = 0  # only wake on commits
+
+@pytest.fixture
+def user_id(auth_client):
+    from app.models.db_models import User
+    return User.query.filter_by(username="authuser").one().id
+
+def test_stream_resumes_after_last_event_id(auth_client, short_streams):
+    first = _new_entry(auth_client)
+    second = _new_entry(auth_client)
+    auth_client.patch("/api/entries", json={"id": first["id"], "title": "renamed"})
+    auth_client.delete(f"/api/entries/{first['id']}")
+
+    res = auth_client.get("/api/events", headers={"Last-Event-ID": "0"})
+    assert res.status_code == 200
+    assert res.mimetype == "text/event-stream"
+    events = [data for _, data in _parse(res.get_data(as_text=True))]
+    # upserts of the deleted entry are dropped, its delete stays
+    assert events == [
+        {"type": "entry", "id": second["id"], "op": "upsert", "version": 1},
+        {"type": "entry", "id": first["id"], "op": "delete", "version": None},
+    ]
+
+def test_stream_without_position_starts_at_head(auth_client, short_streams):
+    _new_entry(auth_client)
+    res = auth_client.get("/api/events")
+    assert _parse(res.get_data(as_text=True)) == []
+    assert ": keep-alive" in res.get_data(as_text=True)
+
+def test_position_on_first_keep_alive(auth_client, short_streams):
+    _new_entry(auth_client)
+    body = auth_client.get("/api/events").get_data(as_text=True)
+    blocks = [block for block in body.split("\n\n") if "keep-alive" in block]
+    assert blocks[0] == "id: 1\n: keep-alive"  # the head of the log, for Last-Event-ID
+    assert all(not block.startswith("id:") for block in blocks[1:])
+
+def test_only_stream_tokens_in_query_string(client, auth_client, short_streams):
+    login_token = auth_client.environ_base["HTTP_AUTHORIZATION"].split()[1]
+    assert client.get(f"/api/events?jwt={login_token}").status_code == 401
+    assert client.get("/api/events").status_code == 401
+
+    res = auth_client.post("/api/events/token")
+    assert res.status_code == 200 and res.get_json()["expires_in"] == 60
+    stream_token = res.get_json()["token"]
+    assert client.get(f"/api/events?jwt={stream_token}").status_code == 200
+    # it opens the stream and nothing else
+    stream_auth = {"Authorization": f"Bearer {stream_token}"}
+    assert client.get("/api/entries", headers=stream_auth).status_code == 401
+    assert client.post("/api/events/token", headers=stream_auth).status_code == 401
+
+def test_streams_per_worker_are_capped(test_app, auth_client, short_streams):
+    gate = test_app.extensions["admission"]["events"]
+    held = [gate.acquire() for _ in range(gate.concurrency - 1)]
+    try:
+        opened = auth_client.get("/api/events", buffered=False)
+        assert opened.status_code == 200
+        refused = auth_client.get("/api/events")
+        assert refused.status_code == 503 and refused.get_json()["class"] == "events"
+        assert refused.headers["Retry-After"] == str(test_app.config["ADMISSION_RETRY_AFTER"])
+        opened.close()
+        assert gate.active == len(held)  # a finished stream gives its slot back
+    finally:
+        for _ in held:
+            gate.release()
+
+def test_feed_fans_out_per_user(test_app, auth_client, user_id):
+    feed = ChangeFeed(test_app, threaded=False)
+    mine, also_mine, other = feed.subscribe(user_id), feed.subscribe(user_id), feed.subscribe(user_id + 1)
+
+    entry = _new_entry(auth_client)
+    auth_client.patch("/api/entries/bulk", json={"ids": [entry["id"]], "set": {"title": "bulk"}})
+    assert feed.poll() == 4
+
+    for q in (mine, also_mine):
+        # both rows (create, bulk update) report the version current at poll time
+        assert [(e["op"], e["version"]) for e in (q.get_nowait(), q.get_nowait())] == [("upsert", 2)] * 2
+    assert other.empty()
+
+    feed.unsubscribe(user_id, mine)
+    auth_client.delete(f"/api/entries/{entry['id']}")
+    assert feed.poll() == 1
+    assert also_mine.get_nowait() == {"seq": 3, "type": "entry", "id": entry["id"], "op": "delete", "version": None}
+    assert mine.empty()
+
+def test_commits_wake_the_feed(test_app, auth_client, user_id):
+    feed = test_app.extensions["change_feed"]
+    feed.threaded = False
+    feed._wakeup.clear()
+    _new_entry(auth_client)
+    assert feed._wakeup.is_set()
+
+def test_feed_delivers_rows_committed_below_another_users_seq(test_app, auth_client, other_client, user_id):
+    from app.models.db_models import ChangeLog, User, db
+    other_id = User.query.filter_by(username="other").one().id
+    feed = ChangeFeed(test_app, threaded=False)
+    mine, theirs = feed.subscribe(user_id), feed.subscribe(other_id)
+    # seqs follow commit order per user only: seq 5 (other user) is polled before seq 3 (this user) is visible
+    db.session.add(ChangeLog(seq=5, user_id=other_id, item_type="entry", item_id=2, op="delete"))
+    db.session.commit()
+    assert feed.poll() == 1
+    db.session.add(ChangeLog(seq=3, user_id=user_id, item_type="entry", item_id=1, op="delete"))
+    db.session.commit()
+    assert feed.poll() == 1
+    assert mine.get_nowait()["seq"] == 3
+    assert theirs.get_nowait()["seq"] == 5 and theirs.empty()
+
+def test_reconnect_backlog_reads_past_one_page(test_app, auth_client, short_streams):
+    test_app.config["SYNC_PAGE_SIZE"] = 2
+    created = [_new_entry(auth_client, f"E{n}") for n in range(5)]
+    events = _parse(auth_client.get("/api/events", headers={"Last-Event-ID": "0"}).get_data(as_text=True))
+    assert [data["id"] for _, data in events] == [entry["id"] for entry in created]
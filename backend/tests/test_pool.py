@@ -0,0 +1,105 @@
+# tests/test_pool.py
+import threading
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from app import create_app
+from app.models.db_models import db
+from app.pool import InstrumentedQueuePool
+from config.config import Config, TestConfig
+
+def _file_app(tmp_path, **options):
+    class PoolConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'devlog.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {**Config.SQLALCHEMY_ENGINE_OPTIONS, **options}
+
+    return create_app(PoolConfig)
+
+def test_engine_options_from_config(tmp_path):
+    app = create_app(TestConfig)
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"] == {}
+
+    app = _file_app(tmp_path, pool_size=3, max_overflow=2, pool_recycle=60)
+    with app.app_context():
+        pool = db.engine.pool
+        assert isinstance(pool, InstrumentedQueuePool)
+        assert pool.size() == 3
+        assert pool._max_overflow == 2
+        assert pool._recycle == 60
+        assert pool._pre_ping is Config.DB_POOL_PRE_PING
+        db.engine.dispose()
+
+def test_pool_health_in_memory(client):
+    res = client.get("/api/health/pool")
+    assert res.status_code == 200
+    data = res.get_json()
+    assert isinstance(data["pid"], int)
+    assert data["pool"]["class"] == "StaticPool"
+
+def test_pool_timeout_is_counted(tmp_path):
+    app = _file_app(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.2)
+    with app.app_context():
+        with db.engine.connect():
+            with pytest.raises(PoolTimeout):
+                db.engine.connect()
+            pool = app.test_client().get("/api/health/pool").get_json()["pool"]
+        assert pool["timeouts"] == 1
+        assert pool["checked_out"] == 1  # the held connection; the health check itself uses none
+        db.engine.dispose()
+
+def test_no_pool_exhaustion_at_target_concurrency(tmp_path):
+    # gunicorn runs 8 threads per worker; /api/bootstrap adds its own query threads on top
+    threads, rounds = 8, 15
+    app = _file_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.post("/api/register", json={"email": "a@example.com", "username": "a", "password": "pw"})
+        token = client.post("/api/login", json={"username": "a", "password": "pw"}).get_json()["access_token"]
+        client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        client.post("/api/entries", json={"title": "t", "content": "c", "tags": "x"})
+        db.session.remove()
+
+    statuses = []
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        c = app.test_client()
+        c.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        barrier.wait()
+        for i in range(rounds):
+            path = "/api/bootstrap" if i % 2 else "/api/entries"
+            statuses.append(c.get(path).status_code)
+
+    pool_threads = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool_threads:
+        t.start()
+    for t in pool_threads:
+        t.join()
+
+    assert statuses == [200] * (threads * rounds)
+    with app.app_context():
+        stats = app.test_client().get("/api/health/pool").get_json()["pool"]
+        assert stats["timeouts"] == 0
+        assert stats["checkouts"] >= threads * rounds
+        assert stats["peak_checked_out"] <= Config.DB_POOL_SIZE + Config.DB_MAX_OVERFLOW
+        assert stats["checked_out"] == 0
+        db.engine.dispose()
+
+def test_health_is_internal_only(test_app, client):
+    remote = {"REMOTE_ADDR": "203.0.113.7"}
+    assert client.get("/api/health/pool").status_code == 200  # from the host itself
+    assert client.get("/api/health/pool", environ_base=remote).status_code == 403
+    assert client.get("/api/health/admission", environ_base=remote).status_code == 403
+
+    test_app.config["HEALTH_TOKEN"] = "s3cret"
+    assert client.get("/api/health/pool").status_code == 401
+    assert client.get("/api/health/admission", headers={"X-Health-Token": "wrong"}).status_code == 401
+    res = client.get("/api/health/pool", environ_base=remote, headers={"X-Health-Token": "s3cret"})
+    assert res.status_code == 200
+
+def test_pool_health_reports_configured_overflow(tmp_path):
+    app = _file_app(tmp_path, pool_size=3, max_overflow=2)
+    with app.app_context():
+        pool = app.test_client().get("/api/health/pool").get_json()["pool"]
+        assert (pool["size"], pool["max_overflow"], pool["overflow"]) == (3, 2, 0)
+        db.engine.dispose()
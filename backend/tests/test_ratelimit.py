@@ -0,0 +1,138 @@
+# tests/test_ratelimit.py
+import multiprocessing
+import time
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.models.db_models import db
+from app.shared_state import SharedState
+from config.config import TestConfig
+
+def _limited_app(tmp_path, settings=None, **rules):
+    class LimitedConfig(TestConfig):
+        SHARED_STATE_PATH = str(tmp_path / "shared.db")
+        RATE_LIMITS = {name: {"limit": limit, "period": period} for name, (limit, period) in rules.items()}
+
+    for name, value in (settings or {}).items():
+        setattr(LimitedConfig, name, value)
+
+    app = create_app(LimitedConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+def test_login_is_limited_per_ip(tmp_path):
+    app = _limited_app(tmp_path, login=(3, 60))
+    client = app.test_client()
+    creds = {"username": "nobody", "password": "wrong"}
+
+    for remaining in (2, 1, 0):
+        res = client.post("/api/login", json=creds)
+        assert res.status_code == 401  # failed logins count too
+        assert res.headers["RateLimit-Limit"] == "3"
+        assert res.headers["RateLimit-Policy"] == "3;w=60"
+        assert res.headers["RateLimit-Remaining"] == str(remaining)
+
+    res = client.post("/api/login", json=creds)
+    assert res.status_code == 429
+    assert 1 <= int(res.headers["Retry-After"]) <= 20  # one token back every 60 / 3 seconds
+    assert res.headers["RateLimit-Remaining"] == "0"
+
+    other = client.post("/api/login", json=creds, environ_base={"REMOTE_ADDR": "10.0.0.2"})
+    assert other.status_code == 401 and other.headers["RateLimit-Remaining"] == "2"
+    # Unlimited routes carry no headers
+    assert "RateLimit-Limit" not in client.get("/api/health/pool").headers
+
+def test_login_is_limited_per_account(tmp_path):
+    app = _limited_app(tmp_path, login=(100, 60), login_account=(2, 60))
+    client = app.test_client()
+    client.post("/api/register", json={"email": "v@example.com", "username": "victim", "password": "pw"})
+
+    for n, name in enumerate(["victim", " Victim"]):  # one bucket, whatever the spelling
+        res = client.post("/api/login", json={"username": name, "password": "guess"},
+                          environ_base={"REMOTE_ADDR": f"10.0.0.{n}"})
+        assert res.status_code == 401
+    refused = client.post("/api/login", json={"username": "victim", "password": "pw"},
+                          environ_base={"REMOTE_ADDR": "10.0.0.9"})
+    assert refused.status_code == 429
+    assert refused.headers["RateLimit-Limit"] == "2"  # the account rule's headers, not the IP rule's
+    assert client.post("/api/login", json={"email": "v@example.com", "password": "pw"}).status_code == 200
+    assert client.post("/api/login", json={"username": "other", "password": "x"}).status_code == 401
+
+def test_client_ip_from_trusted_proxy(tmp_path):
+    app = _limited_app(tmp_path, {"PROXY_FIX_X_FOR": 1}, login=(1, 60))
+    client = app.test_client()
+    creds = {"username": "nobody", "password": "wrong"}
+
+    def login(forwarded_for):
+        return client.post("/api/login", json=creds, headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    assert [login("203.0.113.1"), login("203.0.113.2"), login("203.0.113.1")] == [401, 401, 429]
+    # Only the hop our proxy appended counts; what the client put in front of it is ignored
+    assert login("198.51.100.7, 203.0.113.2") == 429
+
+def test_untrusted_forwarded_for_is_ignored(tmp_path):
+    client = _limited_app(tmp_path, login=(1, 60)).test_client()
+    creds = {"username": "nobody", "password": "wrong"}
+    assert client.post("/api/login", json=creds, headers={"X-Forwarded-For": "203.0.113.1"}).status_code == 401
+    assert client.post("/api/login", json=creds, headers={"X-Forwarded-For": "203.0.113.2"}).status_code == 429
+
+def test_autogen_is_limited_per_user(tmp_path):
+    app = _limited_app(tmp_path, autogen=(2, 60))
+    client = app.test_client()
+    client.post("/api/register", json={"email": "r@example.com", "username": "rl", "password": "pw"})
+    token = client.post("/api/login", json={"username": "rl", "password": "pw"}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with patch("app.routes.autogen_route.genai.GenerativeModel") as MockModel:
+        MockModel.return_value.generate_content.return_value.text = "a title"
+        statuses = [client.post("/api/autogen/title", json={"content": "x"}, headers=headers).status_code
+                    for _ in range(3)]
+        assert statuses == [200, 200, 429]
+        assert MockModel.return_value.generate_content.call_count == 2
+    assert client.post("/api/autogen/title", json={}).status_code == 401  # no token, no bucket spent
+
+def test_shed_autogen_spends_no_token(tmp_path):
+    app = _limited_app(tmp_path, autogen=(1, 60))
+    client = app.test_client()
+    client.post("/api/register", json={"email": "s@example.com", "username": "shed", "password": "pw"})
+    token = client.post("/api/login", json={"username": "shed", "password": "pw"}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    gate = app.extensions["admission"]["autogen"]
+    held = [gate.acquire() for _ in range(gate.concurrency)]
+    try:
+        assert client.post("/api/autogen/title", json={"content": "x"}, headers=headers).status_code == 503
+    finally:
+        for _ in held:
+            gate.release()
+    with patch("app.routes.autogen_route.genai.GenerativeModel") as MockModel:
+        MockModel.return_value.generate_content.return_value.text = "a title"
+        res = client.post("/api/autogen/title", json={"content": "x"}, headers=headers)
+    assert res.status_code == 200 and res.headers["RateLimit-Remaining"] == "0"
+
+def test_bucket_refills():
+    state = SharedState(":memory:")
+    assert [state.take("k", 0.05, 0.1)[0] for _ in range(3)] == [True, True, False]
+    time.sleep(0.06)
+    assert state.take("k", 0.05, 0.1)[0]
+    state.sweep_buckets()
+    time.sleep(0.11)
+    state.sweep_buckets()
+    assert state._connect().execute("SELECT count(*) FROM shared_buckets").fetchone()[0] == 0
+
+def _spend(path, attempts, results):
+    state = SharedState(path)
+    results.put(sum(state.take("shared", 60.0, 60.0 * 25)[0] for _ in range(attempts)))
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_workers_share_one_bucket(tmp_path):
+    path = str(tmp_path / "shared.db")
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_spend, args=(path, 20, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+    assert sum(results.get(timeout=5) for _ in workers) == 25  # 80 attempts, 25 tokens
@@ -0,0 +1,89 @@
+# tests/test_replicas.py
+import shutil
+import pytest
+from app import create_app
+from app.models.db_models import db
+from config.config import TestConfig
+
+def _make_app(tmp_path, pin_seconds=30):
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        DATABASE_REPLICA_URLS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        SHARED_STATE_PATH = str(tmp_path / 'shared.db')
+        REPLICA_PIN_SECONDS = pin_seconds
+        BOOTSTRAP_WORKERS = 2
+
+    return create_app(ReplicaConfig)
+
+def _dispose(app):
+    with app.app_context():
+        for engine in [db.engine, *app.extensions["db_replicas"].values()]:
+            engine.dispose()
+
+def _replicate(app, tmp_path):
+    # Stand-in for replication: copy the primary over the replica
+    _dispose(app)
+    shutil.copy(tmp_path / 'primary.db', tmp_path / 'replica.db')
+
+def _login(client, name):
+    client.post("/api/register", json={"email": f"{name}@example.com", "username": name, "password": "pw"})
+    token = client.post("/api/login", json={"username": name, "password": "pw"}).get_json()["access_token"]
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+@pytest.fixture
+def replicated(tmp_path):
+    app = _make_app(tmp_path, pin_seconds=0)
+    with app.app_context():
+        db.create_all()
+    client = _login(app.test_client(), "reader")
+    client.post("/api/entries", json={"title": "old", "content": "c", "tags": "t"})
+    _replicate(app, tmp_path)
+    yield app, client
+    _dispose(app)
+
+def test_reads_go_to_replica_writes_to_primary(replicated):
+    app, client = replicated
+    created = client.post("/api/entries", json={"title": "new", "content": "c", "tags": "t"})
+    assert created.status_code == 201
+
+    # Pin window 0: the list comes from the (stale) replica
+    titles = [e["title"] for e in client.get("/api/entries").get_json()]
+    assert titles == ["old"]
+    assert client.get(f"/api/entries/{created.get_json()['id']}").status_code == 404
+    assert client.get("/api/bootstrap").get_json()["counts"]["entries"] == 1
+
+    # ...while writes and reads inside write requests use the primary
+    with app.app_context():
+        assert db.session.execute(db.text("SELECT count(*) FROM entries")).scalar() == 2
+    res = client.patch("/api/entries", json={"id": created.get_json()["id"], "title": "newer"})
+    assert res.status_code == 200
+
+def test_recent_writer_reads_primary(tmp_path):
+    app = _make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+    writer = _login(app.test_client(), "writer")
+    _replicate(app, tmp_path)
+    other = _login(app.test_client(), "other")  # registering pins nobody: no identity yet
+
+    writer.post("/api/entries", json={"title": "fresh", "content": "c", "tags": "t"})
+    assert [e["title"] for e in writer.get("/api/entries").get_json()] == ["fresh"]
+    assert writer.get("/api/bootstrap").get_json()["counts"]["entries"] == 1
+    # The other user has not written since replication, so reads the replica
+    assert other.get("/api/entries").get_json() == []
+
+def test_pin_is_shared_between_workers(tmp_path):
+    # Two app instances over the same files stand in for two gunicorn workers
+    first, second = _make_app(tmp_path), _make_app(tmp_path)
+    with first.app_context():
+        db.create_all()
+    writer = _login(first.test_client(), "writer")
+    _replicate(first, tmp_path)
+
+    writer.post("/api/entries", json={"title": "fresh", "content": "c", "tags": "t"})
+    reader = second.test_client()
+    reader.environ_base["HTTP_AUTHORIZATION"] = writer.environ_base["HTTP_AUTHORIZATION"]
+    assert [e["title"] for e in reader.get("/api/entries").get_json()] == ["fresh"]
+    _dispose(first)
+    _dispose(second)
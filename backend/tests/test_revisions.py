@@ -0,0 +1,108 @@
+# tests/test_revisions.py
+import json
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+from app.models.db_models import Entry, Revision, db
+from app.models.revisions import apply_delta, item_state, make_delta, record_revision
+
+@pytest.fixture
+def entry_id(auth_client):
+    res = auth_client.post("/api/entries", json={
+        "title": "Versioned",
+        "content": "line 1\nline 2\nline 3\n",
+        "tags": "v"
+    })
+    return res.get_json()["id"]
+
+def test_delta_round_trip():
+    old = "a\nb\nc\nd\n"
+    new = "a\nB\nc\nd\ne"
+    assert apply_delta(old, make_delta(old, new)) == new
+    assert apply_delta("", make_delta("", new)) == new
+    assert apply_delta(old, make_delta(old, "")) == ""
+
+def test_no_revisions_before_first_edit(auth_client, entry_id):
+    res = auth_client.get(f"/api/entries/{entry_id}/revisions")
+    assert res.status_code == 404
+
+def test_edits_create_revisions(auth_client, entry_id):
+    auth_client.patch("/api/entries", json={"id": entry_id, "content": "line 1\nline 2 edited\nline 3\n"})
+    auth_client.patch("/api/entries", json={"id": entry_id, "title": "Renamed"})
+
+    res = auth_client.get(f"/api/entries/{entry_id}/revisions")
+    assert [r["number"] for r in res.get_json()] == [1, 2, 3]
+
+    first = auth_client.get(f"/api/entries/{entry_id}/revisions/1").get_json()
+    assert first["content"] == "line 1\nline 2\nline 3\n"
+    assert first["title"] == "Versioned"
+
+    second = auth_client.get(f"/api/entries/{entry_id}/revisions/2").get_json()
+    assert second["content"] == "line 1\nline 2 edited\nline 3\n"
+    assert second["title"] == "Versioned"
+
+    third = auth_client.get(f"/api/entries/{entry_id}/revisions/3").get_json()
+    assert third["title"] == "Renamed"
+    assert third["content"] == second["content"]
+
+def test_unchanged_update_records_nothing(auth_client, entry_id):
+    auth_client.patch("/api/entries", json={"id": entry_id, "title": "Versioned"})
+    assert Revision.query.count() == 0
+
+def test_deltas_stay_small_and_snapshots_are_periodic(auth_client, entry_id, test_app):
+    test_app.config["REVISION_SNAPSHOT_INTERVAL"] = 4
+    body = "".join(f"log line {i}\n" for i in range(2000))
+    for i in range(9):
+        body += f"appended {i}\n"
+        auth_client.patch("/api/entries", json={"id": entry_id, "content": body})
+
+    revisions = Revision.query.order_by(Revision.number).all()
+    assert [r.number for r in revisions if r.is_snapshot] == [1, 5, 9]
+    # revision 2 introduces the large body itself; later deltas only carry the appended line
+    deltas = [r for r in revisions if not r.is_snapshot and r.number > 2]
+    assert all(len(json.dumps(json.loads(r.payload))) < 200 for r in deltas)
+
+    for n in (7, 10):
+        res = auth_client.get(f"/api/entries/{entry_id}/revisions/{n}")
+        assert res.get_json()["content"].endswith(f"appended {n - 2}\n")
+
+def test_missing_revision(auth_client, entry_id):
+    auth_client.patch("/api/entries", json={"id": entry_id, "title": "Renamed"})
+    res = auth_client.get(f"/api/entries/{entry_id}/revisions/5")
+    assert res.status_code == 404
+
+def test_snippet_revisions(auth_client):
+    res = auth_client.post("/api/snippets", json={
+        "title": "S", "language": "Python", "snippet": "x = 1\n", "description": "d"
+    })
+    snippet_id = res.get_json()["id"]
+    auth_client.patch("/api/snippets", json={"id": snippet_id, "snippet": "x = 2\n", "language": "Py"})
+
+    old = auth_client.get(f"/api/snippets/{snippet_id}/revisions/1").get_json()
+    assert old["snippet"] == "x = 1\n"
+    assert old["language"] == "Python"
+
+def test_delete_removes_history(auth_client, entry_id):
+    auth_client.patch("/api/entries", json={"id": entry_id, "title": "Renamed"})
+    auth_client.delete(f"/api/entries/{entry_id}")
+    assert Revision.query.count() == 0
+
+def test_revisions_are_private(auth_client, other_client, entry_id):
+    auth_client.patch("/api/entries", json={"id": entry_id, "title": "Renamed"})
+    res = other_client.get(f"/api/entries/{entry_id}/revisions/1")
+    assert res.status_code == 404
+
+def test_concurrent_edit_cannot_reuse_revision_number(auth_client, entry_id):
+    # This request reads the entry, then another writer commits an edit with revisions 1 and 2
+    entry = db.session.get(Entry, entry_id)
+    old_state = item_state("entry", entry)
+    db.session.execute(db.text("UPDATE entries SET version = version + 1, title = 'theirs' WHERE id = :id"),
+                       {"id": entry_id})
+    for number in (1, 2):
+        db.session.add(Revision(item_type="entry", item_id=entry_id, user_id=entry.user_id, number=number,
+                                is_snapshot=True, payload="{}"))
+
+    # Numbering this edit's revision would collide with 2: the versioned UPDATE is refused first
+    entry.title = "mine"
+    with pytest.raises(StaleDataError):
+        record_revision("entry", entry_id, entry.user_id, old_state, item_state("entry", entry))
+    db.session.rollback()
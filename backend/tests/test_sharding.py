@@ -0,0 +1,186 @@
+# tests/test_sharding.py
+import pytest
+from app import create_app
+from app.models.db_models import Entry, User, db
+from app.models.routing import using_shard
+from app.models.sharding import move_user
+from app.tasks import purge_deleted_users
+from config.config import TestConfig
+
+def _make_app(tmp_path):
+    class ShardConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'shard0.db'}"
+        DATABASE_SHARD_URLS = [f"sqlite:///{tmp_path / 'shard1.db'}", f"sqlite:///{tmp_path / 'shard2.db'}"]
+        SHARED_STATE_PATH = str(tmp_path / 'shared.db')
+        BOOTSTRAP_WORKERS = 2
+
+    return create_app(ShardConfig)
+
+def _login(client, name):
+    client.post("/api/register", json={"email": f"{name}@example.com", "username": name, "password": "pw"})
+    token = client.post("/api/login", json={"username": name, "password": "pw"}).get_json()["access_token"]
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+def _count(app, shard, sql):
+    with app.app_context(), using_shard(shard):
+        engine = app.extensions["db_shards"][shard] if shard else db.engine
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(sql).scalar()
+
+@pytest.fixture
+def sharded(tmp_path):
+    app = _make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        for engine in app.extensions["db_shards"].values():
+            db.metadata.create_all(engine)
+    # Users 1, 2, 3 land on shards 1, 2, 0
+    clients = [_login(app.test_client(), name) for name in ("ana", "ben", "cy")]
+    yield app, clients
+    with app.app_context():
+        for engine in [db.engine, *app.extensions["db_shards"].values()]:
+            engine.dispose()
+
+def test_users_and_data_land_on_their_shard(sharded):
+    app, (ana, ben, cy) = sharded
+    ids = {}
+    for shard, client in ((1, ana), (2, ben), (0, cy)):
+        res = client.post("/api/entries", json={"title": f"note {shard}", "content": "deploy cluster", "tags": "t"})
+        assert res.status_code == 201
+        ids[shard] = res.get_json()["id"]
+        client.post("/api/snippets", json={"title": "s", "description": "d", "snippet": "print(1)", "language": "py"})
+
+    for shard in (0, 1, 2):
+        assert ids[shard] % 16 == shard  # ids come from the shard's residue class
+        assert _count(app, shard, "SELECT count(*) FROM entries") == 1
+        assert _count(app, shard, "SELECT count(*) FROM snippets") == 1
+    # The directory is on the primary, each shard has copies of its residents only
+    assert _count(app, 0, "SELECT count(*) FROM users") == 3
+    assert _count(app, 1, "SELECT count(*) FROM users") == 1
+    with app.app_context():
+        assert [u.shard for u in User.query.order_by(User.id)] == [1, 2, 0]
+
+    entries = ana.get("/api/entries").get_json()
+    assert [e["title"] for e in entries] == ["note 1"]
+    assert ana.get(f"/api/entries/{ids[1]}").status_code == 200
+    assert ana.get(f"/api/entries/{ids[2]}").status_code == 404
+    assert ana.get("/api/entries/search", query_string={"q": "cluster"}).get_json()[0]["id"] == ids[1]
+    assert ana.get(f"/api/export-entry-json/{ids[1]}").status_code == 200
+    assert ben.get("/api/bootstrap").get_json()["counts"] == {"entries": 1, "snippets": 1}
+
+    res = ana.patch("/api/entries", json={"id": ids[1], "title": "edited"})
+    assert res.status_code == 200
+    assert len(ana.get(f"/api/entries/{ids[1]}/revisions").get_json()) >= 1
+
+    sync = ana.get("/api/sync").get_json()
+    assert sync["next"].startswith("1:")
+    assert cy.get("/api/sync").get_json()["next"].isdigit()
+
+def test_move_user_keeps_ids_and_resyncs(sharded):
+    app, (ana, _, _) = sharded
+    entry = ana.post("/api/entries", json={"title": "keep me", "content": "c", "tags": "t"}).get_json()["id"]
+    snippet = ana.post("/api/snippets", json={"title": "s", "description": "d", "snippet": "x = 1", "language": "py"})
+    ana.patch("/api/entries", json={"id": entry, "title": "kept"})
+    old_token = ana.get("/api/sync").get_json()["next"]
+
+    with app.app_context():
+        report = move_user(1, 2, batch_size=1, grace=0)
+        assert User.query.get(1).shard == 2
+    assert report["entries"] == 1 and report["snippets"] == 1
+
+    for table in ("entries", "snippets", "revisions", "change_log", "code_blobs"):
+        assert _count(app, 1, f"SELECT count(*) FROM {table}") == 0
+    assert _count(app, 1, "SELECT count(*) FROM users") == 0
+    assert _count(app, 2, "SELECT count(*) FROM users") == 2
+
+    assert ana.get(f"/api/entries/{entry}").get_json()["title"] == "kept"
+    assert ana.get(f"/api/snippets/{snippet.get_json()['id']}").status_code == 200
+    # The old shard's token restarts from the beginning on the new shard
+    resync = ana.get("/api/sync", query_string={"since": old_token}).get_json()
+    assert [e["id"] for e in resync["entries"]] == [entry]
+    assert resync["next"].startswith("2:")
+
+    # New ids follow the new shard and never collide with moved ones
+    created = ana.post("/api/entries", json={"title": "after", "content": "c", "tags": "t"}).get_json()["id"]
+    assert created % 16 == 2 and created != entry
+
+def test_writes_refused_while_moving(sharded):
+    app, (ana, _, _) = sharded
+    with app.app_context():
+        db.session.execute(db.update(User).where(User.id == 1).values(moving=True))
+        db.session.commit()
+    res = ana.post("/api/entries", json={"title": "t", "content": "c", "tags": "t"})
+    assert res.status_code == 503
+    assert res.headers["Retry-After"]
+    assert ana.get("/api/entries").status_code == 200
+
+def test_purge_runs_on_the_users_shard(sharded):
+    app, (ana, ben, _) = sharded
+    ana.post("/api/entries", json={"title": "t", "content": "c", "tags": "t"})
+    ben.post("/api/entries", json={"title": "t", "content": "c", "tags": "t"})
+    assert ana.delete("/api/account", json={"password": "pw"}).status_code == 202
+
+    with app.app_context():
+        assert purge_deleted_users() == 1
+        assert db.session.get(User, 1) is None
+    assert _count(app, 1, "SELECT count(*) FROM entries") == 0
+    assert _count(app, 1, "SELECT count(*) FROM users") == 0
+    assert _count(app, 2, "SELECT count(*) FROM entries") == 1
+    with app.app_context(), using_shard(2):
+        assert Entry.query.count() == 1
+
+def test_ids_moved_or_deleted_away_are_never_reissued(sharded):
+    app, (ana, _, _) = sharded
+    moved = ana.post("/api/entries", json={"title": "moves", "content": "c", "tags": "t"}).get_json()["id"]
+    with app.app_context():
+        move_user(1, 2, grace=0)
+
+    # User 4 lands on shard 1, which no longer holds `moved`: the mark still remembers it
+    dan = _login(app.test_client(), "dan")
+    first = dan.post("/api/entries", json={"title": "d", "content": "c", "tags": "t"}).get_json()["id"]
+    assert first % 16 == 1 and first > moved
+    assert dan.delete(f"/api/entries/{first}").status_code == 200
+    second = dan.post("/api/entries", json={"title": "d", "content": "c", "tags": "t"}).get_json()["id"]
+    assert second > first
+
+    # Joining ana on shard 2 brings no clashing ids along
+    with app.app_context():
+        assert move_user(4, 2, grace=0)["entries"] == 1
+    assert sorted(e["id"] for e in dan.get("/api/entries").get_json()) == [second]
+    assert [e["id"] for e in ana.get("/api/entries").get_json()] == [moved]
+
+def test_token_from_an_earlier_stay_sees_the_moved_back_log(sharded):
+    app, (ana, _, _) = sharded
+    first = ana.post("/api/entries", json={"title": "one", "content": "c", "tags": "t"}).get_json()["id"]
+    ana.patch("/api/entries", json={"id": first, "title": "one again"})
+    old_token = ana.get("/api/sync").get_json()["next"]
+    assert old_token.startswith("1:")
+
+    with app.app_context():
+        move_user(1, 2, grace=0)
+    second = ana.post("/api/entries", json={"title": "two", "content": "c", "tags": "t"}).get_json()["id"]
+    with app.app_context():
+        move_user(1, 1, grace=0)
+
+    # Shard 1 held nothing else, so SQLite would have numbered the copies from 1 again
+    resync = ana.get("/api/sync", query_string={"since": old_token}).get_json()
+    assert sorted(e["id"] for e in resync["entries"]) == sorted([first, second])
+
+def test_shard_copies_of_users_hold_no_credentials(sharded):
+    app, _ = sharded
+    with app.app_context():
+        move_user(3, 1, grace=0)
+        with app.extensions["db_shards"][1].connect() as connection:
+            rows = connection.exec_driver_sql("SELECT id, email, password_hashed FROM users ORDER BY id").all()
+    assert [row.id for row in rows] == [1, 3]
+    assert all("@" not in row.email and row.password_hashed == "" for row in rows)
+
+def test_bootstrap_reads_the_username_from_the_directory(sharded):
+    app, (ana, ben, cy) = sharded
+    ana.post("/api/entries", json={"title": "note", "content": "body", "tags": "t"})
+    for client, name in ((ana, "ana"), (ben, "ben"), (cy, "cy")):
+        data = client.get("/api/bootstrap").get_json()
+        assert data["username"] == name
+    assert data["counts"] == {"entries": 0, "snippets": 0}
+    assert ana.get("/api/bootstrap").get_json()["counts"] == {"entries": 1, "snippets": 0}
@@ -0,0 +1,137 @@
+# tests/test_sqlite.py
+import sqlite3
+import threading
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.models.db_models import db
+from app.models.types import settings
+from config.config import Config, TestConfig
+
+@pytest.fixture
+def file_app(tmp_path):
+    class SQLiteConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'devlog.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = Config.SQLALCHEMY_ENGINE_OPTIONS
+
+    app = create_app(SQLiteConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+def _login(client):
+    client.post("/api/register", json={"email": "a@example.com", "username": "a", "password": "pw"})
+    token = client.post("/api/login", json={"username": "a", "password": "pw"}).get_json()["access_token"]
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+def test_pragmas_on_every_connection(file_app):
+    with file_app.app_context():
+        with db.engine.connect() as conn:
+            pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == Config.SQLITE_PRAGMAS["busy_timeout"]
+            assert pragma("cache_size") == Config.SQLITE_PRAGMAS["cache_size"]
+            assert pragma("mmap_size") == Config.SQLITE_PRAGMAS["mmap_size"]
+
+def test_concurrent_writers_wait_for_the_lock(file_app):
+    token = _login(file_app.test_client()).environ_base["HTTP_AUTHORIZATION"]
+    statuses = []
+
+    def writer(n):
+        client = file_app.test_client()
+        client.environ_base["HTTP_AUTHORIZATION"] = token
+        for i in range(10):
+            res = client.post("/api/entries", json={"title": f"t{n}-{i}", "content": "c", "tags": "x"})
+            statuses.append(res.status_code)
+            entry_id = res.get_json()["id"]
+            statuses.append(client.patch("/api/entries", json={"id": entry_id, "title": f"u{n}-{i}"}).status_code)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(statuses) == [200] * 60 + [201] * 60
+
+def test_write_lock_taken_at_first_write(file_app, tmp_path):
+    client = _login(file_app.test_client())
+    writer = sqlite3.connect(tmp_path / "devlog.db")
+    writer.execute("BEGIN IMMEDIATE")  # another process holds the write lock
+    try:
+        # Requests that only read (password check, account check) don't queue behind it
+        assert client.post("/api/login", json={"username": "a", "password": "pw"}).status_code == 200
+        assert client.post("/api/events/token").status_code == 200
+    finally:
+        writer.rollback()
+        writer.close()
+
+    statements = []
+    listen = lambda conn, cursor, statement, *args: statements.append(statement)
+    with file_app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", listen)
+    try:
+        assert client.post("/api/entries", json={"title": "t", "content": "c"}).status_code == 201
+    finally:
+        event.remove(engine, "before_cursor_execute", listen)
+    # The account check reads in a deferred transaction, swapped for an immediate one before the first write
+    assert statements[0] == "BEGIN" and statements[1].startswith("SELECT")
+    immediate = statements.index("BEGIN IMMEDIATE")
+    assert statements[immediate - 1] == "COMMIT"
+    assert immediate < min(i for i, sql in enumerate(statements) if sql.startswith(("INSERT", "UPDATE")))
+
+def _titles(res):
+    assert res.status_code == 200
+    return sorted(item["title"] for item in res.get_json())
+
+def test_search_uses_index(auth_client, test_app):
+    auth_client.post("/api/entries", json={"title": "Deploy notes", "content": "Rolled out the Kubernetes cluster", "tags": "ops"})
+    auth_client.post("/api/entries", json={"title": "Lunch", "content": "ramen", "tags": "food"})
+    auth_client.post("/api/snippets", json={"title": "Loop", "snippet": "for x in range(10): print(x)", "language": "python", "tags": "basics", "description": "d"})
+
+    assert _titles(auth_client.get("/api/entries/search?q=kubernetes")) == ["Deploy notes"]
+    assert _titles(auth_client.get("/api/entries/search?q=OLLED cluster")) == ["Deploy notes"]
+    assert list(test_app.extensions["sqlite_search"].values()) == [True]  # one entry per engine searched
+    # Any term matches, indexed or not
+    assert _titles(auth_client.get("/api/entries/search?q=kubernetes ramen")) == ["Deploy notes", "Lunch"]
+    assert _titles(auth_client.get("/api/entries/search?q=kubernetes ra")) == ["Deploy notes", "Lunch"]
+    # Terms under three characters fall back to LIKE
+    assert _titles(auth_client.get("/api/entries/search?q=ra men")) == ["Lunch"]
+    assert _titles(auth_client.get("/api/snippets/search?q=range PY")) == ["Loop"]
+    assert _titles(auth_client.get('/api/snippets/search?q="x"')) == []
+
+def test_index_follows_writes(auth_client):
+    entry_id = auth_client.post("/api/entries", json={"title": "Draft", "content": "first body", "tags": "a"}).get_json()["id"]
+    snippet_id = auth_client.post("/api/snippets", json={"title": "S", "snippet": "alpha()", "language": "js", "tags": "a", "description": "d"}).get_json()["id"]
+
+    auth_client.patch("/api/entries", json={"id": entry_id, "content": "second body"})
+    assert auth_client.get("/api/entries/search?q=first").get_json() == []
+    assert _titles(auth_client.get("/api/entries/search?q=second")) == ["Draft"]
+
+    auth_client.patch("/api/snippets", json={"id": snippet_id, "snippet": "beta()"})
+    assert auth_client.get("/api/snippets/search?q=alpha").get_json() == []
+    assert _titles(auth_client.get("/api/snippets/search?q=beta")) == ["S"]
+
+    auth_client.delete(f"/api/entries/{entry_id}")
+    assert auth_client.get("/api/entries/search?q=second").get_json() == []
+
+def test_index_holds_decoded_compressed_bodies(auth_client, monkeypatch):
+    monkeypatch.setitem(settings, "threshold", 64)
+    content = "filler line\n" * 50 + "the NEEDLE is here"
+    auth_client.post("/api/entries", json={"title": "Big", "content": content, "tags": "x"})
+    assert _titles(auth_client.get("/api/entries/search?q=needle")) == ["Big"]
+
+def test_init_db_rebuilds_index(file_app):
+    _login(file_app.test_client()).post("/api/entries", json={"title": "Kept", "content": "findable", "tags": "x"})
+    with file_app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DELETE FROM entries_fts")
+    result = file_app.test_cli_runner().invoke(args=["init-db"])
+    assert "search index rebuilt" in result.output
+    with file_app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT count(*) FROM entries_fts WHERE entries_fts MATCH 'findable'").scalar() == 1
@@ -0,0 +1,48 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+import pytest
+from app import create_app
+from app.models.db_models import db
+from config.config import TestConfig
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_app_starts_without_llm_sdk_or_key():
+    # A fresh interpreter: in this one other tests may have imported the SDK already
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    script = ("import sys\n"
+              "from app import create_app\n"
+              "from config.config import TestConfig\n"
+              "class NoKeyConfig(TestConfig):\n"
+              "    GEMINI_API_KEY = None\n"
+              "client = create_app(NoKeyConfig).test_client()\n"
+              "assert client.post('/api/autogen/title', json={}).status_code == 401\n"
+              # What importing the SDK would have loaded (looking at the lazy module itself would load it)
+              "print(any(name in sys.modules for name in ('google.generativeai.types', 'grpc')))\n")
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+def test_only_enabled_blueprints_are_registered():
+    class MinimalConfig(TestConfig):
+        ENABLED_BLUEPRINTS = ["health"]
+
+    app = create_app(MinimalConfig)
+    assert "health" in app.blueprints and "autogen" not in app.blueprints
+    assert "change_feed" not in app.extensions
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    assert client.post("/api/register", json={"email": "m@example.com", "username": "m", "password": "pw"}).status_code == 201
+    assert client.get("/api/health/pool").status_code == 200
+    assert client.get("/api/export-entry-md/1").status_code == 404
+    assert client.get("/api/events").status_code == 404
+
+def test_unknown_blueprint_is_rejected():
+    class TypoConfig(TestConfig):
+        ENABLED_BLUEPRINTS = ["autogen", "heath"]
+
+    with pytest.raises(ValueError, match="heath"):
+        create_app(TypoConfig)
@@ -0,0 +1,193 @@
+# tests/test_storage.py
+import pytest
+from app.models.db_models import CodeBlob, Entry, EntryBody, Snippet, db
+from app.models.types import RAW_MARKER, ZLIB_MARKER, decode_body, encode_body, settings
+from app import tasks
+from app.tasks import compress_bodies, purge_deleted_users, recount_blobs
+
+@pytest.fixture
+def entry_data():
+    return {
+        "title": "Storage Entry",
+        "content": "stack trace from the deploy job",
+        "tags": "logs"
+    }
+
+@pytest.fixture
+def snippet_data():
+    return {
+        "title": "Storage Snippet",
+        "language": "Python",
+        "snippet": "print('stored separately')",
+        "description": "A snippet",
+        "tags": "storage"
+    }
+
+# ------------------------
+# VERTICAL PARTITIONING
+# ------------------------
+def test_entry_body_stored_in_separate_table(auth_client, entry_data):
+    res = auth_client.post("/api/entries", json=entry_data)
+    entry_id = res.get_json()["id"]
+
+    body = db.session.get(EntryBody, entry_id)
+    assert body is not None
+    assert body.content == entry_data["content"]
+    assert "content" not in Entry.__table__.columns
+
+def test_update_content_only_touches_updated_at(auth_client, entry_data):
+    res = auth_client.post("/api/entries", json=entry_data)
+    created = res.get_json()
+
+    res2 = auth_client.patch("/api/entries", json={"id": created["id"], "content": "new body"})
+    assert res2.status_code == 200
+    assert res2.get_json()["content"] == "new body"
+    assert res2.get_json()["updated_at"] > created["updated_at"]
+
+def test_search_matches_body_text(auth_client, entry_data, snippet_data):
+    auth_client.post("/api/entries", json=entry_data)
+    auth_client.post("/api/snippets", json=snippet_data)
+
+    res = auth_client.get("/api/entries/search?q=deploy")
+    assert [e["title"] for e in res.get_json()] == ["Storage Entry"]
+
+    res = auth_client.get("/api/snippets/search?q=separately")
+    assert [s["title"] for s in res.get_json()] == ["Storage Snippet"]
+
+def test_delete_removes_body(auth_client, snippet_data):
+    res = auth_client.post("/api/snippets", json=snippet_data)
+    snippet_id = res.get_json()["id"]
+
+    auth_client.delete(f"/api/snippets/{snippet_id}")
+    assert Snippet.query.count() == 0
+    assert db.session.execute(db.text("SELECT COUNT(*) FROM code_blobs")).scalar() == 0
+
+# ------------------------
+# COMPRESSION AT REST
+# ------------------------
+def _stored_content(entry_id):
+    return db.session.execute(
+        db.text("SELECT content FROM entry_bodies WHERE entry_id = :id"), {"id": entry_id}
+    ).scalar()
+
+def test_large_body_compressed_at_rest(auth_client, entry_data):
+    big = "Traceback (most recent call last):\n  File \"app.py\", line 1\n" * 500
+    res = auth_client.post("/api/entries", json={**entry_data, "content": big})
+    entry_id = res.get_json()["id"]
+
+    stored = _stored_content(entry_id)
+    assert stored.startswith(ZLIB_MARKER)
+    assert len(stored) < len(big) / 5
+
+    res2 = auth_client.get(f"/api/entries/{entry_id}")
+    assert res2.get_json()["content"] == big
+
+def test_small_body_stored_plain(auth_client, entry_data):
+    res = auth_client.post("/api/entries", json=entry_data)
+    assert _stored_content(res.get_json()["id"]) == entry_data["content"]
+
+def test_marker_prefixed_text_round_trips():
+    for value in ["", "plain", ZLIB_MARKER + "not compressed", RAW_MARKER + "x"]:
+        assert decode_body(encode_body(value)) == value
+
+def test_search_matches_compressed_body(auth_client, entry_data):
+    big = "connection reset by peer\n" * 1000 + "needle"
+    auth_client.post("/api/entries", json={**entry_data, "title": "Big", "content": big})
+    auth_client.post("/api/entries", json={**entry_data, "title": "Other", "content": "x" * 5000})
+
+    res = auth_client.get("/api/entries/search?q=NEEDLE")
+    assert [e["title"] for e in res.get_json()] == ["Big"]
+
+def test_compress_bodies_rewrites_legacy_rows(auth_client, entry_data):
+    res = auth_client.post("/api/entries", json=entry_data)
+    entry_id = res.get_json()["id"]
+    legacy = "plain legacy log line\n" * 400
+    db.session.execute(
+        db.text("UPDATE entry_bodies SET content = :c WHERE entry_id = :id"), {"c": legacy, "id": entry_id}
+    )
+    db.session.commit()
+
+    report = compress_bodies(batch_size=1)
+    assert report["entry_bodies"][0] == 1
+    assert _stored_content(entry_id).startswith(ZLIB_MARKER)
+    assert auth_client.get(f"/api/entries/{entry_id}").get_json()["content"] == legacy
+
+def test_compress_bodies_skips_rows_changed_meanwhile(auth_client, entry_data, monkeypatch):
+    entry_id = auth_client.post("/api/entries", json=entry_data).get_json()["id"]
+    legacy = "plain legacy log line\n" * 400
+    db.session.execute(
+        db.text("UPDATE entry_bodies SET content = :c WHERE entry_id = :id"), {"c": legacy, "id": entry_id}
+    )
+    db.session.commit()
+
+    # A PATCH lands between the task's read and its UPDATE
+    def encode_after_edit(value):
+        db.session.execute(db.text("UPDATE entry_bodies SET content = 'edited' WHERE entry_id = :id"), {"id": entry_id})
+        return encode_body(value)
+    monkeypatch.setattr(tasks, "encode_body", encode_after_edit)
+
+    assert compress_bodies()["entry_bodies"][0] == 0
+    assert _stored_content(entry_id) == "edited"
+
+def test_compress_bodies_keeps_marker_prefixed_text(auth_client, entry_data, monkeypatch):
+    content = ZLIB_MARKER + "log line\n" * 400
+    monkeypatch.setitem(settings, "threshold", 10 ** 6)  # stored as written, behind a RAW_MARKER escape
+    entry_id = auth_client.post("/api/entries", json={**entry_data, "content": content}).get_json()["id"]
+    assert _stored_content(entry_id) == RAW_MARKER + content
+    monkeypatch.setitem(settings, "threshold", 256)
+
+    assert compress_bodies()["entry_bodies"][0] == 1
+    assert _stored_content(entry_id).startswith(ZLIB_MARKER)
+    assert auth_client.get(f"/api/entries/{entry_id}").get_json()["content"] == content
+
+# ------------------------
+# DEDUPLICATED CODE BLOBS
+# ------------------------
+def _blobs():
+    return {b.hash: b.refcount for b in CodeBlob.query.all()}
+
+def test_identical_code_shares_one_blob(auth_client, snippet_data):
+    auth_client.post("/api/snippets", json=snippet_data)
+    auth_client.post("/api/snippets", json={**snippet_data, "snippet": snippet_data["snippet"].replace("\n", "\r\n")})
+    auth_client.post("/api/snippets", json={**snippet_data, "title": "Copy"})
+
+    assert list(_blobs().values()) == [3]
+    assert len({s.code_hash for s in Snippet.query.all()}) == 1
+
+def test_update_moves_reference_to_new_blob(auth_client, snippet_data):
+    first = auth_client.post("/api/snippets", json=snippet_data).get_json()["id"]
+    auth_client.post("/api/snippets", json=snippet_data)
+
+    res = auth_client.patch("/api/snippets", json={"id": first, "snippet": "print('changed')"})
+    assert res.get_json()["snippet"] == "print('changed')"
+    assert sorted(_blobs().values()) == [1, 1]
+
+    auth_client.patch("/api/snippets", json={"id": first, "snippet": snippet_data["snippet"]})
+    assert list(_blobs().values()) == [2]
+
+def test_last_delete_collects_blob(auth_client, snippet_data):
+    ids = [auth_client.post("/api/snippets", json=snippet_data).get_json()["id"] for _ in range(2)]
+
+    auth_client.delete(f"/api/snippets/{ids[0]}")
+    assert list(_blobs().values()) == [1]
+    auth_client.delete(f"/api/snippets/{ids[1]}")
+    assert _blobs() == {}
+
+def test_account_purge_releases_blobs(auth_client, snippet_data):
+    auth_client.post("/api/snippets", json=snippet_data)
+    auth_client.post("/api/snippets", json=snippet_data)
+
+    auth_client.delete("/api/account", json={"password": "password123"})
+    purge_deleted_users()
+    assert _blobs() == {}
+
+def test_recount_blobs_repairs_drift(auth_client, snippet_data):
+    snippet_id = auth_client.post("/api/snippets", json=snippet_data).get_json()["id"]
+    auth_client.post("/api/snippets", json={**snippet_data, "snippet": "other"})
+    # Simulate a delete that bypassed the ORM (e.g. ON DELETE CASCADE)
+    db.session.execute(db.text("DELETE FROM snippets WHERE id = :id"), {"id": snippet_id})
+    db.session.execute(db.text("UPDATE code_blobs SET refcount = 7"))
+    db.session.commit()
+
+    assert recount_blobs() == 1
+    assert list(_blobs().values()) == [1]
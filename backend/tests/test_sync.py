@@ -0,0 +1,143 @@
+# tests/test_sync.py
+import threading
+import pytest
+from app import create_app
+from app.models.changes import compact_change_log
+from app.models.db_models import ChangeLog, Entry, User, db
+from config.config import Config, TestConfig
+
+def _sync(client, since=0, **params):
+    res = client.get("/api/sync", query_string={"since": since, **params})
+    assert res.status_code == 200
+    return res.get_json()
+
+def _new_entry(client, title="E", tags="t"):
+    return client.post("/api/entries", json={"title": title, "content": "body", "tags": tags}).get_json()["id"]
+
+def test_sync_returns_only_changes_since_token(auth_client):
+    first = _new_entry(auth_client, "first")
+    token = _sync(auth_client)["next"]
+
+    second = _new_entry(auth_client, "second")
+    auth_client.patch("/api/entries", json={"id": first, "content": "edited"})
+    page = _sync(auth_client, token)
+
+    assert sorted(e["id"] for e in page["entries"]) == [first, second]
+    assert {e["id"]: e["content"] for e in page["entries"]}[first] == "edited"
+    # same shape as the item routes
+    assert {e["id"]: e for e in page["entries"]}[second] == auth_client.get(f"/api/entries/{second}").get_json()
+    assert _sync(auth_client, page["next"])["entries"] == []
+
+def test_deletes_leave_tombstones(auth_client):
+    entry_id = _new_entry(auth_client)
+    snippet_id = auth_client.post("/api/snippets", json={
+        "title": "s", "language": "Python", "snippet": "x", "description": "d"}).get_json()["id"]
+    token = _sync(auth_client)["next"]
+
+    auth_client.delete(f"/api/entries/{entry_id}")
+    auth_client.delete(f"/api/snippets/{snippet_id}")
+    page = _sync(auth_client, token)
+    assert page["deleted"] == {"entries": [entry_id], "snippets": [snippet_id]}
+    assert page["entries"] == [] and page["snippets"] == []
+
+def test_created_then_deleted_is_only_a_tombstone(auth_client):
+    token = _sync(auth_client)["next"]
+    entry_id = _new_entry(auth_client)
+    auth_client.delete(f"/api/entries/{entry_id}")
+    page = _sync(auth_client, token)
+    assert page["entries"] == []
+    assert page["deleted"]["entries"] == [entry_id]
+
+def test_set_based_writes_are_logged(auth_client):
+    ids = [_new_entry(auth_client, f"E{i}", "js") for i in range(4)]
+    token = _sync(auth_client)["next"]
+
+    auth_client.patch("/api/entries/bulk", json={"ids": ids[:2], "set": {"title": "bulk"}})
+    auth_client.post("/api/tags/rename", json={"from": "js", "to": "javascript"})
+    auth_client.delete("/api/entries/bulk", json={"ids": [ids[3]]})
+    page = _sync(auth_client, token)
+
+    assert sorted(e["id"] for e in page["entries"]) == ids[:3]
+    assert all(e["tags"] == "javascript" for e in page["entries"])
+    assert page["deleted"]["entries"] == [ids[3]]
+
+def test_pagination(auth_client):
+    ids = [_new_entry(auth_client, f"E{i}") for i in range(5)]
+    seen, token = [], 0
+    while True:
+        page = _sync(auth_client, token, limit=2)
+        seen += [e["id"] for e in page["entries"]]
+        token = page["next"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+
+def test_sync_is_per_user(auth_client, other_client):
+    _new_entry(auth_client)
+    page = other_client.get("/api/sync").get_json()
+    assert page["entries"] == [] and page["next"] == "0"
+
+def test_compaction_keeps_sync_results(auth_client):
+    entry_id = _new_entry(auth_client)
+    for i in range(3):
+        auth_client.patch("/api/entries", json={"id": entry_id, "title": f"v{i}"})
+    before = _sync(auth_client)
+
+    assert compact_change_log(batch_size=2) == 3
+    assert ChangeLog.query.count() == 1
+    assert _sync(auth_client) == before
+
+@pytest.mark.parametrize("query", ["since=abc", "since=-1", "limit=0"])
+def test_invalid_parameters(auth_client, query):
+    assert auth_client.get(f"/api/sync?{query}").status_code == 400
+
+def test_token_never_passes_a_change_still_in_flight(tmp_path):
+    # Two sessions interleaved: one flushes a change (taking its seq) and stays open while
+    # another request writes for the same user and a client syncs in between
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'devlog.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = Config.SQLALCHEMY_ENGINE_OPTIONS
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.post("/api/register", json={"email": "a@example.com", "username": "a", "password": "pw"})
+    token = client.post("/api/login", json={"username": "a", "password": "pw"}).get_json()["access_token"]
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    since = _sync(client)["next"]
+
+    flushed, release = threading.Event(), threading.Event()
+
+    def slow_writer():
+        with app.app_context():
+            user_id = User.query.filter_by(username="a").one().id
+            db.session.add(Entry(title="slow", content="c", tags="t", user_id=user_id))
+            db.session.flush()  # seq assigned, transaction still open
+            flushed.set()
+            release.wait(10)
+            db.session.commit()
+
+    statuses = []
+    slow = threading.Thread(target=slow_writer)
+    slow.start()
+    assert flushed.wait(10)
+    fast = threading.Thread(target=lambda: statuses.append(
+        app.test_client().post("/api/entries", json={"title": "fast", "content": "c", "tags": "t"},
+                               headers={"Authorization": f"Bearer {token}"}).status_code))
+    fast.start()
+    fast.join(0.5)
+    assert fast.is_alive()  # the second writer waits for the first one's commit
+
+    page = _sync(client, since)
+    assert page["entries"] == [] and page["next"] == since
+
+    release.set()
+    slow.join(10)
+    fast.join(10)
+    assert statuses == [201]
+    page = _sync(client, page["next"])
+    assert [e["title"] for e in sorted(page["entries"], key=lambda e: e["id"])] == ["slow", "fast"]
+    with app.app_context():
+        assert [row.item_id for row in ChangeLog.query.order_by(ChangeLog.seq)] == [1, 2]
+        db.engine.dispose()
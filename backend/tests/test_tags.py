@@ -0,0 +1,74 @@
+# tests/test_tags.py
+import pytest
+from app.models.db_models import Entry, Snippet
+
+@pytest.fixture
+def library(auth_client):
+    entries = [
+        {"title": "a", "content": "c", "tags": "js,react"},
+        {"title": "b", "content": "c", "tags": "sorting, js, arrays"},
+        {"title": "c", "content": "c", "tags": "jsx"},
+        {"title": "d", "content": "c", "tags": "js,javascript"},
+        {"title": "e", "content": "c"},
+    ]
+    auth_client.post("/api/entries/batch", json={"items": entries})
+    auth_client.post("/api/snippets", json={
+        "title": "s", "language": "JavaScript", "snippet": "x", "description": "d", "tags": "ecmascript,js"
+    })
+
+def _entry_tags():
+    return {e.title: e.tags for e in Entry.query.all()}
+
+def test_rename_tag(auth_client, library):
+    res = auth_client.post("/api/tags/rename", json={"from": "js", "to": "javascript"})
+    assert res.status_code == 200
+    assert res.get_json() == {"target": "javascript", "entries": 3, "snippets": 1}
+
+    assert _entry_tags() == {
+        "a": "javascript,react",
+        "b": "sorting,javascript,arrays",
+        "c": "jsx",
+        "d": "javascript",
+        "e": None,
+    }
+    assert Snippet.query.one().tags == "ecmascript,javascript"
+
+def test_merge_tags(auth_client, library):
+    res = auth_client.post("/api/tags/merge", json={"sources": ["js", "ecmascript"], "target": "javascript"})
+    assert res.status_code == 200
+    assert Snippet.query.one().tags == "javascript"
+    assert _entry_tags()["a"] == "javascript,react"
+
+def test_rename_bumps_version(auth_client, library):
+    auth_client.post("/api/tags/rename", json={"from": "react", "to": "reactjs"})
+    versions = {e.title: e.version for e in Entry.query.all()}
+    assert versions["a"] == 2
+    assert versions["b"] == 1
+
+def test_rename_is_scoped_to_caller(auth_client, other_client, library):
+    res = other_client.post("/api/tags/rename", json={"from": "js", "to": "x"})
+    assert res.get_json()["entries"] == 0
+    assert _entry_tags()["a"] == "js,react"
+
+def test_like_wildcards_are_literal(auth_client, library):
+    res = auth_client.post("/api/tags/rename", json={"from": "j_", "to": "x"})
+    assert res.get_json()["entries"] == 0
+
+@pytest.mark.parametrize("body", [
+    {"from": "", "to": "x"},
+    {"from": "a,b", "to": "x"},
+    {"from": "a"},
+    {"from": "a", "to": "b", "extra": 1},
+])
+def test_rename_validation(auth_client, body):
+    assert auth_client.post("/api/tags/rename", json=body).status_code == 400
+
+def test_merge_validation(auth_client):
+    assert auth_client.post("/api/tags/merge", json={"sources": [], "target": "x"}).status_code == 400
+
+def test_rename_matches_case_exactly(auth_client, library):
+    auth_client.post("/api/entries", json={"title": "f", "content": "c", "tags": "JS,web"})
+    res = auth_client.post("/api/tags/rename", json={"from": "js", "to": "javascript"})
+    assert res.get_json()["entries"] == 3  # a, b and d; "JS" is another tag
+    entry = Entry.query.filter_by(title="f").one()
+    assert (entry.tags, entry.version) == ("JS,web", 1)
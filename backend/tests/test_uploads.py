@@ -0,0 +1,65 @@
+# tests/test_uploads.py
+import pytest
+from app.models.db_models import Entry
+
+@pytest.fixture
+def limits(test_app):
+    test_app.config.update(MAX_CONTENT_LENGTH=64 * 1024, MAX_JSON_LENGTH=8 * 1024)
+
+def test_upload_entry(auth_client, limits):
+    body = "x" * 40_000 + "\n– done\n"
+    res = auth_client.post("/api/entries/upload?title=Big&tags=logs", data=body.encode("utf-8"),
+                           content_type="text/plain")
+    assert res.status_code == 201
+    created = res.get_json()
+    assert "content" not in created
+    assert created["size"] == len(body.encode("utf-8"))
+
+    fetched = auth_client.get(f"/api/entries/{created['id']}").get_json()
+    assert fetched["content"] == body
+    assert fetched["tags"] == "logs"
+
+def test_upload_decodes_characters_split_across_chunks(auth_client, limits, monkeypatch):
+    monkeypatch.setattr("app.routes.crud_route.UPLOAD_CHUNK_SIZE", 3)
+    body = "aé€😀 " * 500  # 1-4 byte characters, most of them cut by a chunk boundary
+    res = auth_client.post("/api/entries/upload?title=split", data=body.encode("utf-8"))
+    assert res.status_code == 201
+    assert auth_client.get(f"/api/entries/{res.get_json()['id']}").get_json()["content"] == body
+
+def test_upload_spooled_to_disk_keeps_line_endings(auth_client, limits, monkeypatch):
+    monkeypatch.setattr("app.routes.crud_route.UPLOAD_SPOOL_SIZE", 100)
+    body = "first line\r\nsecond\rthird\n" * 1000
+    res = auth_client.post("/api/entries/upload?title=spooled", data=body.encode("utf-8"))
+    assert res.status_code == 201 and res.get_json()["size"] == len(body)
+    assert auth_client.get(f"/api/entries/{res.get_json()['id']}").get_json()["content"] == body
+
+def test_upload_snippet(auth_client, limits):
+    code = "print('hi')\r\n" * 2000
+    res = auth_client.post("/api/snippets/upload?title=s&language=Python&description=d", data=code)
+    assert res.status_code == 201
+    fetched = auth_client.get(f"/api/snippets/{res.get_json()['id']}").get_json()
+    assert fetched["snippet"] == code.replace("\r\n", "\n")
+
+def test_upload_over_limit_is_rejected(auth_client, limits):
+    res = auth_client.post("/api/entries/upload?title=Big", data=b"x" * (64 * 1024 + 1))
+    assert res.status_code == 413
+    assert res.get_json()["error"] == "Request body too large"
+    assert Entry.query.count() == 0
+
+def test_json_body_has_tighter_limit(auth_client, limits):
+    res = auth_client.post("/api/entries", json={"title": "t", "content": "x" * 9000})
+    assert res.status_code == 413
+    assert res.get_json()["max_bytes"] == 8 * 1024
+
+    res = auth_client.post("/api/entries/upload?title=t", data=b"x" * 9000)
+    assert res.status_code == 201
+
+@pytest.mark.parametrize("query,body", [
+    ("title=t", b""),
+    ("title=t", b"\xff\xfe"),
+    ("tags=no-title", b"content"),
+    ("title=&tags=empty-title", b"content"),
+    ("title=t&bogus=1", b"content"),
+])
+def test_upload_validation(auth_client, query, body):
+    assert auth_client.post(f"/api/entries/upload?{query}", data=body).status_code == 400
@@ -1,7 +1,7 @@
 # entry.py
 
 import requests
-from utils import console
+from utils import console, text_edits
 from auth import get_token
 from rich.markdown import Markdown
 
@@ -205,17 +205,25 @@ def update_entry(entry_id):
     except requests.exceptions.RequestException:
         pass
 
-    update = {"id": entry_id}
+    update = {"id": entry_id, "version": entry.get("version")}
     if title:
         update["title"] = title
     if content:
-        update["content"] = content
+        # Send only the changed ranges; a one-line edit of a large entry stays a small request
+        update["edits"] = text_edits(entry.get("content", ""), content)
     if tags:
         update["tags"] = tags
 
     try:
         res = requests.patch(update_url, json=update, headers=headers)
         result = res.json()
+        if res.status_code == 409:
+            print("Entry was changed elsewhere since it was loaded; fetch it again and retry.")
+            return
+        if not res.ok:
+            details = f" ({result['details']})" if result.get('details') else ""
+            print(f"Failed to update entry: {result.get('error', res.status_code)}{details}")
+            return
 
         print("\nEntry Updated Successfully!\n")
         print("Updated Entry:")
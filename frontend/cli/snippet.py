@@ -265,8 +265,8 @@ def update_snippet(snippet_id):
     except requests.exceptions.RequestException:
         pass
 
-    # Build update payload with only changed fields
-    update = {"id": snippet_id}
+    # Build update payload with only changed fields; the version makes a concurrent edit a 409, not a lost update
+    update = {"id": snippet_id, "version": snippet.get("version")}
     if title:
         update["title"] = title
     if code:
@@ -281,6 +281,13 @@ def update_snippet(snippet_id):
     try:
         res = requests.patch(update_url, json=update, headers=headers)
         result = res.json()
+        if res.status_code == 409:
+            print("Snippet was changed elsewhere since it was loaded; fetch it again and retry.")
+            return
+        if not res.ok:
+            details = f" ({result['details']})" if result.get('details') else ""
+            print(f"Failed to update snippet: {result.get('error', res.status_code)}{details}")
+            return
 
         # Display updated snippet in formatted way
         print("\nSnippet Updated Successfully!\n")
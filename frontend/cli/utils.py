@@ -1,6 +1,7 @@
 # utils.py
 
 import requests
+from difflib import SequenceMatcher
 from pathlib import Path
 from rich.console import Console
 from rich.syntax import Syntax
@@ -11,3 +12,22 @@ console = Console()
 
 # Token file path (same behavior as original CLI)
 TOKEN_FILE = Path(__file__).parent / '.devlog_token'
+
+
+def text_edits(old, new):
+    """Range edits turning `old` into `new`, for PATCHing only the changed lines of a body.
+
+    Offsets are character positions in `old`, as the API's `edits` field expects.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    starts = [0]
+    for line in old_lines:
+        starts.append(starts[-1] + len(line))
+
+    edits = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            edits.append({"start": starts[i1], "end": starts[i2], "text": "".join(new_lines[j1:j2])})
+    return edits
@@ -65,6 +65,9 @@ export default function Entries({ apiHeaders, token }) {
   
   // Edit mode - stores ID of entry being edited (null = creating new)
   const [editId, setEditId] = useState(null)
+  // Version of the entry the form was filled from; sent with the update so a change made
+  // elsewhere in the meantime is reported (409) instead of silently overwritten
+  const [editVersion, setEditVersion] = useState(null)
   
   // Search and filter functionality
   const [searchTerm, setSearchTerm] = useState('') // Search input value
@@ -156,6 +159,101 @@ export default function Entries({ apiHeaders, token }) {
     }
   }, [token]) // Dependency array - run when token changes
 
+  // ============================================
+  // LIVE UPDATES - Server-Sent Events from /api/events
+  // ============================================
+  // Changes made in other tabs or the CLI arrive as small {type, id, op, version}
+  // notifications, so only the changed entry is downloaded instead of the whole list.
+  // EventSource can't send headers, so a token goes in the URL (?jwt=...). URLs end up in logs,
+  // so it is a short-lived stream token from /api/events/token, not the login token. The
+  // browser reconnects with the same URL when a stream ends; once that token has expired the
+  // source closes, and we fetch a new token and reopen from the last change we saw.
+  useEffect(() => {
+    if (!token) return
+    let source = null
+    let stopped = false
+    let lastId = ''
+
+    async function connect() {
+      try {
+        const res = await fetch(`${API_BASE}/api/events/token`, { method: 'POST', headers: apiHeaders() })
+        if (!res.ok || stopped) return
+        const streamToken = (await res.json()).token
+        const since = lastId ? `&since=${encodeURIComponent(lastId)}` : ''
+        source = new EventSource(`${API_BASE}/api/events?jwt=${encodeURIComponent(streamToken)}${since}`)
+      } catch {
+        return // Server unreachable - the list still works, just not live
+      }
+      source.addEventListener('change', onChange)
+      source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED || stopped) return
+        if (!lastId) fetchEntries() // No position to resume from - reload the list instead
+        setTimeout(connect, 3000)
+      }
+    }
+
+    async function onChange(e) {
+      lastId = e.lastEventId
+      const change = JSON.parse(e.data)
+      if (change.type !== 'entry') return
+      if (change.op === 'delete') {
+        removeFromList(change.id)
+        return
+      }
+      const res = await fetch(`${API_BASE}/api/entries/${change.id}`, { headers: apiHeaders() })
+      if (res.ok) upsertInList(await res.json())
+    }
+
+    connect()
+    return () => { // Stop listening when leaving the page
+      stopped = true
+      if (source) source.close()
+    }
+  }, [token])
+
+  // Put one entry into the list (replacing an older copy) without refetching everything
+  function upsertInList(item) {
+    setEntriesList(list => {
+      const current = list.find(x => x.id === item.id)
+      // Already up to date - unless this copy has the content and the listed one (a summary) doesn't
+      if (current && current.version >= item.version && !(item.content !== undefined && current.content === undefined)) return list
+      return current ? list.map(x => (x.id === item.id ? item : x)) : [item, ...list]
+    })
+  }
+
+  function removeFromList(id) {
+    setEntriesList(list => list.filter(x => x.id !== id))
+  }
+
+  // List, search and filter results are requested as summaries (?summary=1) without the content;
+  // it is fetched when a entry is opened or edited
+  async function loadEntry(id) {
+    try {
+      const res = await fetch(`${API_BASE}/api/entries/${id}`, { headers: apiHeaders() })
+      const data = await res.json()
+      if (handleAuthError(data)) return null // Token invalid - user redirected to login
+      if (!res.ok) {
+        setMessage(data.error || 'Failed to load entry')
+        return null
+      }
+      upsertInList(data)
+      return data
+    } catch (err) {
+      setMessage('Error: ' + err)
+      return null
+    }
+  }
+
+  // Expand/collapse a entry, loading its content the first time
+  function toggleEntry(entry) {
+    if (expandedId === entry.id) {
+      setExpandedId(null)
+      return
+    }
+    setExpandedId(entry.id)
+    if (entry.content === undefined) loadEntry(entry.id)
+  }
+
   // Function to fetch all entries from the API
   async function fetchEntries() {
     if (!apiHeaders) return // Safety check - don't run if no auth headers
@@ -165,7 +263,7 @@ export default function Entries({ apiHeaders, token }) {
     
     try {
       // Make GET request to fetch entries
-      const res = await fetch(`${API_BASE}/api/entries`, {
+      const res = await fetch(`${API_BASE}/api/entries?summary=1`, {
         headers: apiHeaders() // Include authentication token in headers
       })
       
@@ -222,7 +320,7 @@ export default function Entries({ apiHeaders, token }) {
         setTitle('') // Clear title input
         setContent('') // Clear content textarea
         setTags('') // Clear tags input
-        fetchEntries() // Refresh list to show new entry
+        upsertInList(data) // Show the new entry (no need to reload the whole list)
       } else {
         // Failed - show error from server
         setMessage(data.error || 'Failed to create entry')
@@ -251,7 +349,7 @@ export default function Entries({ apiHeaders, token }) {
       const res = await fetch(`${API_BASE}/api/entries`, {
         method: 'PATCH', // PATCH = update existing resource
         headers: apiHeaders(), // Auth token
-        body: JSON.stringify({ id: editId, title, content, tags }) // Include entry ID
+        body: JSON.stringify({ id: editId, title, content, tags, version: editVersion }) // Include entry ID
       })
       const data = await res.json()
       
@@ -265,7 +363,13 @@ export default function Entries({ apiHeaders, token }) {
         setContent('')
         setTags('')
         setEditId(null) // Exit edit mode (back to create mode)
-        fetchEntries() // Refresh list with updated entry
+        setEditVersion(null)
+        upsertInList(data) // Show the updated entry
+      } else if (res.status === 409) {
+        // Someone changed it since the form was filled: show theirs, keep ours in the form
+        const latest = await loadEntry(editId)
+        if (latest) setEditVersion(latest.version)
+        setMessage('This entry was changed elsewhere since you opened it. The list shows the latest version; update again to replace it with yours.')
       } else {
         setMessage(data.error || 'Failed to update entry')
       }
@@ -296,7 +400,7 @@ export default function Entries({ apiHeaders, token }) {
       if (res.ok) {
         // Success! Show message and refresh list
         setMessage('Entry deleted successfully!')
-        fetchEntries() // Refresh to show entry is gone
+        removeFromList(id) // Drop it from the list
       } else {
         setMessage(data.error || 'Failed to delete entry')
       }
@@ -309,9 +413,12 @@ export default function Entries({ apiHeaders, token }) {
   // EDIT MODE FUNCTIONS
   // ============================================
   
-  // Start editing an entry - populate form with entry data
-  function startEdit(entry) {
+  // Start editing an entry - populate form with the entry as stored now (list rows have no content)
+  async function startEdit(listed) {
+    const entry = await loadEntry(listed.id)
+    if (!entry) return
     setEditId(entry.id) // Set edit mode with this entry's ID
+    setEditVersion(entry.version)
     setTitle(entry.title) // Fill in form fields with entry data
     setContent(entry.content)
     setTags(entry.tags || '') // Use existing tags or empty string
@@ -321,6 +428,7 @@ export default function Entries({ apiHeaders, token }) {
   // Cancel editing - clear form and exit edit mode
   function cancelEdit() {
     setEditId(null) // Exit edit mode (back to create mode)
+    setEditVersion(null)
     setTitle('') // Clear all form fields
     setContent('')
     setTags('')
@@ -340,7 +448,7 @@ export default function Entries({ apiHeaders, token }) {
     setMessage('') // Clear messages
     try {
       // Send GET request with search query in URL
-      const res = await fetch(`${API_BASE}/api/entries/search?q=${searchTerm}`, {
+      const res = await fetch(`${API_BASE}/api/entries/search?q=${searchTerm}&summary=1`, {
         headers: apiHeaders() // Auth token
       })
       const data = await res.json()
@@ -389,7 +497,7 @@ export default function Entries({ apiHeaders, token }) {
       }
       
       // Send GET request to filter endpoint
-      const res = await fetch(url, { headers: apiHeaders() })
+      const res = await fetch(`${url}?summary=1`, { headers: apiHeaders() })
       const data = await res.json()
       
       // Check for JWT authentication errors first
@@ -660,7 +768,7 @@ export default function Entries({ apiHeaders, token }) {
               <div 
                 className="item-header" 
                 style={{ cursor: 'pointer' }} // Show pointer cursor on hover
-                onClick={() => setExpandedId(isExpanded ? null : entry.id)} // Toggle expand
+                onClick={() => toggleEntry(entry)} // Toggle expand (loads the content)
               >
                 <div className="item-title">
                   {/* Arrow icon changes based on expanded state */}
@@ -679,7 +787,7 @@ export default function Entries({ apiHeaders, token }) {
               {isExpanded && (
                 <>
                   {/* Entry content/body */}
-                  <div className="item-content">{entry.content}</div>
+                  <div className="item-content">{entry.content === undefined ? 'Loading...' : entry.content}</div>
                   
                   {/* Tags section */}
                   <div className="item-meta">
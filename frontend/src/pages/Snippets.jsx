@@ -69,6 +69,9 @@ export default function Snippets({ apiHeaders, token }) {
   
   // Edit mode - stores ID of snippet being edited (null = creating new)
   const [editId, setEditId] = useState(null)
+  // Version of the snippet the form was filled from; sent with the update so a change made
+  // elsewhere in the meantime is reported (409) instead of silently overwritten
+  const [editVersion, setEditVersion] = useState(null)
   
   // Search and filter functionality
   const [searchTerm, setSearchTerm] = useState('') // Search input value
@@ -193,6 +196,101 @@ export default function Snippets({ apiHeaders, token }) {
     }
   }, [token]) // Dependency array - run when token changes
 
+  // ============================================
+  // LIVE UPDATES - Server-Sent Events from /api/events
+  // ============================================
+  // Changes made in other tabs or the CLI arrive as small {type, id, op, version}
+  // notifications, so only the changed snippet is downloaded instead of the whole list.
+  // EventSource can't send headers, so a token goes in the URL (?jwt=...). URLs end up in logs,
+  // so it is a short-lived stream token from /api/events/token, not the login token. The
+  // browser reconnects with the same URL when a stream ends; once that token has expired the
+  // source closes, and we fetch a new token and reopen from the last change we saw.
+  useEffect(() => {
+    if (!token) return
+    let source = null
+    let stopped = false
+    let lastId = ''
+
+    async function connect() {
+      try {
+        const res = await fetch(`${API_BASE}/api/events/token`, { method: 'POST', headers: apiHeaders() })
+        if (!res.ok || stopped) return
+        const streamToken = (await res.json()).token
+        const since = lastId ? `&since=${encodeURIComponent(lastId)}` : ''
+        source = new EventSource(`${API_BASE}/api/events?jwt=${encodeURIComponent(streamToken)}${since}`)
+      } catch {
+        return // Server unreachable - the list still works, just not live
+      }
+      source.addEventListener('change', onChange)
+      source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED || stopped) return
+        if (!lastId) fetchSnippets() // No position to resume from - reload the list instead
+        setTimeout(connect, 3000)
+      }
+    }
+
+    async function onChange(e) {
+      lastId = e.lastEventId
+      const change = JSON.parse(e.data)
+      if (change.type !== 'snippet') return
+      if (change.op === 'delete') {
+        removeFromList(change.id)
+        return
+      }
+      const res = await fetch(`${API_BASE}/api/snippets/${change.id}`, { headers: apiHeaders() })
+      if (res.ok) upsertInList(await res.json())
+    }
+
+    connect()
+    return () => { // Stop listening when leaving the page
+      stopped = true
+      if (source) source.close()
+    }
+  }, [token])
+
+  // Put one snippet into the list (replacing an older copy) without refetching everything
+  function upsertInList(item) {
+    setSnippetsList(list => {
+      const current = list.find(x => x.id === item.id)
+      // Already up to date - unless this copy has the snippet and the listed one (a summary) doesn't
+      if (current && current.version >= item.version && !(item.snippet !== undefined && current.snippet === undefined)) return list
+      return current ? list.map(x => (x.id === item.id ? item : x)) : [item, ...list]
+    })
+  }
+
+  function removeFromList(id) {
+    setSnippetsList(list => list.filter(x => x.id !== id))
+  }
+
+  // List, search and filter results are requested as summaries (?summary=1) without the snippet;
+  // it is fetched when a snippet is opened or edited
+  async function loadSnippet(id) {
+    try {
+      const res = await fetch(`${API_BASE}/api/snippets/${id}`, { headers: apiHeaders() })
+      const data = await res.json()
+      if (handleAuthError(data)) return null // Token invalid - user redirected to login
+      if (!res.ok) {
+        setMessage(data.error || 'Failed to load snippet')
+        return null
+      }
+      upsertInList(data)
+      return data
+    } catch (err) {
+      setMessage('Error: ' + err)
+      return null
+    }
+  }
+
+  // Expand/collapse a snippet, loading its snippet the first time
+  function toggleSnippet(snippet) {
+    if (expandedId === snippet.id) {
+      setExpandedId(null)
+      return
+    }
+    setExpandedId(snippet.id)
+    if (snippet.snippet === undefined) loadSnippet(snippet.id)
+  }
+
   // Function to fetch all snippets from the API
   async function fetchSnippets() {
     if (!apiHeaders) return // Safety check - don't run if no auth headers
@@ -201,7 +299,7 @@ export default function Snippets({ apiHeaders, token }) {
     setMessage('') // Clear any previous messages
     try {
       // Make GET request to fetch snippets
-      const res = await fetch(`${API_BASE}/api/snippets`, {
+      const res = await fetch(`${API_BASE}/api/snippets?summary=1`, {
         headers: apiHeaders() // Include authentication token in headers
       })
       
@@ -263,7 +361,7 @@ export default function Snippets({ apiHeaders, token }) {
         setLanguage('')
         setTags('')
         setDescription('')
-        fetchSnippets() // Refresh list to show new snippet
+        upsertInList(data) // Show the new snippet (no need to reload the whole list)
       } else {
         // Failed - show error from server
         setMessage(data.error || 'Failed to create snippet')
@@ -293,7 +391,7 @@ export default function Snippets({ apiHeaders, token }) {
         method: 'PATCH', // PATCH = update existing resource
         headers: apiHeaders(), // Auth token
         // IMPORTANT: Backend expects "snippet" field, not "code"
-        body: JSON.stringify({ id: editId, title, snippet: code, language, tags })
+        body: JSON.stringify({ id: editId, title, snippet: code, language, tags, version: editVersion })
       })
       const data = await res.json()
       
@@ -308,10 +406,14 @@ export default function Snippets({ apiHeaders, token }) {
         setLanguage('')
         setTags('')
         setDescription('')
-        setEditId(null)
-        fetchSnippets()
         setEditId(null) // Exit edit mode (back to create mode)
-        fetchSnippets() // Refresh list with updated snippet
+        setEditVersion(null)
+        upsertInList(data) // Show the updated snippet
+      } else if (res.status === 409) {
+        // Someone changed it since the form was filled: show theirs, keep ours in the form
+        const latest = await loadSnippet(editId)
+        if (latest) setEditVersion(latest.version)
+        setMessage('This snippet was changed elsewhere since you opened it. The list shows the latest version; update again to replace it with yours.')
       } else {
         setMessage(data.error || 'Failed to update snippet')
       }
@@ -342,7 +444,7 @@ export default function Snippets({ apiHeaders, token }) {
       if (res.ok) {
         // Success! Show message and refresh list
         setMessage('Snippet deleted successfully!')
-        fetchSnippets() // Refresh to show snippet is gone
+        removeFromList(id) // Drop it from the list
       } else {
         setMessage(data.error || 'Failed to delete snippet')
       }
@@ -355,12 +457,14 @@ export default function Snippets({ apiHeaders, token }) {
   // EDIT MODE FUNCTIONS
   // ============================================
   
-  // Start editing a snippet - populate form with snippet data
-  function startEdit(snippet) {
+  // Start editing a snippet - populate form with the snippet as stored now (list rows have no code)
+  async function startEdit(listed) {
+    const snippet = await loadSnippet(listed.id)
+    if (!snippet) return
     setEditId(snippet.id) // Set edit mode with this snippet's ID
+    setEditVersion(snippet.version)
     setTitle(snippet.title) // Fill in form fields with snippet data
-    // Backend might return "snippet" or "code" field - handle both
-    setCode(snippet.snippet || snippet.code)
+    setCode(snippet.snippet)
     setLanguage(snippet.language)
     setTags(snippet.tags || '') // Use existing tags or empty string
     setDescription(snippet.description || '') // Use existing description or empty
@@ -370,6 +474,7 @@ export default function Snippets({ apiHeaders, token }) {
   // Cancel editing - clear form and exit edit mode
   function cancelEdit() {
     setEditId(null) // Exit edit mode (back to create mode)
+    setEditVersion(null)
     setTitle('') // Clear all form fields
     setCode('')
     setLanguage('')
@@ -391,7 +496,7 @@ export default function Snippets({ apiHeaders, token }) {
     setMessage('') // Clear messages
     try {
       // Send GET request with search query in URL
-      const res = await fetch(`${API_BASE}/api/snippets/search?q=${searchTerm}`, {
+      const res = await fetch(`${API_BASE}/api/snippets/search?q=${searchTerm}&summary=1`, {
         headers: apiHeaders() // Auth token
       })
       const data = await res.json()
@@ -437,7 +542,7 @@ export default function Snippets({ apiHeaders, token }) {
       }
       
       // Send GET request to filter endpoint
-      const res = await fetch(url, { headers: apiHeaders() })
+      const res = await fetch(`${url}?summary=1`, { headers: apiHeaders() })
       const data = await res.json()
       
       if (res.ok) {
@@ -738,7 +843,7 @@ export default function Snippets({ apiHeaders, token }) {
               <div 
                 className="item-header" 
                 style={{ cursor: 'pointer' }} // Show pointer cursor on hover
-                onClick={() => setExpandedId(isExpanded ? null : snippet.id)} // Toggle expand
+                onClick={() => toggleSnippet(snippet)} // Toggle expand (loads the snippet)
               >
                 <div>
                   <div className="item-title">
@@ -789,7 +894,7 @@ export default function Snippets({ apiHeaders, token }) {
                       }}
                       showLineNumbers={true}
                     >
-                      {snippet.snippet || snippet.code}
+                      {snippet.snippet === undefined ? 'Loading...' : snippet.snippet}
                     </SyntaxHighlighter>
                   </div>
                   